@@ -2,24 +2,82 @@
 import pandas as pd
 import re
 import numpy as np
-from transformers import pipeline
-from sentence_transformers import SentenceTransformer, util
+from functools import lru_cache
+from skill_matcher import load_skill_matcher, SemanticSkillMatcher
+from candidate_table import CandidateTable
+from dedup import duplicate_groups
+from inference import configure_from_env, apply_thread_settings, GatedModel
+from model_bundle import (find_bundle, enable_offline_mode, load_classifier, load_semantic_model, LazyModel,
+                          classifier_precision, SEMANTIC_MODEL_NAME, CLASSIFIER_MODEL_NAME)
+from resume_parser import ParsedResume, parse_resume, extract_requirements, DEGREE_DISPLAY_NAMES
 
-# --- Initialize Models (Load once, use everywhere) ---
-# Load a model for sentiment/emotion classification (for bias detection)
-print("Loading Bias Detection model...")
-classifier = pipeline("text-classification", model="j-hartmann/emotion-english-distilroberta-base", return_all_scores=True)
+# --- Initialize Models (Load once, on first use, use everywhere) ---
+# Thread pools, CPU pinning and concurrent model calls are set before any model runs (see inference.py);
+# every call to either model goes through the same gate, so concurrent sessions do not oversubscribe the cores
+inference_gate = configure_from_env()
 
-# Load a model for semantic similarity (better than TF-IDF)
-print("Loading Semantic Similarity model...")
-semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
+# With a model bundle (see model_bundle.py) both models load from local safetensors and the hub is never contacted
+model_bundle = find_bundle()
+if model_bundle is not None:
+    enable_offline_mode()
+
+# float32, or int8 (TALENTSIFT_CLASSIFIER_PRECISION; see model_bundle.quantize_int8 and benchmarks/classifier_quantization.py)
+CLASSIFIER_PRECISION = classifier_precision()
+# Stored bias reports are keyed by the classifier (model and precision) that made them
+CLASSIFIER_KEY = f"{CLASSIFIER_MODEL_NAME}:{CLASSIFIER_PRECISION}"
+
+def _load_classifier():
+    apply_thread_settings()
+    return load_classifier(model_bundle, CLASSIFIER_MODEL_NAME, CLASSIFIER_PRECISION)
+
+def _load_semantic_model():
+    apply_thread_settings()
+    return load_semantic_model(model_bundle, SEMANTIC_MODEL_NAME)
+
+# Both models load on first use, so importing this module (and starting the app) imports no torch or transformers
+# Model for sentiment/emotion classification (for bias detection)
+classifier = GatedModel(LazyModel(_load_classifier, f"Bias Detection model ({CLASSIFIER_PRECISION})"), inference_gate)
+
+# Model for semantic similarity (better than TF-IDF)
+semantic_model = GatedModel(LazyModel(_load_semantic_model, "Semantic Similarity model"), inference_gate)
+
+def load_models():
+    """Loads both models now rather than on first use (before serving, or before forking workers that share them)."""
+    classifier.model.load()
+    semantic_model.model.load()
+
+# Compile the skill taxonomy into a matcher (set TALENTSIFT_SKILL_TAXONOMY to use another file)
+print("Loading Skill Taxonomy...")
+skill_matcher = load_skill_matcher()
+
+# Similarity above which a resume phrase counts as covering a JD skill
+SEMANTIC_SKILL_THRESHOLD = 0.5
+
+@lru_cache(maxsize=1)
+def get_semantic_skill_matcher():
+    """Builds the semantic skill matcher on first use (skill vectors are cached on disk)."""
+    return SemanticSkillMatcher(skill_matcher, semantic_model, SEMANTIC_MODEL_NAME,
+                                threshold=SEMANTIC_SKILL_THRESHOLD)
 
 # --- 1. Bias Detection Function ---
+# The emotion model only sees the start of the JD (its max length)
+BIAS_MODEL_MAX_CHARS = 512
+
 def detect_bias(job_description_text):
     """
     Analyzes a job description for potentially biased language.
     Returns a DataFrame with bias analysis.
     """
+    # Analyze sentiment/emotion of the JD using the model
+    # We'll look for high levels of 'anger' which can correlate with aggressive/biased language
+    emotion_results = classifier(job_description_text[:BIAS_MODEL_MAX_CHARS]) # Truncate to model's max length
+    return bias_from_emotions(job_description_text, emotion_results[0])
+
+def bias_from_emotions(job_description_text, emotion_scores):
+    """
+    The bias analysis for a JD given the emotion model's scores for it
+    (a list of {'label', 'score'}), so callers can batch the model calls.
+    """
     # Keywords often associated with gendered bias
     masculine_coded_words = ["aggressive", "analytical", "assertive", "athletic", "autonomous", "battle", "boast",
                              "challenge", "competent", "confident", "courageous", "decide", "decision", "decisive"]
@@ -34,10 +92,7 @@ def detect_bias(job_description_text):
     total_masculine = sum(masculine_counts.values())
     total_feminine = sum(feminine_counts.values())
     
-    # Analyze sentiment/emotion of the JD using the model
-    # We'll look for high levels of 'anger' which can correlate with aggressive/biased language
-    emotion_results = classifier(job_description_text[:512]) # Truncate to model's max length
-    emotion_df = pd.DataFrame(emotion_results[0])
+    emotion_df = pd.DataFrame(emotion_scores)
     
     # Create a summary
     bias_summary = {
@@ -48,33 +103,164 @@ def detect_bias(job_description_text):
     
     return bias_summary, masculine_counts, feminine_counts, emotion_df
 
+# --- Shared resume text helpers ---
+def _resume_parsed(resume):
+    """Returns the ParsedResume stored with a resume dict, parsing it only if extraction did not."""
+    return resume.get('parsed') or parse_resume(resume['text'])
+
+def _resume_skill_ids(parsed):
+    """Skill ids of a whole resume, reusing the set found at parse time when there is one."""
+    if parsed.skill_ids is not None:
+        return parsed.skill_ids
+    return skill_matcher.find_skill_ids(parsed.lower, lowered=True)
+
+def _candidate_ids_and_names(resumes):
+    """Candidate ID and name columns of a CandidateTable or a list of resume dicts."""
+    if isinstance(resumes, CandidateTable):
+        return resumes.ids, resumes.names
+    return [resume.get('id', i) for i, resume in enumerate(resumes)], [resume['name'] for resume in resumes]
+
+def _normalized_resume_text(resume, sections=None):
+    """
+    Lowercased text of a resume given as raw text or a ParsedResume,
+    optionally restricted to some sections (e.g. ('skills',)).
+    """
+    if isinstance(resume, str):
+        if not sections:
+            return resume.lower()
+        resume = parse_resume(resume)
+    return resume.section_text(sections) if sections else resume.lower
+
 # --- 2. Advanced Semantic Similarity ---
-def rank_resumes_advanced(job_description, resumes):
+# Relative weight of each resume section for section-weighted ranking
+DEFAULT_SECTION_WEIGHTS = {'experience': 0.35, 'skills': 0.25, 'projects': 0.15, 'summary': 0.15, 'education': 0.10}
+
+def _section_weighted_embeddings(resumes, section_weights, encoder=None):
     """
-    Uses Sentence Transformers for much better semantic understanding than TF-IDF.
+    Embeds each resume as the weighted average of its section embeddings.
+    All sections of all resumes are encoded in a single batch; resumes without any
+    recognised section fall back to their full text.
     """
-    # Encode the Job Description and all resumes
-    jd_embedding = semantic_model.encode(job_description, convert_to_tensor=True)
+    chunks, owners, weights = [], [], []
+    for i, resume in enumerate(resumes):
+        parsed = _resume_parsed(resume)
+        found = False
+        for section, weight in section_weights.items():
+            text = parsed.section(section).strip()
+            if text and weight > 0:
+                chunks.append(text)
+                owners.append(i)
+                weights.append(weight)
+                found = True
+        if not found:
+            chunks.append(parsed.lower)
+            owners.append(i)
+            weights.append(1.0)
+
+    if encoder is not None:
+        chunk_embeddings = encoder.encode(chunks)
+    else:
+        chunk_embeddings = semantic_model.encode(chunks, convert_to_numpy=True, normalize_embeddings=True)
+    resume_embeddings = np.zeros((len(resumes), chunk_embeddings.shape[1]), dtype=np.float32)
+    np.add.at(resume_embeddings, np.array(owners), chunk_embeddings * np.array(weights, dtype=np.float32)[:, None])
+    return resume_embeddings
+
+def encode_job_description(job_description):
+    """Unit-length embedding of the job description."""
+    return semantic_model.encode(job_description, convert_to_numpy=True, normalize_embeddings=True)
+
+def encode_resumes(resumes, section_weights=None, batch_size=32, encoder=None):
+    """
+    Unit-length resume embeddings as a float32 array (one row per resume), so cosine
+    similarity against the JD is a plain dot product.
+    encoder (e.g. a sharded_encoder.ShardedEncoder) spreads very large batches over several processes.
+    """
+    if section_weights:
+        embeddings = _section_weighted_embeddings(resumes, section_weights, encoder)
+        return embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
     resume_texts = [resume['text'] for resume in resumes]
-    resume_embeddings = semantic_model.encode(resume_texts, convert_to_tensor=True)
-    
-    # Compute cosine similarities
-    cosine_scores = util.pytorch_cos_sim(jd_embedding, resume_embeddings)[0]
-    
-    # Create results DataFrame
+    if encoder is not None:
+        return encoder.encode(resume_texts, batch_size=batch_size)
+    return semantic_model.encode(resume_texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+
+def ranking_order(scores, candidate_ids):
+    """
+    Row indices by descending score, ties by ascending candidate ID: the one tie rule every
+    ranking uses (results_from_scores, ScreeningSession, CompositeScorer and the sharded merge).
+    """
+    return np.lexsort((np.asarray(candidate_ids, dtype=str), -np.asarray(scores, dtype=np.float64)))
+
+def results_from_scores(resumes, cosine_scores, duplicates=None):
+    """
+    Builds the ranked results DataFrame from one cosine score per resume
+    (resumes may be a list of resume dicts or a CandidateTable).
+    duplicates (one string per resume) adds a 'Duplicates' column naming collapsed near-duplicate copies.
+    """
+    candidate_ids, candidate_names = _candidate_ids_and_names(resumes)
     results_df = pd.DataFrame({
-        'Candidate': [resume['name'] for resume in resumes],
-        'Semantic Similarity Score': np.round(cosine_scores.cpu().numpy() * 100, 2)
+        'Candidate ID': candidate_ids,
+        'Candidate': candidate_names,
+        'Semantic Similarity Score': np.asarray(cosine_scores, dtype=np.float64) * 100
     })
+    columns = ['Rank', 'Candidate ID', 'Candidate', 'Semantic Similarity Score']
+    if duplicates is not None:
+        results_df['Duplicates'] = list(duplicates)
+        columns.append('Duplicates')
     
-    # Sort and rank
-    results_df = results_df.sort_values('Semantic Similarity Score', ascending=False)
+    # Sort (on the unrounded scores; see ranking_order) and rank
+    results_df = results_df.iloc[ranking_order(results_df['Semantic Similarity Score'], candidate_ids)]
+    results_df['Semantic Similarity Score'] = results_df['Semantic Similarity Score'].round(2)
     results_df['Rank'] = range(1, len(results_df) + 1)
-    results_df = results_df[['Rank', 'Candidate', 'Semantic Similarity Score']]
+    results_df = results_df[columns]
     
     return results_df
 
+def rank_resumes_advanced(job_description, resumes, section_weights=None, collapse_duplicates=False, encoder=None):
+    """
+    Uses Sentence Transformers for much better semantic understanding than TF-IDF.
+    Pass section_weights (e.g. DEFAULT_SECTION_WEIGHTS) to rank on a weighted mix of resume sections.
+    With collapse_duplicates=True, near-duplicate resumes (MinHash LSH, see dedup.py) are ranked once,
+    under the first copy, and the other copies are never encoded; their names go in a 'Duplicates' column.
+    Pass a sharded_encoder.ShardedEncoder as encoder to encode very large batches on several processes.
+    """
+    duplicates = None
+    if collapse_duplicates:
+        representatives = duplicate_groups(resumes)
+        copies = {}
+        for i, representative in enumerate(representatives):
+            if representative != i:
+                copies.setdefault(representative, []).append(resumes[i]['name'])
+        duplicates = [", ".join(copies.get(i, [])) for i, representative in enumerate(representatives) if representative == i]
+        resumes = [resume for i, resume in enumerate(resumes) if representatives[i] == i]
+    
+    # Encode the Job Description and all resumes
+    jd_embedding = encode_job_description(job_description)
+    resume_embeddings = encode_resumes(resumes, section_weights, encoder=encoder)
+    
+    # Cosine similarities (both sides are unit length)
+    cosine_scores = resume_embeddings @ jd_embedding
+    
+    return results_from_scores(resumes, cosine_scores, duplicates)
+
 # --- 3. Generate LLM-Powered Insights ---
+# Keyword groups are compiled once; each pattern is searched once per (already lowercased) resume
+EXPERIENCE_PATTERN = re.compile(r"year|experience|expérience")
+EDUCATION_PATTERN = re.compile(r"bachelor|master|phd|degree|diploma|university")
+DEFAULT_INSIGHT = "Potential fit based on skills alignment. Review for culture add."
+
+def _insight_from_lower(resume_lower, years_experience=0, degree_level=0):
+    """Rule-based insight for one lowercased resume, using extracted experience/degree when known."""
+    insights = []
+    if years_experience >= 1:
+        insights.append(f"About {years_experience:.0f} years of professional experience.")
+    elif EXPERIENCE_PATTERN.search(resume_lower):
+        insights.append("Highlights relevant professional experience.")
+    if degree_level:
+        insights.append(f"Holds a {DEGREE_DISPLAY_NAMES[degree_level]} degree.")
+    elif EDUCATION_PATTERN.search(resume_lower):
+        insights.append("Possesses the required educational background.")
+    return " | ".join(insights) if insights else DEFAULT_INSIGHT
+
 def generate_insights(job_description, resume_text):
     """
     Generates a concise insight for a single resume using a smaller, faster model.
@@ -82,68 +268,60 @@ def generate_insights(job_description, resume_text):
     """
     # This is a simplified example. In a real scenario, you would use a proper text generation model.
     # Let's create a simple rule-based insight generator for demonstration.
-    
-    # Check for experience level
-    experience_keywords = ["year", "years", "experience", "expérience"]
-    has_experience = any(keyword in resume_text.lower() for keyword in experience_keywords)
-    
-    # Check for education
-    education_keywords = ["bachelor", "master", "phd", "degree", "diploma", "university"]
-    has_education = any(keyword in resume_text.lower() for keyword in education_keywords)
-    
-    # Simple insight generation
+    return _insight_from_lower(resume_text.lower())
+
+def generate_insights_batch(job_description, resumes):
+    """
+    Generates insights for every resume in one pass.
+    Returns a DataFrame keyed by 'Candidate ID' so it can be joined onto the ranked results.
+    """
+    candidate_ids = [resume.get('id', i) for i, resume in enumerate(resumes)]
     insights = []
-    if has_experience:
-        insights.append("Highlights relevant professional experience.")
-    if has_education:
-        insights.append("Possesses the required educational background.")
-    
-    if insights:
-        return " | ".join(insights)
-    else:
-        return "Potential fit based on skills alignment. Review for culture add."
+    for resume in resumes:
+        parsed = _resume_parsed(resume)
+        insights.append(_insight_from_lower(parsed.lower, parsed.years_experience, parsed.degree_level))
+    insights_df = pd.DataFrame({'Candidate ID': candidate_ids, 'AI Insights': insights})
+    # Identical uploads share an ID (and an insight); keep one row so joins stay one-to-one
+    return insights_df.drop_duplicates('Candidate ID')
 
 # --- 4. Skill Match Analysis ---
-def analyze_skill_match(job_description, resume_text):
+def analyze_skill_match(job_description, resume_text, semantic=False, sections=None):
     """
     Analyze specific skill matches between JD and resume
     Returns detailed breakdown of matching and missing skills
+    resume_text may be raw text or a ParsedResume; sections (e.g. ('skills',)) limits
+    matching to those resume sections.
+    With semantic=True, JD skills missed by exact matching are also checked against
+    resume phrases by embedding similarity.
     """
-    # Comprehensive list of technical skills
-    tech_skills = [
-        'python', 'java', 'javascript', 'typescript', 'sql', 'nosql', 'html', 'css', 
-        'react', 'angular', 'vue', 'node', 'express', 'django', 'flask', 'spring',
-        'machine learning', 'deep learning', 'nlp', 'computer vision', 'ai',
-        'tensorflow', 'pytorch', 'scikit-learn', 'keras', 'opencv',
-        'aws', 'azure', 'google cloud', 'gcp', 'docker', 'kubernetes', 'jenkins',
-        'tableau', 'power bi', 'excel', 'spark', 'hadoop', 'kafka', 'airflow',
-        'git', 'github', 'gitlab', 'ci/cd', 'rest api', 'graphql', 'microservices',
-        'c++', 'c#', 'ruby', 'php', 'go', 'rust', 'swift', 'kotlin'
-    ]
-    
-    # Comprehensive list of soft skills
-    soft_skills = [
-        'leadership', 'communication', 'teamwork', 'collaboration', 'problem solving',
-        'project management', 'agile', 'scrum', 'kanban', 'presentation', 'public speaking',
-        'critical thinking', 'analytical skills', 'time management', 'adaptability',
-        'creativity', 'innovation', 'mentoring', 'training', 'conflict resolution',
-        'negotiation', 'decision making', 'strategic planning', 'customer service'
-    ]
-    
-    # Convert to lowercase for case-insensitive matching
-    jd_lower = job_description.lower()
-    resume_lower = resume_text.lower()
-    
-    # Find skills mentioned in both JD and resume
-    matching_tech_skills = [skill for skill in tech_skills if skill in jd_lower and skill in resume_lower]
-    matching_soft_skills = [skill for skill in soft_skills if skill in jd_lower and skill in resume_lower]
+    resume_lower = _normalized_resume_text(resume_text, sections)
     
-    # Find skills required in JD but missing in resume
-    jd_tech_skills = [skill for skill in tech_skills if skill in jd_lower]
-    jd_soft_skills = [skill for skill in soft_skills if skill in jd_lower]
+    # Skills (with synonyms) come from the compiled taxonomy, so "k8s" counts as "kubernetes"
+    jd_skill_ids = skill_matcher.find_skill_ids(job_description)
+    if isinstance(resume_text, ParsedResume) and not sections:
+        resume_skill_ids = _resume_skill_ids(resume_text)
+    else:
+        resume_skill_ids = skill_matcher.find_skill_ids(resume_lower, lowered=True)
+    matched_ids = jd_skill_ids & resume_skill_ids
     
-    missing_tech_skills = list(set(jd_tech_skills) - set(matching_tech_skills))
-    missing_soft_skills = list(set(jd_soft_skills) - set(matching_soft_skills))
+    # Semantic fallback for the remaining JD skills (one batched encode of the resume)
+    semantic_matches = {}
+    if semantic and jd_skill_ids - matched_ids:
+        covered = get_semantic_skill_matcher().match(jd_skill_ids - matched_ids, resume_lower)
+        semantic_matches = {skill_matcher.skills[i]: {'similarity': round(score, 3), 'evidence': phrase}
+                            for i, (score, phrase) in covered.items()}
+        matched_ids = matched_ids | set(covered)
+    
+    # Split into technical and soft skills by top-level category, in taxonomy order
+    skills, roots = skill_matcher.skills, skill_matcher.skill_root
+    jd_tech_skills = [skills[i] for i in sorted(jd_skill_ids) if roots[i] == 'technical']
+    jd_soft_skills = [skills[i] for i in sorted(jd_skill_ids) if roots[i] == 'soft']
+    matching_tech_skills = [skills[i] for i in sorted(matched_ids) if roots[i] == 'technical']
+    matching_soft_skills = [skills[i] for i in sorted(matched_ids) if roots[i] == 'soft']
+    
+    # Find skills required in JD but missing in resume
+    missing_tech_skills = [skill for skill in jd_tech_skills if skill not in matching_tech_skills]
+    missing_soft_skills = [skill for skill in jd_soft_skills if skill not in matching_soft_skills]
     
     # Calculate match percentages
     tech_match_pct = (len(matching_tech_skills) / len(jd_tech_skills) * 100) if jd_tech_skills else 0
@@ -157,5 +335,110 @@ def analyze_skill_match(job_description, resume_text):
         'missing_tech_skills': missing_tech_skills,
         'missing_soft_skills': missing_soft_skills,
         'jd_tech_skills_count': len(jd_tech_skills),
-        'jd_soft_skills_count': len(jd_soft_skills)
-    }
\ No newline at end of file
+        'jd_soft_skills_count': len(jd_soft_skills),
+        'category_match': skill_matcher.category_breakdown(jd_skill_ids, matched_ids),
+        'semantic_matches': semantic_matches
+    }
+
+
+# --- 5. Composite Scoring ---
+SCORE_FEATURES = ['semantic', 'technical_skills', 'soft_skills', 'experience', 'education']
+SCORE_FEATURE_LABELS = {
+    'semantic': 'Semantic Similarity',
+    'technical_skills': 'Technical Skills',
+    'soft_skills': 'Soft Skills',
+    'experience': 'Experience',
+    'education': 'Education'
+}
+DEFAULT_SCORE_WEIGHTS = {'semantic': 0.5, 'technical_skills': 0.25, 'soft_skills': 0.1, 'experience': 0.1, 'education': 0.05}
+# Years used to scale experience when the JD does not state a requirement
+DEFAULT_EXPERIENCE_TARGET = 5.0
+
+class CompositeScorer:
+    """
+    Per-candidate feature columns (each scaled to 0-1) held as one NumPy matrix.
+    Re-weighting is a single matrix-vector product, so weight changes re-rank
+    instantly without re-encoding, re-extracting or re-running skill matching.
+    """
+
+    def __init__(self, candidate_ids, candidate_names, features, years_experience, degree_levels):
+        self.candidate_ids = np.asarray(candidate_ids, dtype=object)
+        self.candidate_names = np.asarray(candidate_names, dtype=object)
+        self.features = np.asarray(features, dtype=np.float32)
+        self.years_experience = np.asarray(years_experience, dtype=np.float32)
+        self.degree_levels = np.asarray(degree_levels, dtype=np.int8)
+
+    def __len__(self):
+        return len(self.candidate_ids)
+
+    def scores(self, weights=None):
+        """Composite scores (0-100) for the given feature weights; weights are normalized to sum to 1."""
+        weights = DEFAULT_SCORE_WEIGHTS if weights is None else weights
+        weight_vector = np.array([weights.get(feature, 0.0) for feature in SCORE_FEATURES], dtype=np.float32)
+        total = weight_vector.sum()
+        if total <= 0:
+            weight_vector = np.array([DEFAULT_SCORE_WEIGHTS[feature] for feature in SCORE_FEATURES], dtype=np.float32)
+            total = weight_vector.sum()
+        return (self.features @ (weight_vector / total)).astype(np.float64) * 100
+
+    def rank(self, weights=None):
+        """Ranked DataFrame for the given weights, with the feature breakdown per candidate."""
+        scores = self.scores(weights)
+        order = ranking_order(scores, self.candidate_ids)
+        ranked_df = pd.DataFrame({
+            'Rank': np.arange(1, len(order) + 1),
+            'Candidate ID': self.candidate_ids[order],
+            'Candidate': self.candidate_names[order],
+            'Composite Score': np.round(scores[order], 2)
+        })
+        for column, feature in enumerate(SCORE_FEATURES):
+            ranked_df[f"{SCORE_FEATURE_LABELS[feature]} %"] = np.round(self.features[order, column].astype(np.float64) * 100, 1)
+        ranked_df['Years Experience'] = np.round(self.years_experience[order].astype(np.float64), 1)
+        ranked_df['Degree'] = [DEGREE_DISPLAY_NAMES[level] for level in self.degree_levels[order]]
+        return ranked_df
+
+def build_composite_scorer(job_description, resumes, results_df):
+    """
+    Builds the feature matrix once per analysis: semantic scores come from the
+    rank_resumes_advanced results, skill coverage is one JD scan plus the skill sets
+    found at parse time, and experience/education come from the parsed resumes.
+    For a CandidateTable every feature is computed column-wise, without rebuilding any resume.
+    """
+    jd_skill_ids = skill_matcher.find_skill_ids(job_description)
+    jd_tech_ids = {i for i in jd_skill_ids if skill_matcher.skill_root[i] == 'technical'}
+    jd_soft_ids = jd_skill_ids - jd_tech_ids
+    required_years, required_degree = extract_requirements(job_description)
+    experience_target = required_years or DEFAULT_EXPERIENCE_TARGET
+
+    semantic_by_id = dict(zip(results_df['Candidate ID'], results_df['Semantic Similarity Score'] / 100))
+
+    candidate_ids, candidate_names = _candidate_ids_and_names(resumes)
+    if isinstance(resumes, CandidateTable):
+        years_experience = resumes.years_experience
+        degree_levels = resumes.degree_levels
+        tech_counts = resumes.skill_match_counts(jd_tech_ids)
+        soft_counts = resumes.skill_match_counts(jd_soft_ids)
+    else:
+        n = len(resumes)
+        years_experience = np.zeros(n, dtype=np.float32)
+        degree_levels = np.zeros(n, dtype=np.int8)
+        tech_counts = np.zeros(n, dtype=np.int32)
+        soft_counts = np.zeros(n, dtype=np.int32)
+        for row, resume in enumerate(resumes):
+            parsed = _resume_parsed(resume)
+            resume_skill_ids = _resume_skill_ids(parsed)
+            years_experience[row] = parsed.years_experience
+            degree_levels[row] = parsed.degree_level
+            tech_counts[row] = len(jd_tech_ids & resume_skill_ids)
+            soft_counts[row] = len(jd_soft_ids & resume_skill_ids)
+
+    semantic = np.array([semantic_by_id.get(candidate_id, 0.0) for candidate_id in candidate_ids], dtype=np.float32)
+    features = np.column_stack([
+        np.maximum(semantic, 0.0),
+        tech_counts / len(jd_tech_ids) if jd_tech_ids else np.zeros(len(candidate_ids)),
+        soft_counts / len(jd_soft_ids) if jd_soft_ids else np.zeros(len(candidate_ids)),
+        np.minimum(years_experience / experience_target, 1.0),
+        np.minimum(degree_levels / required_degree, 1.0) if required_degree else degree_levels / 4
+    ]).astype(np.float32)
+
+    return CompositeScorer(candidate_ids, candidate_names, features, years_experience, degree_levels)
@@ -0,0 +1,342 @@
+# api_server.py
+"""
+Local REST API for TalentSift AI, for programmatic access (e.g. from an ATS).
+
+    python api_server.py --port 8000
+
+Endpoints (JSON in, JSON out):
+    POST /rank     {"job_description": "...", "resumes": [{"id": "...", "name": "...", "text": "..."}]}
+    POST /bias     {"job_description": "..."}
+    POST /skills   {"job_description": "...", "resume_text": "...", "semantic": false}
+    POST /extract  raw PDF/DOCX bytes, with ?filename=resume.pdf
+    GET  /metrics  latency percentiles, throughput and batching stats per endpoint, model-call queueing
+    GET  /health
+
+/extract returns the file's content hash as its 'id', the candidate ID the app, the candidate
+store and the job queue use; pass it on to /rank. A /rank resume without an 'id' gets a hash
+of its text instead, which does not match a stored candidate.
+
+Concurrent /rank and /bias requests are coalesced by MicroBatcher, so texts from
+different requests share one semantic_model.encode / classifier call.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from advanced_utils import (classifier, semantic_model, inference_gate, analyze_skill_match, bias_from_emotions,
+                            results_from_scores, load_models, BIAS_MODEL_MAX_CHARS)
+from resume_parser import parse_resume, DEGREE_DISPLAY_NAMES
+from skill_matcher import load_skill_matcher
+from utils import extract_text, file_content_hash, file_from_bytes, text_hash
+
+MAX_BODY_BYTES = 20 * 1024 * 1024
+
+
+# --- Request coalescing ---
+class MicroBatcher:
+    """
+    Groups items submitted by concurrent requests into shared model calls.
+
+    A single worker thread takes the first waiting item, then keeps collecting until
+    max_batch items are waiting or max_wait_ms has passed, and runs batch_fn once on
+    the whole group. batch_fn(items) must return one result per item, in order.
+    """
+
+    def __init__(self, batch_fn, max_batch=64, max_wait_ms=5, name="batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, items):
+        """Queues items; returns one Future per item."""
+        futures = []
+        for item in items:
+            future = Future()
+            self._queue.put((item, future))
+            futures.append(future)
+        return futures
+
+    def map(self, items):
+        """Runs items through the batcher and waits for their results."""
+        return [future.result() for future in self.submit(items)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'mean_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0
+            }
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = self.batch_fn([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+def encode_batch(texts):
+    return semantic_model.encode(texts, batch_size=len(texts), convert_to_numpy=True, normalize_embeddings=True)
+
+def classify_batch(texts):
+    return classifier([text[:BIAS_MODEL_MAX_CHARS] for text in texts])
+
+
+# --- Latency and throughput metrics ---
+class LatencyTracker:
+    """Keeps the most recent request latencies per endpoint for percentile and throughput reports."""
+
+    def __init__(self, window=10000, throughput_seconds=60):
+        self.window = window
+        self.throughput_seconds = throughput_seconds
+        self._samples = {}   # endpoint -> deque of (finished_at, latency_seconds)
+        self._counts = {}    # endpoint -> [requests, errors]
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, latency, error=False):
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.window)).append((time.monotonic(), latency))
+            counts = self._counts.setdefault(endpoint, [0, 0])
+            counts[0] += 1
+            counts[1] += int(error)
+
+    def report(self):
+        now = time.monotonic()
+        report = {}
+        with self._lock:
+            for endpoint, samples in self._samples.items():
+                finished = np.array([sample[0] for sample in samples])
+                latencies = np.array([sample[1] for sample in samples]) * 1000
+                recent = finished >= now - self.throughput_seconds
+                # Throughput over the recent window, measured from its first completed request
+                span = now - finished[recent].min() if recent.any() else 0.0
+                report[endpoint] = {
+                    'requests': self._counts[endpoint][0],
+                    'errors': self._counts[endpoint][1],
+                    'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+                    'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+                    'throughput_rps': round(int(recent.sum()) / span, 2) if span > 0 else 0.0
+                }
+        return report
+
+
+# --- Endpoint handlers ---
+class TalentSiftAPI:
+    """Endpoint logic, independent of the HTTP layer."""
+
+    def __init__(self, max_batch=64, max_wait_ms=5):
+        self.encoder = MicroBatcher(encode_batch, max_batch, max_wait_ms, name="encode-batcher")
+        self.emotions = MicroBatcher(classify_batch, max_batch, max_wait_ms, name="classifier-batcher")
+        self.metrics = LatencyTracker()
+        self.skill_matcher = load_skill_matcher()
+
+    def rank(self, payload):
+        job_description = _required_text(payload, 'job_description')
+        resumes = payload.get('resumes')
+        if not isinstance(resumes, list) or not resumes:
+            raise ValueError("'resumes' must be a non-empty list of {name, text} objects")
+        prepared = []
+        for i, resume in enumerate(resumes):
+            text = _required_text(resume, 'text')
+            prepared.append({'id': _optional_text(resume, 'id') or text_hash(text),
+                             'name': _optional_text(resume, 'name') or f"resume_{i + 1}",
+                             'text': text})
+        resumes = prepared
+
+        # JD and resumes go through the shared encoder, alongside any concurrent requests
+        embeddings = np.vstack(self.encoder.map([job_description] + [resume['text'] for resume in resumes]))
+        results_df = results_from_scores(resumes, embeddings[1:] @ embeddings[0])
+        return {'results': results_df.to_dict(orient='records')}
+
+    def bias(self, payload):
+        job_description = _required_text(payload, 'job_description')
+        emotion_scores, = self.emotions.map([job_description])
+        bias_summary, masculine_counts, feminine_counts, emotion_df = bias_from_emotions(job_description, emotion_scores)
+        return {
+            'summary': bias_summary,
+            'masculine_counts': masculine_counts,
+            'feminine_counts': feminine_counts,
+            'emotions': emotion_df.to_dict(orient='records')
+        }
+
+    def skills(self, payload):
+        job_description = _required_text(payload, 'job_description')
+        resume_text = _required_text(payload, 'resume_text')
+        semantic = payload.get('semantic', False)
+        if not isinstance(semantic, bool):
+            raise ValueError("'semantic' must be true or false")
+        return analyze_skill_match(job_description, parse_resume(resume_text), semantic=semantic)
+
+    def extract(self, body, filename):
+        file = file_from_bytes(body, filename)
+        if file.type is None:
+            raise ValueError("?filename= must end in .pdf or .docx")
+        text = extract_text(file)
+        if not text:
+            raise ValueError(f"Could not extract text from {filename}")
+        parsed = parse_resume(text)
+        return {
+            'id': file_content_hash(file),
+            'name': filename,
+            'text': text,
+            'sections': sorted(parsed.sections),
+            'years_experience': parsed.years_experience,
+            'degree': DEGREE_DISPLAY_NAMES[parsed.degree_level],
+            'skills': [self.skill_matcher.skills[i] for i in sorted(parsed.skill_ids)]
+        }
+
+    def report(self):
+        return {
+            'endpoints': self.metrics.report(),
+            'batching': {'encode': self.encoder.stats(), 'classifier': self.emotions.stats()},
+            'inference': inference_gate.stats()
+        }
+
+
+def _required_text(payload, key):
+    value = payload.get(key) if isinstance(payload, dict) else None
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"'{key}' must be a non-empty string")
+    return value
+
+
+def _optional_text(payload, key):
+    value = payload.get(key)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"'{key}' must be a string")
+    return value
+
+
+# --- HTTP layer ---
+def _to_json(value):
+    """json.dumps fallback for NumPy scalars and arrays."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class APIServer(ThreadingHTTPServer):
+    # The default listen backlog (5) refuses connections under modest concurrent load
+    request_queue_size = 128
+
+
+def make_handler(api):
+    json_routes = {'/rank': api.rank, '/bias': api.bias, '/skills': api.skills}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            # Per-request logging would dominate under load; see /metrics instead
+            pass
+
+        def _send(self, status, payload):
+            body = json.dumps(payload, default=_to_json).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == '/metrics':
+                self._send(200, api.report())
+            elif path == '/health':
+                self._send(200, {'status': 'ok'})
+            else:
+                self._send(404, {'error': f"Unknown endpoint {path}"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path not in json_routes and url.path != '/extract':
+                self._send(404, {'error': f"Unknown endpoint {url.path}"})
+                return
+            started = time.perf_counter()
+            status = 200
+            try:
+                length = self.headers.get("Content-Length") or "0"
+                if not length.isdigit():
+                    raise ValueError("Invalid Content-Length")
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    raise ValueError(f"Request body larger than {MAX_BODY_BYTES} bytes")
+                body = self.rfile.read(length)
+                if url.path == '/extract':
+                    filename = parse_qs(url.query).get('filename', [''])[0]
+                    result = api.extract(body, filename)
+                else:
+                    result = json_routes[url.path](json.loads(body or b"{}"))
+            except ValueError as e:
+                # Request validation raises ValueError (as do json.JSONDecodeError and UnicodeDecodeError);
+                # anything else is a bug on our side
+                status, result = 400, {'error': str(e)}
+            except Exception as e:
+                print(f"Error handling {url.path}: {e}")
+                status, result = 500, {'error': "Internal server error"}
+            api.metrics.record(url.path, time.perf_counter() - started, error=status != 200)
+            self._send(status, result)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentSift AI REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=64, help="Most texts per shared model call")
+    parser.add_argument("--max-wait-ms", type=float, default=5,
+                        help="How long a batch waits for more concurrent requests before running")
+    args = parser.parse_args()
+
+    # Loaded before listening, so the first requests do not pay for it
+    load_models()
+    api = TalentSiftAPI(max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    server = APIServer((args.host, args.port), make_handler(api))
+    print(f"TalentSift API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
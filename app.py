@@ -1,25 +1,19 @@
-import os
-os.environ['TF_USE_LEGACY_KERAS'] = '1'
-os.environ['KERAS_BACKEND'] = 'tensorflow'
-
-# Now your existing imports below
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import numpy as np
-from utils import extract_text
-from advanced_utils import detect_bias, rank_resumes_advanced, generate_insights, analyze_skill_match
-
-# ... rest of your existing code continues unchanged
-
-
 # app.py
+import sqlite3
+import threading
+import time
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
-import plotly.express as px
 import numpy as np
-from utils import extract_text
-from advanced_utils import detect_bias, rank_resumes_advanced, generate_insights, analyze_skill_match
+from utils import extract_text, file_content_hash, text_hash
+from advanced_utils import detect_bias, analyze_skill_match, DEFAULT_SECTION_WEIGHTS, SEMANTIC_MODEL_NAME
+from advanced_utils import build_composite_scorer, DEFAULT_SCORE_WEIGHTS, SCORE_FEATURES, SCORE_FEATURE_LABELS, load_models
+from advanced_utils import CLASSIFIER_KEY
+from resume_parser import parse_resume, parse_skill_requirements, resume_passes_filters, DEGREE_DISPLAY_NAMES
+from pipeline import run_screening_pipeline, ScreeningSession
+from job_queue import submit_job, list_jobs, load_job_result, ensure_workers
+from candidate_store import CandidateStore
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -28,6 +22,127 @@ st.set_page_config(
     layout="wide"
 )
 
+# --- Cached Pipeline Stages ---
+# Every stage is memoized on content hashes (JD text hash, uploaded-file hashes), so widget
+# interactions that rerun this script reuse earlier results instead of recomputing them.
+# Streamlit does not hash arguments whose names start with "_"; the hash keys stand in for them.
+
+@st.cache_data(show_spinner=False, max_entries=5000)
+def cached_extract_resume(file_hash, file_name, _file):
+    """Extracts and parses one uploaded file; None if no text could be extracted."""
+    text = extract_text(_file)
+    if not text:
+        return None
+    # Segment once at extraction time; downstream stages reuse the normalized text
+    return {'id': file_hash, 'name': file_name, 'text': text, 'parsed': parse_resume(text)}
+
+@st.cache_resource
+def get_candidate_store():
+    """One persistent candidate store per server process (shared by all sessions)."""
+    return CandidateStore()
+
+@st.cache_resource
+def start_model_warmup():
+    """
+    Loads the models on a background thread, once per server process: the page renders
+    straight away, and an analysis started before they are ready waits for them.
+    """
+    thread = threading.Thread(target=load_models, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def persist_analysis(store, session, jd_text, jd_hash, section_weighted, new_resumes, new_embeddings, duplicate_resumes=()):
+    """
+    Saves the candidates processed in this run (already stored ones are skipped) and their
+    embeddings, the JD's bias report and this JD's scores for the whole session to the store.
+    """
+    mode = 'sections' if section_weighted else 'full'
+    try:
+        store.add_resumes(list(new_resumes) + list(duplicate_resumes))
+        store.put_embeddings([resume['id'] for resume in new_resumes], new_embeddings, SEMANTIC_MODEL_NAME, mode)
+        store.put_job_description(jd_hash, jd_text, session.bias, CLASSIFIER_KEY)
+        store.put_scores(jd_hash, mode, session.candidates.ids, session.scores)
+    except sqlite3.Error as e:
+        print(f"Could not update candidate store: {e}")
+
+@st.cache_data(show_spinner=False, max_entries=50)
+def cached_detect_bias(jd_hash, _jd_text):
+    return detect_bias(_jd_text)
+
+@st.cache_data(show_spinner=False, max_entries=50)
+def cached_composite_scorer(analysis_key, _jd_text, _resumes, _results_df):
+    return build_composite_scorer(_jd_text, _resumes, _results_df)
+
+@st.cache_data(show_spinner=False, max_entries=1000)
+def cached_skill_analysis(jd_hash, candidate_id, semantic, skills_only, _jd_text, _parsed):
+    return analyze_skill_match(_jd_text, _parsed, semantic=semantic, sections=('skills',) if skills_only else None)
+
+@st.cache_data(show_spinner=False, max_entries=50)
+def cached_bias_figures(jd_hash, _masculine_counts, _feminine_counts):
+    """Bar charts of the coded words that actually appeared in the JD."""
+    # Plotly is imported when the first chart is drawn, not at startup
+    import plotly.express as px
+    figures = []
+    for counts, title in [(_masculine_counts, "Masculine-Coded Words Detected"),
+                          (_feminine_counts, "Feminine-Coded Words Detected")]:
+        words_df = pd.DataFrame(list(counts.items()), columns=['Word', 'Count'])
+        # Only show words that actually appeared
+        words_df = words_df[words_df['Count'] > 0]
+        if not words_df.empty:
+            figures.append(px.bar(words_df, x='Word', y='Count', title=title))
+    return figures
+
+# Score categories for the quality distribution chart
+SCORE_BINS = [0, 30, 50, 70, 85, 100]
+SCORE_LABELS = ['Poor (0-30%)', 'Fair (31-50%)', 'Good (51-70%)', 'Great (71-85%)', 'Excellent (86-100%)']
+
+@st.cache_data(show_spinner=False, max_entries=50)
+def cached_analytics(analysis_key, _results_df):
+    """Summary metrics, charts and the detailed CSV for the Analytics tab, built once per analysis."""
+    import plotly.express as px
+    scores = _results_df['Semantic Similarity Score']
+    analytics = {
+        'avg_score': scores.mean(),
+        'top_score': scores.max(),
+        'qualified_count': int((scores >= 50).sum()),
+        'total_count': len(_results_df),
+    }
+
+    # Score distribution histogram
+    fig = px.histogram(_results_df, x="Semantic Similarity Score", 
+                      title="How Candidates are Distributed Across Scores",
+                      nbins=10,
+                      color_discrete_sequence=['#1f77b4'])
+    fig.update_layout(xaxis_title="Similarity Score (%)", yaxis_title="Number of Candidates")
+    analytics['distribution_fig'] = fig
+
+    # Top 5 Candidates Chart
+    top_5 = _results_df.head(5).copy()
+    top_5['Candidate'] = top_5['Candidate'].str[:30]  # Trim long filenames
+    fig2 = px.bar(top_5, x='Candidate', y='Semantic Similarity Score',
+                 title="Top Performing Candidates",
+                 color='Semantic Similarity Score',
+                 color_continuous_scale='Viridis')
+    fig2.update_layout(xaxis_title="Candidate", yaxis_title="Score (%)")
+    analytics['top_5_fig'] = fig2
+    analytics['top_5_count'] = len(top_5)
+
+    # Score categories go on a copy, so the stored results are never modified in place
+    report_df = _results_df.copy()
+    report_df['Score Category'] = pd.cut(report_df['Semantic Similarity Score'], 
+                                        bins=SCORE_BINS, 
+                                        labels=SCORE_LABELS, 
+                                        right=True)
+    category_counts = report_df['Score Category'].value_counts().sort_index()
+    analytics['category_fig'] = px.pie(values=category_counts.values, 
+                                       names=category_counts.index,
+                                       title="Candidate Quality Distribution",
+                                       color_discrete_sequence=px.colors.sequential.Viridis)
+    analytics['comprehensive_csv'] = report_df.to_csv(index=False)
+    return analytics
+
+start_model_warmup()
+
 # --- Header ---
 st.title("🤖 TalentSift AI")
 st.markdown("""
@@ -135,6 +250,21 @@ if 'processed_data' not in st.session_state:
     st.session_state.processed_data = None
 if 'bias_analysis' not in st.session_state:
     st.session_state.bias_analysis = None
+# Candidates analysed so far, kept by content hash so later runs only process new uploads
+if 'screening_session' not in st.session_state:
+    st.session_state.screening_session = None
+# Content hashes of uploaded files by upload ID, so unchanged uploads are not re-hashed on every run
+if 'upload_hashes' not in st.session_state:
+    st.session_state.upload_hashes = {}
+
+def uploaded_file_key(file):
+    """Content hash of an uploaded file (its candidate ID), computed once per upload."""
+    file_id = getattr(file, 'file_id', None)
+    if file_id is None:
+        return file_content_hash(file)
+    if file_id not in st.session_state.upload_hashes:
+        st.session_state.upload_hashes[file_id] = file_content_hash(file)
+    return st.session_state.upload_hashes[file_id]
 
 # --- File Upload Section (Always visible) ---
 st.header("📁 Upload Materials")
@@ -145,8 +275,64 @@ with col1:
 with col2:
     uploaded_files = st.file_uploader("Upload Resumes (PDF/DOCX)", type=['pdf', 'docx'], accept_multiple_files=True)
 
+# --- Optional hard filters, applied before ranking ---
+with st.expander("🎯 Hard Filters (optional)"):
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
+    with filter_col1:
+        min_years_filter = st.number_input("Minimum years of experience", min_value=0.0, max_value=50.0, value=0.0, step=1.0)
+    with filter_col2:
+        min_degree_filter = st.selectbox("Minimum degree", list(DEGREE_DISPLAY_NAMES), format_func=DEGREE_DISPLAY_NAMES.get)
+    with filter_col3:
+        skill_years_filter = st.text_input("Minimum years per skill", placeholder="python:5, kubernetes:2",
+                                           help="Comma-separated skill:years pairs; skill synonyms are recognised")
+
+use_section_weights = st.checkbox(
+    "📑 Section-weighted ranking",
+    help="Score resumes on a weighted mix of their sections (experience and skills count most) instead of the whole text"
+)
+collapse_duplicates = st.checkbox(
+    "🧬 Collapse near-duplicate resumes", value=True,
+    help="Rank lightly edited copies of the same resume (re-applications, several agencies) once, under the first copy"
+)
+
 # --- CREATE THE BUTTON ---
-process_button = st.button("🚀 Analyze Applications", type="primary", use_container_width=True)
+button_col1, button_col2 = st.columns([3, 1])
+with button_col1:
+    process_button = st.button("🚀 Analyze Applications", type="primary", use_container_width=True)
+with button_col2:
+    queue_button = st.button("🗂️ Run in Background", use_container_width=True,
+                             help="Queue the screening as a background job (for large uploads); it keeps running if you close this tab")
+
+def screening_settings_key(section_weighted, collapse_duplicates, min_years, min_degree, min_skill_years):
+    """What a screening session's stored resume-side results depend on (see ScreeningSession)."""
+    return (section_weighted, collapse_duplicates, min_years, min_degree, tuple(sorted(min_skill_years.items())))
+
+def store_analysis(session, jd_text, jd_hash, section_weighted):
+    """Builds the composite scorer for a screening session and stores its results for the tabs below."""
+    resumes_data = session.candidates
+    results_df = session.results_df()
+    bias_summary, masculine_counts, feminine_counts, emotion_df = session.bias
+    
+    # Cache keys for this analysis: the JD content and the (filtered) set of resumes
+    analysis_key = (jd_hash, resumes_data.fingerprint(), section_weighted)
+    
+    # Insights were generated per candidate as they joined the session
+    # Feature columns for the composite score; re-weighting later is a single dot product
+    composite_scorer = cached_composite_scorer(analysis_key, jd_text, resumes_data, results_df)
+    
+    st.session_state.processed_data = {
+        'jd_text': jd_text,
+        'jd_hash': jd_hash,
+        'analysis_key': analysis_key,
+        'results_df': results_df,
+        'resumes_data': resumes_data,
+        'composite_scorer': composite_scorer,
+        'masculine_counts': masculine_counts,
+        'feminine_counts': feminine_counts,
+        'emotion_df': emotion_df
+    }
+    st.session_state.bias_analysis = bias_summary
+    return results_df
 
 # --- Processing Logic ---
 if process_button:
@@ -159,70 +345,107 @@ if process_button:
         
         # Update progress - Initialization
         status_text.text("🔍 Initializing AI models...")
-        progress_bar.progress(10)
-        
-        # 1. Extract text from resumes
-        status_text.text("📄 Extracting text from resumes...")
-        progress_bar.progress(20)
         
-        resumes_data = []
-        problem_files = [] # List to track failed files
-
+        # Hard filters are checked per resume as it streams in, before it is encoded
+        min_skill_years, unknown_skills = parse_skill_requirements(skill_years_filter)
+        if unknown_skills:
+            st.warning(f"⚠️ Unknown skills in filter were ignored: **{', '.join(unknown_skills)}**")
+        accept_fn = None
+        if min_years_filter or min_degree_filter or min_skill_years:
+            accept_fn = lambda resume: resume_passes_filters(resume['parsed'], min_years=min_years_filter,
+                                                             min_degree=min_degree_filter,
+                                                             min_skill_years=min_skill_years)
+        
+        jd_hash = text_hash(jd_text)
+        
+        # Keep the previous session while the ranking options are unchanged, so only new files are
+        # processed; a JD edit alone re-scores the stored embeddings instead of starting over
+        settings_key = screening_settings_key(use_section_weights, collapse_duplicates, min_years_filter,
+                                              min_degree_filter, min_skill_years)
+        session = st.session_state.screening_session
+        if session is None or session.settings_key != settings_key:
+            session = ScreeningSession(settings_key, collapse_duplicates=collapse_duplicates)
+        file_keys = {}
         for file in uploaded_files:
-            text = extract_text(file)
-            if text:
-                resumes_data.append({'name': file.name, 'text': text})
-            else:
-                problem_files.append(file.name)
-
+            file_keys.setdefault(uploaded_file_key(file), file)
+        session.retain(file_keys)
+        new_files = {key: file for key, file in file_keys.items() if not session.has_file(key)}
+        reused_count = len(session)
+        
+        def show_progress(extracted, encoded, total):
+            # Real per-file progress: each file counts once when extracted and once when encoded
+            progress_bar.progress(int(100 * (extracted + encoded) / (2 * max(total, 1)) * 0.9))
+            status_text.text(f"📄 Extracted {extracted}/{total} · 🧠 Encoded {encoded}/{total} · ⚖️ Bias check shares the model slots with encoding")
+        
+        # Worker threads need the script context to use the Streamlit caches
+        script_ctx = get_script_run_ctx()
+        
+        # Candidates, embeddings and bias reports from earlier sessions come from the persistent store
+        candidate_store = get_candidate_store()
+        # (embeddings are only held for this run; the session keeps its own float16 copy)
+        stored_resumes = candidate_store.load_resumes(list(new_files))
+        embedding_cache = candidate_store.get_embeddings(list(new_files), SEMANTIC_MODEL_NAME,
+                                                         'sections' if use_section_weights else 'full')
+        
+        def extract_resume(file):
+            key = uploaded_file_key(file)
+            if key in stored_resumes:
+                return dict(stored_resumes[key], name=file.name)
+            return cached_extract_resume(key, file.name, file)
+        
+        # 1-3. Extract, check the JD for bias and encode resumes as overlapping stages
+        pipeline_result = run_screening_pipeline(
+            jd_text,
+            list(new_files.values()),
+            extract_fn=extract_resume,
+            bias_fn=lambda jd: candidate_store.get_bias(jd_hash, CLASSIFIER_KEY) or cached_detect_bias(jd_hash, jd),
+            section_weights=DEFAULT_SECTION_WEIGHTS if use_section_weights else None,
+            accept_fn=accept_fn,
+            duplicate_fn=session.find_duplicate if collapse_duplicates else None,
+            embedding_cache=embedding_cache,
+            on_progress=show_progress,
+            thread_initializer=lambda: add_script_run_ctx(threading.current_thread(), script_ctx)
+        )
+        # A changed JD re-scores the stored candidates; new scores are then merged into the ranking
+        rescore_started = time.perf_counter()
+        jd_changed = session.set_job_description(jd_hash, pipeline_result['jd_embedding'], pipeline_result['bias']) and reused_count > 0
+        rescore_seconds = time.perf_counter() - rescore_started
+        session.add(jd_text, pipeline_result, {key: file.name for key, file in new_files.items()})
+        st.session_state.screening_session = session
+        # Collapsed duplicates are stored too (without embeddings), so they are never re-extracted
+        persist_analysis(candidate_store, session, jd_text, jd_hash, use_section_weights,
+                         pipeline_result['resumes'], pipeline_result['embeddings'],
+                         [resume for resume, _ in pipeline_result['duplicates']])
+        resumes_data = session.candidates
+        problem_files = list(session.problem_files.values())
+
+        if jd_changed:
+            st.info(f"✏️ Job description changed: re-ranked {reused_count} stored candidate(s) in {rescore_seconds * 1000:.0f} ms without re-encoding their resumes.")
+        elif reused_count:
+            st.info(f"♻️ Reused {reused_count} previously analysed resume(s); processed {len(new_files)} new file(s).")
         # Warn user about any files that failed extraction
         if problem_files:
             st.warning(f"⚠️ Could not extract text from: **{', '.join(problem_files)}**. They may be image-based scans and were excluded from analysis.")
+        if session.rejected:
+            st.info(f"🎯 {len(session.rejected)} candidate(s) did not meet the hard filters and were excluded.")
+        if session.duplicates:
+            st.info(f"🧬 {len(session.duplicates)} near-duplicate resume(s) were collapsed into an earlier copy (see the Duplicates column).")
 
         if not resumes_data:
-            st.error("No text could be extracted from any of the uploaded files. Please check your files and try again.")
+            if len(problem_files) == len(file_keys):
+                st.error("No text could be extracted from any of the uploaded files. Please check your files and try again.")
+            else:
+                st.error("No candidates meet the hard filters. Relax the filters and try again.")
             st.stop()
         
-        # Update progress
-        status_text.text("⚖️ Analyzing job description for bias...")
-        progress_bar.progress(40)
-        
-        # 2. Perform Bias Analysis on JD
-        bias_summary, masculine_counts, feminine_counts, emotion_df = detect_bias(jd_text)
-        
-        # Update progress  
-        status_text.text("📊 Ranking resumes with AI intelligence...")
-        progress_bar.progress(60)
-        
-        # 3. Rank resumes with ADVANCED semantic similarity
-        results_df = rank_resumes_advanced(jd_text, resumes_data)
-        
-        # Update progress
-        status_text.text("💡 Generating AI insights for candidates...")
-        progress_bar.progress(80)
-        
-        # 4. Generate insights for top 5 candidates
-        insights = []
-        for i in range(min(5, len(resumes_data))):
-            insight = generate_insights(jd_text, resumes_data[i]['text'])
-            insights.append(insight)
-        
-        # Add insights to the dataframe
-        results_df['AI Insights'] = insights + [""] * (len(results_df) - len(insights))
-        
         # Update progress
         status_text.text("✅ Finalizing results and generating reports...")
         progress_bar.progress(95)
         
-        # 5. Store results in session state
-        st.session_state.processed_data = {
-            'results_df': results_df,
-            'resumes_data': resumes_data,
-            'masculine_counts': masculine_counts,
-            'feminine_counts': feminine_counts,
-            'emotion_df': emotion_df
-        }
-        st.session_state.bias_analysis = bias_summary
+        processing_seconds = pipeline_result['timings']['total_seconds']
+        
+        # 4-5. Composite scoring, then store results in session state
+        results_df = store_analysis(session, jd_text, jd_hash, use_section_weights)
         
         # Complete progress
         progress_bar.progress(100)
@@ -248,7 +471,213 @@ if process_button:
             st.metric("Qualified", f"{qualified}/{len(results_df)}")
 
         with stats_col4:
-            st.metric("Processing Time", "Under 60s")
+            st.metric("Processing Time", f"{processing_seconds:.1f}s")
+
+# --- Background Jobs (large uploads) ---
+JOB_POLL_SECONDS = 2
+
+# Job IDs are also kept in the URL, so reopening it after closing the tab finds the jobs again
+if 'background_jobs' not in st.session_state:
+    st.session_state.background_jobs = st.query_params.get_all('job')
+
+if queue_button:
+    if not jd_text.strip() or not uploaded_files:
+        st.error("Please provide both a Job Description and at least one resume.")
+    else:
+        min_skill_years, unknown_skills = parse_skill_requirements(skill_years_filter)
+        if unknown_skills:
+            st.warning(f"⚠️ Unknown skills in filter were ignored: **{', '.join(unknown_skills)}**")
+        job_id = submit_job(jd_text, [(file.name, file.getvalue()) for file in uploaded_files], options={
+            'section_weighted': use_section_weights,
+            'collapse_duplicates': collapse_duplicates,
+            'min_years': min_years_filter,
+            'min_degree': min_degree_filter,
+            'min_skill_years': min_skill_years
+        })
+        ensure_workers()
+        st.session_state.background_jobs.append(job_id)
+        st.query_params['job'] = st.session_state.background_jobs
+        st.success(f"🗂️ Queued background job `{job_id}` for {len(uploaded_files)} resume(s). "
+                   "You can close this tab; reopen this page's URL to check on it.")
+
+def load_background_job(job_id):
+    """Loads a finished job into a screening session, as if it had been analysed in this tab."""
+    result = load_job_result(job_id)
+    options = result['options']
+    section_weighted = bool(options.get('section_weighted'))
+    jd_text = result['job_description']
+    jd_hash = text_hash(jd_text)
+    collapse = bool(options.get('collapse_duplicates'))
+    session = ScreeningSession(screening_settings_key(section_weighted, collapse, options.get('min_years', 0.0),
+                                                      options.get('min_degree', 0), options['min_skill_years']),
+                               collapse_duplicates=collapse)
+    session.set_job_description(jd_hash, result['jd_embedding'], result['bias'])
+    session.add(jd_text, result, result['file_keys'])
+    st.session_state.screening_session = session
+    # Later runs (in any tab) can reuse the job's candidates and embeddings
+    persist_analysis(get_candidate_store(), session, jd_text, jd_hash, section_weighted,
+                     result['resumes'], result['embeddings'])
+    store_analysis(session, jd_text, jd_hash, section_weighted)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_background_jobs(job_ids):
+    """Polls the job queue; only this block reruns while jobs are in progress."""
+    st.subheader("🗂️ Background Jobs")
+    for job in list_jobs(job_ids):
+        job_col1, job_col2 = st.columns([4, 1])
+        with job_col1:
+            label = f"Job `{job['id']}` · {job['status']} · {job['processed_files']}/{job['total_files']} files"
+            if job['status'] == 'done':
+                label += (f" · {job['accepted']} ranked, {job['failed']} unreadable, {job['rejected']} filtered out, "
+                          f"{job['duplicates']} duplicates")
+            elif job['status'] == 'failed':
+                label += f" · {job['error']}"
+            st.progress(job['processed_files'] / max(job['total_files'], 1), text=label)
+        with job_col2:
+            if job['status'] == 'done' and st.button("📥 Load Results", key=f"load_job_{job['id']}", use_container_width=True):
+                load_background_job(job['id'])
+                st.rerun(scope="app")
+
+if st.session_state.background_jobs:
+    render_background_jobs(st.session_state.background_jobs)
+
+# --- Candidate Drill-Down (interaction-only region) ---
+@st.fragment
+def render_candidate_detail(processed_data, ranked_df):
+    """
+    Detailed skill analysis for one candidate. Runs as a fragment, so changing the
+    selected candidate or the matching options reruns only this block.
+    """
+    resumes_data = processed_data['resumes_data']
+    if len(resumes_data) > 0:
+        st.markdown("---")
+        st.subheader("🔍 Detailed Candidate Analysis")
+
+        # Keyed by Candidate ID: different uploads can share a file name (those labels show the ID too)
+        candidate_names = dict(zip(ranked_df['Candidate ID'], ranked_df['Candidate']))
+        name_counts = ranked_df['Candidate'].value_counts()
+        selected_candidate = st.selectbox(
+            "Select a candidate for detailed skill analysis:",
+            ranked_df['Candidate ID'].tolist(),
+            format_func=lambda candidate_id: (candidate_names[candidate_id] if name_counts[candidate_names[candidate_id]] == 1
+                                              else f"{candidate_names[candidate_id]} ({candidate_id})"),
+            help="Choose a candidate to see detailed skill matching analysis"
+        )
+        option_col1, option_col2 = st.columns(2)
+        with option_col1:
+            use_semantic_skills = st.checkbox(
+                "🧠 Semantic skill matching",
+                help="Also count JD skills the resume describes in other words (e.g. 'neural nets in Torch' for PyTorch)"
+            )
+        with option_col2:
+            skills_section_only = st.checkbox(
+                "📌 Skills section only",
+                help="Match only against the resume's skills section (falls back to the full resume if it has none)"
+            )
+
+        if selected_candidate:
+            row = resumes_data.row_by_id.get(selected_candidate)
+            if row is not None:
+                # Rebuilt from the compact candidate table for this one candidate
+                candidate_data = resumes_data.resume(row)
+                # Get skill analysis
+                skill_analysis = cached_skill_analysis(processed_data['jd_hash'], candidate_data['id'],
+                                                       use_semantic_skills, skills_section_only,
+                                                       processed_data['jd_text'], candidate_data['parsed'])
+
+                # Create expandable detailed analysis section
+                with st.expander("📋 Detailed Score Breakdown", expanded=True):
+                    # Overall score card
+                    candidate_score = ranked_df[ranked_df['Candidate ID'] == selected_candidate]['Composite Score'].values[0]
+
+                    score_col1, score_col2, score_col3 = st.columns(3)
+
+                    with score_col1:
+                        st.metric("Overall Score", f"{candidate_score}%")
+
+                    with score_col2:
+                        st.metric("Technical Skills Match", f"{skill_analysis['technical_skills_match']}%")
+
+                    with score_col3:
+                        st.metric("Soft Skills Match", f"{skill_analysis['soft_skills_match']}%")
+
+                    st.markdown("---")
+
+                    # Skills analysis in columns
+                    col1, col2 = st.columns(2)
+
+                    with col1:
+                        st.subheader("🛠️ Technical Skills")
+
+                        if skill_analysis['matching_tech_skills']:
+                            st.success(f"**✅ Matching ({len(skill_analysis['matching_tech_skills'])}/{skill_analysis['jd_tech_skills_count']})**")
+                            for skill in skill_analysis['matching_tech_skills']:
+                                semantic_match = skill_analysis['semantic_matches'].get(skill)
+                                if semantic_match:
+                                    st.markdown(f"▪️ {skill.title()} 🧠", help=f"Semantic match: \"{semantic_match['evidence']}\"")
+                                else:
+                                    st.write(f"▪️ {skill.title()}")
+                        else:
+                            st.info("No technical skills matches found")
+
+                        if skill_analysis['missing_tech_skills']:
+                            st.error(f"**⚠️ Missing ({len(skill_analysis['missing_tech_skills'])} skills)**")
+                            for skill in skill_analysis['missing_tech_skills']:
+                                st.write(f"▪️ {skill.title()}")
+
+                    with col2:
+                        st.subheader("💬 Soft Skills")
+
+                        if skill_analysis['matching_soft_skills']:
+                            st.success(f"**✅ Matching ({len(skill_analysis['matching_soft_skills'])}/{skill_analysis['jd_soft_skills_count']})**")
+                            for skill in skill_analysis['matching_soft_skills']:
+                                semantic_match = skill_analysis['semantic_matches'].get(skill)
+                                if semantic_match:
+                                    st.markdown(f"▪️ {skill.title()} 🧠", help=f"Semantic match: \"{semantic_match['evidence']}\"")
+                                else:
+                                    st.write(f"▪️ {skill.title()}")
+                        else:
+                            st.info("No soft skills matches found")
+
+                        if skill_analysis['missing_soft_skills']:
+                            st.error(f"**⚠️ Missing ({len(skill_analysis['missing_soft_skills'])} skills)**")
+                            for skill in skill_analysis['missing_soft_skills']:
+                                st.write(f"▪️ {skill.title()}")
+
+                    # Category-level breakdown from the skill taxonomy
+                    category_rows = [
+                        {'Category': category['label'],
+                         'Matched': f"{category['matched']}/{category['required']}",
+                         'Match %': category['match_pct']}
+                        for category in skill_analysis['category_match'].values()
+                        if category['parent'] is not None
+                    ]
+                    if category_rows:
+                        st.markdown("---")
+                        st.subheader("🗂️ Skill Category Match")
+                        st.dataframe(
+                            pd.DataFrame(category_rows),
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={
+                                "Match %": st.column_config.ProgressColumn(
+                                    format="%.1f%%",
+                                    min_value=0,
+                                    max_value=100,
+                                )
+                            }
+                        )
+
+                    # Recommendations based on analysis
+                    st.markdown("---")
+                    st.subheader("🎯 Recommendations")
+
+                    if skill_analysis['technical_skills_match'] >= 70:
+                        st.success("**Strong Technical Fit**: Candidate has most required technical skills. Proceed to technical interview.")
+                    elif skill_analysis['technical_skills_match'] >= 40:
+                        st.warning("**Partial Technical Fit**: Some key skills missing. Consider skills assessment or training plan.")
+                    else:
+                        st.error("**Weak Technical Fit**: Major skills gaps. May not be suitable for this role.")
 
 # --- Create Tabs for Results ---
 if st.session_state.processed_data:
@@ -258,85 +687,24 @@ if st.session_state.processed_data:
         st.header("📊 Candidate Ranking & Analysis")
         results_df = st.session_state.processed_data['results_df']
         resumes_data = st.session_state.processed_data['resumes_data']
+        composite_scorer = st.session_state.processed_data['composite_scorer']
+        
+        # --- SCORING WEIGHTS: instant re-rank without recomputing any features ---
+        with st.expander("⚖️ Scoring Weights", expanded=False):
+            weight_cols = st.columns(len(SCORE_FEATURES))
+            score_weights = {}
+            for weight_col, feature in zip(weight_cols, SCORE_FEATURES):
+                with weight_col:
+                    score_weights[feature] = st.slider(SCORE_FEATURE_LABELS[feature], 0, 100,
+                                                       int(DEFAULT_SCORE_WEIGHTS[feature] * 100), step=5)
+            st.caption("Weights are relative; they are normalized to sum to 100%.")
+        
+        extra_columns = [column for column in ['AI Insights', 'Duplicates'] if column in results_df.columns]
+        ranked_df = composite_scorer.rank(score_weights).merge(
+            results_df[['Candidate ID'] + extra_columns].drop_duplicates('Candidate ID'), on='Candidate ID', how='left')
         
         # --- NEW: SCORE BREAKDOWN SECTION ---
-        if len(resumes_data) > 0:
-            st.markdown("---")
-            st.subheader("🔍 Detailed Candidate Analysis")
-            
-            selected_candidate = st.selectbox(
-                "Select a candidate for detailed skill analysis:",
-                results_df['Candidate'].tolist(),
-                help="Choose a candidate to see detailed skill matching analysis"
-            )
-            
-            if selected_candidate:
-                candidate_data = next((resume for resume in resumes_data if resume['name'] == selected_candidate), None)
-                if candidate_data:
-                    # Get skill analysis
-                    skill_analysis = analyze_skill_match(jd_text, candidate_data['text'])
-                    
-                    # Create expandable detailed analysis section
-                    with st.expander("📋 Detailed Score Breakdown", expanded=True):
-                        # Overall score card
-                        candidate_score = results_df[results_df['Candidate'] == selected_candidate]['Semantic Similarity Score'].values[0]
-                        
-                        score_col1, score_col2, score_col3 = st.columns(3)
-                        
-                        with score_col1:
-                            st.metric("Overall Score", f"{candidate_score}%")
-                        
-                        with score_col2:
-                            st.metric("Technical Skills Match", f"{skill_analysis['technical_skills_match']}%")
-                        
-                        with score_col3:
-                            st.metric("Soft Skills Match", f"{skill_analysis['soft_skills_match']}%")
-                        
-                        st.markdown("---")
-                        
-                        # Skills analysis in columns
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.subheader("🛠️ Technical Skills")
-                            
-                            if skill_analysis['matching_tech_skills']:
-                                st.success(f"**✅ Matching ({len(skill_analysis['matching_tech_skills'])}/{skill_analysis['jd_tech_skills_count']})**")
-                                for skill in skill_analysis['matching_tech_skills']:
-                                    st.write(f"▪️ {skill.title()}")
-                            else:
-                                st.info("No technical skills matches found")
-                            
-                            if skill_analysis['missing_tech_skills']:
-                                st.error(f"**⚠️ Missing ({len(skill_analysis['missing_tech_skills'])} skills)**")
-                                for skill in skill_analysis['missing_tech_skills']:
-                                    st.write(f"▪️ {skill.title()}")
-                        
-                        with col2:
-                            st.subheader("💬 Soft Skills")
-                            
-                            if skill_analysis['matching_soft_skills']:
-                                st.success(f"**✅ Matching ({len(skill_analysis['matching_soft_skills'])}/{skill_analysis['jd_soft_skills_count']})**")
-                                for skill in skill_analysis['matching_soft_skills']:
-                                    st.write(f"▪️ {skill.title()}")
-                            else:
-                                st.info("No soft skills matches found")
-                            
-                            if skill_analysis['missing_soft_skills']:
-                                st.error(f"**⚠️ Missing ({len(skill_analysis['missing_soft_skills'])} skills)**")
-                                for skill in skill_analysis['missing_soft_skills']:
-                                    st.write(f"▪️ {skill.title()}")
-                        
-                        # Recommendations based on analysis
-                        st.markdown("---")
-                        st.subheader("🎯 Recommendations")
-                        
-                        if skill_analysis['technical_skills_match'] >= 70:
-                            st.success("**Strong Technical Fit**: Candidate has most required technical skills. Proceed to technical interview.")
-                        elif skill_analysis['technical_skills_match'] >= 40:
-                            st.warning("**Partial Technical Fit**: Some key skills missing. Consider skills assessment or training plan.")
-                        else:
-                            st.error("**Weak Technical Fit**: Major skills gaps. May not be suitable for this role.")
+        render_candidate_detail(st.session_state.processed_data, ranked_df)
         
         # --- MAIN RESULTS TABLE ---
         st.markdown("---")
@@ -344,23 +712,28 @@ if st.session_state.processed_data:
         
         # Display with nice formatting
         st.dataframe(
-            results_df,
+            ranked_df,
             use_container_width=True,
             hide_index=True,
+            column_order=["Rank", "Candidate", "Composite Score", "Semantic Similarity %", "Technical Skills %",
+                          "Soft Skills %", "Years Experience", "Degree", "AI Insights"]
+                         + (["Duplicates"] if "Duplicates" in ranked_df.columns else []),
             column_config={
                 "Rank": st.column_config.NumberColumn(width="small"),
                 "Candidate": st.column_config.TextColumn(width="medium"),
-                "Semantic Similarity Score": st.column_config.ProgressColumn(
+                "Composite Score": st.column_config.ProgressColumn(
                     format="%.2f%%",
                     min_value=0,
                     max_value=100,
+                    help="Weighted mix of the feature scores (see Scoring Weights)"
                 ),
-                "AI Insights": st.column_config.TextColumn(width="large", help="AI-generated summary of candidate fit")
+                "AI Insights": st.column_config.TextColumn(width="large", help="AI-generated summary of candidate fit"),
+                "Duplicates": st.column_config.TextColumn(width="medium", help="Near-duplicate copies collapsed into this candidate")
             }
         )
         
         # Download button
-        csv = results_df.to_csv(index=False)
+        csv = ranked_df.to_csv(index=False)
         st.download_button("💾 Download Ranking Results", data=csv, file_name="candidate_ranking.csv", mime="text/csv")
     
     with tab2:
@@ -375,20 +748,10 @@ if st.session_state.processed_data:
             st.metric("Overall Emotional Tone", bias_summary["JD Emotional Tone"].title())
             st.write("") # Spacer
         
-        # Create visualizations for word counts
-        masculine_df = pd.DataFrame(list(st.session_state.processed_data['masculine_counts'].items()), columns=['Word', 'Count'])
-        feminine_df = pd.DataFrame(list(st.session_state.processed_data['feminine_counts'].items()), columns=['Word', 'Count'])
-        
-        # Only show words that actually appeared
-        masculine_df = masculine_df[masculine_df['Count'] > 0]
-        feminine_df = feminine_df[feminine_df['Count'] > 0]
-        
-        if not masculine_df.empty:
-            fig = px.bar(masculine_df, x='Word', y='Count', title="Masculine-Coded Words Detected")
-            st.plotly_chart(fig, use_container_width=True)
-        
-        if not feminine_df.empty:
-            fig = px.bar(feminine_df, x='Word', y='Count', title="Feminine-Coded Words Detected")
+        # Create visualizations for word counts (built once per JD)
+        for fig in cached_bias_figures(st.session_state.processed_data['jd_hash'],
+                                       st.session_state.processed_data['masculine_counts'],
+                                       st.session_state.processed_data['feminine_counts']):
             st.plotly_chart(fig, use_container_width=True)
         
         st.info("""
@@ -401,63 +764,33 @@ if st.session_state.processed_data:
     with tab3:
         st.header("📈 Advanced Analytics")
         results_df = st.session_state.processed_data['results_df']
+        analytics = cached_analytics(st.session_state.processed_data['analysis_key'], results_df)
+        avg_score, top_score = analytics['avg_score'], analytics['top_score']
+        qualified_count, total_count = analytics['qualified_count'], analytics['total_count']
         
         # Create two columns for metrics
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            avg_score = results_df['Semantic Similarity Score'].mean()
             st.metric("Average Score", f"{avg_score:.1f}%")
         
         with col2:
-            top_score = results_df['Semantic Similarity Score'].max()
             st.metric("Highest Score", f"{top_score:.1f}%")
         
         with col3:
-            qualified_count = len(results_df[results_df['Semantic Similarity Score'] >= 50])
-            total_count = len(results_df)
             st.metric("Qualified Candidates", f"{qualified_count}/{total_count}")
 
         # Score distribution histogram
         st.subheader("Score Distribution")
-        fig = px.histogram(results_df, x="Semantic Similarity Score", 
-                          title="How Candidates are Distributed Across Scores",
-                          nbins=10,
-                          color_discrete_sequence=['#1f77b4'])
-        fig.update_layout(xaxis_title="Similarity Score (%)", yaxis_title="Number of Candidates")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(analytics['distribution_fig'], use_container_width=True)
 
         # Top 5 Candidates Chart
         st.subheader("Top 5 Candidates Comparison")
-        top_5 = results_df.head(5).copy()
-        top_5['Candidate'] = top_5['Candidate'].str[:30]  # Trim long filenames
-        
-        fig2 = px.bar(top_5, x='Candidate', y='Semantic Similarity Score',
-                     title="Top Performing Candidates",
-                     color='Semantic Similarity Score',
-                     color_continuous_scale='Viridis')
-        fig2.update_layout(xaxis_title="Candidate", yaxis_title="Score (%)")
-        st.plotly_chart(fig2, use_container_width=True)
+        st.plotly_chart(analytics['top_5_fig'], use_container_width=True)
 
         # Score Analysis Section
         st.subheader("📊 Score Analysis")
-        
-        # Create score categories
-        score_bins = [0, 30, 50, 70, 85, 100]
-        score_labels = ['Poor (0-30%)', 'Fair (31-50%)', 'Good (51-70%)', 'Great (71-85%)', 'Excellent (86-100%)']
-        
-        results_df['Score Category'] = pd.cut(results_df['Semantic Similarity Score'], 
-                                            bins=score_bins, 
-                                            labels=score_labels, 
-                                            right=True)
-        
-        category_counts = results_df['Score Category'].value_counts().sort_index()
-        
-        fig3 = px.pie(values=category_counts.values, 
-                     names=category_counts.index,
-                     title="Candidate Quality Distribution",
-                     color_discrete_sequence=px.colors.sequential.Viridis)
-        st.plotly_chart(fig3, use_container_width=True)
+        st.plotly_chart(analytics['category_fig'], use_container_width=True)
 
         # Detailed Recommendations
         st.subheader("🎯 Actionable Recommendations")
@@ -492,8 +825,8 @@ if st.session_state.processed_data:
             
             st.error("**Immediate Next Steps:**")
             st.write(f"""
-            - **Interview Slots**: Schedule {min(3, len(top_5))} interviews this week
-            - **Assessment**: Send technical test to top {min(5, len(top_5))} candidates
+            - **Interview Slots**: Schedule {min(3, analytics['top_5_count'])} interviews this week
+            - **Assessment**: Send technical test to top {min(5, analytics['top_5_count'])} candidates
             - **Timeline**: Complete first round within 7 days
             - **Feedback**: Provide updates to all candidates within 48 hours
             """)
@@ -516,7 +849,7 @@ if st.session_state.processed_data:
         
         with col4:
             # Download detailed report
-            comprehensive_csv = results_df.to_csv(index=False)
+            comprehensive_csv = analytics['comprehensive_csv']
             st.download_button("💾 Download Detailed Report", 
                              data=comprehensive_csv, 
                              file_name="comprehensive_analysis.csv", 
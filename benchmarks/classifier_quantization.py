@@ -0,0 +1,166 @@
+# benchmarks/classifier_quantization.py
+"""
+int8 classifier report: the emotion classifier with dynamically quantized int8 linear layers
+and embeddings (TALENTSIFT_CLASSIFIER_PRECISION=int8) against full precision, on a JD corpus.
+
+    python -m benchmarks.classifier_quantization --jds 200 --output quantization.json
+    python -m benchmarks.classifier_quantization --jd-dir ./job_descriptions
+
+Each precision runs in its own fresh process, so load time and memory are not mixed up.
+Per precision: model weight bytes, process memory after loading (RSS and USS, Linux),
+and per-JD latency of the classifier call detect_bias makes (one JD per call, as the app
+does). Agreement: the share of JDs whose tone label (the top emotion, which detect_bias
+reports) is the same, the largest score differences, and the JDs that disagree.
+JDs are generated (benchmarks/corpus.py) unless --jd-dir holds .txt files.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.run_benchmarks import environment_info
+
+MB = 2 ** 20
+
+
+def jd_corpus(count, jd_dir=None, seed=0):
+    """`count` JD texts: the .txt files in jd_dir, or generated ones."""
+    if jd_dir:
+        texts = []
+        for path in sorted(glob.glob(os.path.join(jd_dir, "*.txt")))[:count]:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                texts.append(f.read())
+        if not texts:
+            raise ValueError(f"No .txt job descriptions in {jd_dir}")
+        return texts
+    from benchmarks.corpus import _corpus_skills, jd_text
+    skills, weights = _corpus_skills(seed, "zipf", 1.1)
+    return [jd_text(seed + i, skills, weights)[0] for i in range(count)]
+
+
+def _label_scores(output):
+    """{label: score} from one text's pipeline output (all scores, or only the top one)."""
+    if isinstance(output, dict):
+        output = [output]
+    return {entry['label']: float(entry['score']) for entry in output}
+
+
+def _measure_precision(precision, texts, repeat, conn):
+    os.environ["TALENTSIFT_CLASSIFIER_PRECISION"] = precision
+    from prefork_pool import process_memory
+    from model_bundle import model_bytes
+    import advanced_utils
+
+    started = time.perf_counter()
+    advanced_utils.classifier.model.load()
+    load_seconds = time.perf_counter() - started
+    memory = process_memory()
+    texts = [text[:advanced_utils.BIAS_MODEL_MAX_CHARS] for text in texts]
+    advanced_utils.classifier(texts[0])  # warm-up
+    latencies, scores = [], []
+    for _ in range(repeat):
+        for text in texts:
+            call_started = time.perf_counter()
+            output = advanced_utils.classifier(text)
+            latencies.append(time.perf_counter() - call_started)
+            if len(scores) < len(texts):
+                scores.append(_label_scores(output[0] if isinstance(output, list) else output))
+    conn.send({'precision': advanced_utils.CLASSIFIER_PRECISION,
+               'load_seconds': round(load_seconds, 3),
+               'model_mb': round(model_bytes(advanced_utils.classifier.model.load().model) / MB, 1),
+               'rss_mb': round(memory['rss'] / MB, 1) if memory else None,
+               'uss_mb': round(memory['uss'] / MB, 1) if memory else None,
+               'latency_ms': {'p50': round(float(np.percentile(latencies, 50)) * 1000, 2),
+                              'p95': round(float(np.percentile(latencies, 95)) * 1000, 2),
+                              'mean': round(float(np.mean(latencies)) * 1000, 2)},
+               'scores': scores})
+    conn.close()
+
+
+def measure_precision(precision, texts, repeat=1):
+    """Runs the classifier at `precision` on every text in a fresh ("spawn") process."""
+    context = multiprocessing.get_context("spawn")
+    reader, writer = context.Pipe(duplex=False)
+    process = context.Process(target=_measure_precision, args=(precision, texts, repeat, writer),
+                              name=f"classifier-{precision}")
+    process.start()
+    writer.close()
+    try:
+        return reader.recv()
+    except EOFError:
+        process.join()
+        raise RuntimeError(f"{precision} classifier run failed (exit code {process.exitcode})")
+    finally:
+        process.join()
+
+
+def agreement(reference_scores, candidate_scores):
+    """Tone-label agreement and score differences of candidate against reference, per JD."""
+    same, differences, disagreements = 0, [], []
+    for index, (reference, candidate) in enumerate(zip(reference_scores, candidate_scores)):
+        reference_label = max(reference, key=reference.get)
+        candidate_label = max(candidate, key=candidate.get)
+        if reference_label == candidate_label:
+            same += 1
+        else:
+            disagreements.append({'jd': index, 'float32': reference_label, 'int8': candidate_label,
+                                  'float32_score': round(reference[reference_label], 4),
+                                  'int8_score': round(candidate[candidate_label], 4)})
+        differences.extend(abs(reference[label] - candidate[label]) for label in reference if label in candidate)
+    return {'jds': len(reference_scores),
+            'label_agreement': round(same / len(reference_scores), 4) if reference_scores else None,
+            'mean_abs_score_diff': round(float(np.mean(differences)), 4) if differences else None,
+            'max_abs_score_diff': round(float(np.max(differences)), 4) if differences else None,
+            'disagreements': disagreements}
+
+
+def run_quantization_report(jds=100, jd_dir=None, repeat=1):
+    texts = jd_corpus(jds, jd_dir)
+    runs = {precision: measure_precision(precision, texts, repeat) for precision in ("float32", "int8")}
+    for precision, run in runs.items():
+        if run['precision'] != precision:
+            raise RuntimeError(f"Asked for a {precision} classifier, got {run['precision']}")
+    result = agreement(runs['float32'].pop('scores'), runs['int8'].pop('scores'))
+    full, int8 = runs['float32'], runs['int8']
+    return {
+        'meta': environment_info(),
+        'settings': {'jds': len(texts), 'jd_dir': jd_dir, 'repeat': repeat},
+        'precisions': runs,
+        'agreement': result,
+        'speedup': round(full['latency_ms']['p50'] / int8['latency_ms']['p50'], 2) if int8['latency_ms']['p50'] else None,
+        'model_size_ratio': round(int8['model_mb'] / full['model_mb'], 3) if full['model_mb'] else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="int8 vs float32 emotion classifier report")
+    parser.add_argument("--jds", type=int, default=100, help="Job descriptions to classify")
+    parser.add_argument("--jd-dir", help="Folder of .txt job descriptions (default: generated ones)")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the JDs for the latency figures")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    report = run_quantization_report(args.jds, args.jd_dir, args.repeat)
+    for precision, run in report['precisions'].items():
+        memory = f", {run['uss_mb']:.0f} MB process USS" if run['uss_mb'] is not None else ""
+        print(f"{precision:>7}: p50 {run['latency_ms']['p50']:.1f} ms per JD, model {run['model_mb']:.0f} MB{memory}",
+              file=sys.stderr)
+    result = report['agreement']
+    print(f"int8 is {report['speedup']}x faster at {report['model_size_ratio']:.0%} of the model size; "
+          f"tone label agrees on {result['label_agreement']:.1%} of {result['jds']} JDs "
+          f"(mean score difference {result['mean_abs_score_diff']})", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
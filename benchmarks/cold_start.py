@@ -0,0 +1,112 @@
+# benchmarks/cold_start.py
+"""
+Cold-start report: time from a fresh interpreter to the first ranking, loading the models
+from the hub cache or from an offline model bundle (see model_bundle.py).
+
+    python model_bundle.py bundle-models ./models
+    python -m benchmarks.cold_start --bundle ./models --repeat 5 --output cold_start.json
+
+Every run is a new Python process, as a fresh container start is. Each reports the time
+to import advanced_utils, to load both models (advanced_utils.load_models), to the first
+ranking (rank_resumes_advanced plus detect_bias on a small synthetic batch) and in total,
+measured from before the process was launched. Medians over --repeat runs per mode.
+Run the hub mode with the models already in the hub cache, so downloads are not measured.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.run_benchmarks import REPO_DIR, environment_info
+
+# Runs in the fresh process; argv: launch time (time.time()), path of the JSON with the JD and resumes
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import advanced_utils
+imported = time.perf_counter()
+advanced_utils.load_models()
+loaded = time.perf_counter()
+with open(sys.argv[2], encoding="utf-8") as f:
+    sample = json.load(f)
+advanced_utils.rank_resumes_advanced(sample['job_description'], sample['resumes'])
+advanced_utils.detect_bias(sample['job_description'])
+ranked = time.perf_counter()
+print(json.dumps({'bundle': advanced_utils.model_bundle is not None,
+                  'import_seconds': imported - started,
+                  'load_seconds': loaded - imported,
+                  'first_ranking_seconds': ranked - loaded,
+                  'total_seconds': time.time() - float(sys.argv[1])}))
+"""
+
+
+def cold_start_run(sample_path, bundle):
+    """One fresh process; bundle is a bundle folder, or None to load from the hub."""
+    env = dict(os.environ, TALENTSIFT_MODEL_BUNDLE=os.path.abspath(bundle) if bundle else "none")
+    completed = subprocess.run([sys.executable, "-c", CHILD_SCRIPT, repr(time.time()), sample_path], cwd=REPO_DIR,
+                               env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Cold start run failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_cold_start(bundle=None, repeat=3, resumes=20):
+    from benchmarks.encode_scaling import synthetic_texts
+    from benchmarks.corpus import _corpus_skills, jd_text
+
+    skills, weights = _corpus_skills(0, "zipf", 1.1)
+    sample = {'job_description': jd_text(0, skills, weights)[0],
+              'resumes': [{'id': str(i), 'name': f"resume_{i}", 'text': text}
+                          for i, text in enumerate(synthetic_texts(resumes))]}
+    modes = {'hub': None}
+    if bundle:
+        modes['bundle'] = bundle
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sample_path = os.path.join(temp_dir, "sample.json")
+        with open(sample_path, "w", encoding="utf-8") as f:
+            json.dump(sample, f)
+        for mode, bundle_dir in modes.items():
+            runs = [cold_start_run(sample_path, bundle_dir) for _ in range(repeat)]
+            if bundle_dir and not all(run['bundle'] for run in runs):
+                raise RuntimeError(f"{bundle_dir} was not used as a model bundle (see model_bundle.py info)")
+            results[mode] = {key: round(float(np.median([run[key] for run in runs])), 3)
+                             for key in ('import_seconds', 'load_seconds', 'first_ranking_seconds', 'total_seconds')}
+            results[mode]['runs'] = len(runs)
+    report = {'meta': environment_info(), 'settings': {'repeat': repeat, 'resumes': resumes}, 'modes': results}
+    if 'bundle' in results:
+        report['reduction'] = {key: round(1 - results['bundle'][key] / results['hub'][key], 3)
+                               for key in ('load_seconds', 'total_seconds') if results['hub'][key] > 0}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentSift AI cold-start report")
+    parser.add_argument("--bundle", help="Model bundle folder to compare against loading from the hub")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh processes per mode")
+    parser.add_argument("--resumes", type=int, default=20, help="Resumes in the first ranking")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    report = run_cold_start(args.bundle, args.repeat, args.resumes)
+    for mode, result in report['modes'].items():
+        print(f"{mode:>7}: import {result['import_seconds']:.2f}s, model load {result['load_seconds']:.2f}s, "
+              f"first ranking {result['first_ranking_seconds']:.2f}s, "
+              f"time to first ranking {result['total_seconds']:.2f}s", file=sys.stderr)
+    if 'reduction' in report:
+        print(f"Bundle cuts time to first ranking by {report['reduction']['total_seconds']:.0%}", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
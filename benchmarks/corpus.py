@@ -0,0 +1,311 @@
+# benchmarks/corpus.py
+"""
+Deterministic synthetic corpus of resumes and job descriptions (PDF and DOCX).
+
+The same seed and options always give byte-identical files, so benchmark runs on
+different machines or releases measure the same inputs. Every document is generated
+from its own seed (corpus seed + index), so large corpora are built in parallel.
+
+    python -m benchmarks.corpus bench_corpus --resumes 1000 --jds 5 --seed 0
+    python -m benchmarks.corpus bench_corpus --resumes 100000 --workers 8 --skill-distribution uniform
+
+Skills are drawn from the skill taxonomy, either Zipf-distributed (a few skills are very
+common, as in real resumes) or uniformly. A corpus.json manifest records the options and,
+per document, its file name, format and the facts it was generated with (skills, years,
+degree), so accuracy checks can compare against them.
+"""
+import argparse
+import io
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+from docx import Document
+
+from skill_matcher import load_skill_matcher
+
+MANIFEST_NAME = "corpus.json"
+# Fixed timestamp for DOCX metadata and zip entries, so files are byte-identical between runs
+FIXED_DATETIME = datetime(2024, 1, 1)
+FIXED_ZIP_DATE = (2024, 1, 1, 0, 0, 0)
+# Generated careers run up to this year (fixed, so files never change with the date; jobs marked
+# "Present" parse as running until today, so parsed experience can exceed the manifest's years)
+CORPUS_YEAR = 2024
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Priya", "Wei", "Maria", "Kofi", "Elena", "Omar", "Yuki",
+               "Lena", "Carlos", "Aisha", "Tom", "Ingrid", "Ravi", "Chen", "Fatima", "Noah", "Sofia"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Okafor", "Novak", "Kim", "Silva", "Müller", "Haddad",
+              "Jensen", "Rossi", "Tanaka", "Nguyen", "Cohen", "Ivanova", "Brown", "Khan", "Lopez", "Berg"]
+JOB_TITLES = ["Software Engineer", "Data Scientist", "Backend Developer", "Machine Learning Engineer",
+              "DevOps Engineer", "Data Analyst", "Frontend Developer", "Platform Engineer", "QA Engineer",
+              "Product Analyst"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Analytics",
+             "Hooli", "Vandelay Imports", "Soylent Systems", "Tyrell Data"]
+UNIVERSITIES = ["State University", "Institute of Technology", "City College", "National University"]
+DEGREES = [(0, None), (1, "Diploma in Computing"), (2, "Bachelor of Science in Computer Science"),
+           (3, "Master of Science in Data Science"), (4, "PhD in Machine Learning")]
+DEGREE_WEIGHTS = [0.05, 0.1, 0.5, 0.28, 0.07]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+ACTIONS = ["Built", "Designed", "Maintained", "Led the migration of", "Optimized", "Automated", "Delivered",
+           "Scaled", "Refactored", "Monitored"]
+OBJECTS = ["a customer-facing service", "the data platform", "internal reporting pipelines",
+           "a recommendation engine", "the billing system", "a real-time analytics dashboard",
+           "deployment tooling", "the search backend", "an ETL workflow", "a mobile API"]
+FILLER = ["working closely with product and design", "reducing latency by a third", "for millions of users",
+          "across three regions", "with a team of five engineers", "improving reliability",
+          "while mentoring junior colleagues", "ahead of schedule"]
+# Gender-coded words (see advanced_utils.detect_bias) sprinkled into some JDs
+JD_CODED_WORDS = ["aggressive", "competitive", "confident", "decisive", "collaborative", "committed",
+                  "empathy", "interpersonal", "responsive", "supportive"]
+
+
+# --- Text generation ---
+def _skill_weights(n_skills, distribution, zipf_exponent):
+    if distribution == "uniform":
+        return np.full(n_skills, 1.0 / n_skills)
+    weights = 1.0 / np.arange(1, n_skills + 1) ** zipf_exponent
+    return weights / weights.sum()
+
+
+def _draw_skills(rng, skills, weights, count):
+    """Distinct skills drawn with the corpus distribution (weights follow a seeded shuffle of the taxonomy)."""
+    count = min(count, len(skills))
+    picks = rng.choice(len(skills), size=count, replace=False, p=weights)
+    return [skills[i] for i in picks]
+
+
+def resume_text(seed, skills, weights, min_words=300, max_words=800, mean_skills=12):
+    """
+    One synthetic resume (plain text with section headings) and the facts it was built from.
+    Length is drawn uniformly between min_words and max_words; experience bullets are added
+    until it is reached.
+    """
+    rng = np.random.RandomState(seed)
+    pick = lambda options: options[rng.randint(len(options))]
+    resume_skills = _draw_skills(rng, skills, weights, max(1, rng.poisson(mean_skills)))
+    target_words = rng.randint(min_words, max_words + 1)
+    degree_level, degree = DEGREES[rng.choice(len(DEGREES), p=DEGREE_WEIGHTS)]
+
+    # Consecutive jobs, most recent first, ending at present
+    jobs, end_year = [], CORPUS_YEAR
+    for job in range(rng.randint(1, 5)):
+        start_year = end_year - rng.randint(1, 5)
+        jobs.append((pick(JOB_TITLES), pick(COMPANIES), rng.randint(12), start_year, end_year, job == 0))
+        end_year = start_year
+    years = CORPUS_YEAR - end_year
+
+    lines = [f"{pick(FIRST_NAMES)} {pick(LAST_NAMES)}", f"candidate{seed}@example.com",
+             "", "Summary",
+             f"{jobs[0][0]} with {years} years of experience in {', '.join(resume_skills[:3])}.",
+             "", "Experience"]
+    bullet_positions = []
+    for title, company, month, start_year, job_end_year, current in jobs:
+        lines.append(f"{title}, {company}")
+        lines.append(f"{MONTHS[month]} {start_year} - {'Present' if current else f'{MONTHS[month]} {job_end_year}'}")
+        bullet_positions.append(len(lines))
+    word_count = sum(len(line.split()) for line in lines) + len(resume_skills) + 20
+    # Bullets go round-robin under the jobs until the target length is reached
+    job_bullets = [[] for _ in jobs]
+    i = 0
+    while word_count < target_words:
+        bullet = f"- {pick(ACTIONS)} {pick(OBJECTS)} using {pick(resume_skills)}, {pick(FILLER)}."
+        job_bullets[i % len(jobs)].append(bullet)
+        word_count += len(bullet.split())
+        i += 1
+    for job_index in reversed(range(len(jobs))):
+        position = bullet_positions[job_index]
+        lines[position:position] = job_bullets[job_index]
+
+    lines += ["", "Skills", ", ".join(resume_skills)]
+    if degree:
+        lines += ["", "Education", f"{degree}, {pick(UNIVERSITIES)}, {end_year - rng.randint(0, 3)}"]
+    facts = {'skills': resume_skills, 'years_experience': years, 'degree_level': degree_level}
+    return "\n".join(lines), facts
+
+
+def jd_text(seed, skills, weights, mean_skills=8):
+    """One synthetic job description and the requirements it states."""
+    rng = np.random.RandomState(seed)
+    pick = lambda options: options[rng.randint(len(options))]
+    title = pick(JOB_TITLES)
+    required = _draw_skills(rng, skills, weights, max(1, rng.poisson(mean_skills)))
+    years = rng.randint(1, 9)
+    degree_level, degree = DEGREES[rng.randint(2, 4)]
+    coded = [pick(JD_CODED_WORDS) for _ in range(rng.randint(0, 4))]
+    lines = [f"{title}", "", f"{pick(COMPANIES)} is hiring a {title} to join a {' and '.join(coded) or 'friendly'} team.",
+             "", "Responsibilities"]
+    lines += [f"- {pick(ACTIONS)} {pick(OBJECTS)} using {skill}." for skill in required]
+    lines += ["", "Requirements", f"- {years}+ years of experience", f"- {degree.split(' in ')[0]} degree or equivalent",
+              f"- Strong skills in {', '.join(required)}"]
+    facts = {'skills': required, 'years_experience': years, 'degree_level': degree_level}
+    return "\n".join(lines), facts
+
+
+# --- File formats ---
+def make_docx(text):
+    """DOCX bytes with one paragraph per line (fixed metadata and zip dates)."""
+    document = Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    properties = document.core_properties
+    properties.created = properties.modified = properties.last_printed = FIXED_DATETIME
+    buffer = io.BytesIO()
+    document.save(buffer)
+    # python-docx stamps zip entries with the current time; rewrite them with a fixed one
+    normalized = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as source, \
+            zipfile.ZipFile(normalized, "w", zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            target.writestr(zipfile.ZipInfo(info.filename, date_time=FIXED_ZIP_DATE), source.read(info.filename),
+                            compress_type=zipfile.ZIP_DEFLATED)
+    return normalized.getvalue()
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text, lines_per_page=60, wrap=95):
+    """
+    Minimal text PDF (Helvetica 10pt, Latin-1), readable by PyPDF2.
+    Written directly, so generating large corpora needs no PDF library.
+    """
+    wrapped = []
+    for line in text.split("\n"):
+        while len(line) > wrap:
+            cut = line.rfind(" ", 0, wrap)
+            cut = cut if cut > 0 else wrap
+            wrapped.append(line[:cut])
+            line = line[cut:].lstrip()
+        wrapped.append(line)
+    pages = [wrapped[i:i + lines_per_page] for i in range(0, len(wrapped), lines_per_page)] or [[]]
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for page_lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td\n" + "".join(f"({_pdf_escape(line)}) Tj T*\n" for line in page_lines) + "ET"
+        stream = stream.encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects)))
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids))
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    output.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+# --- Corpus ---
+@lru_cache(maxsize=4)
+def _corpus_skills(seed, distribution, zipf_exponent):
+    """Taxonomy skills in a seeded order, with the sampling weights of the chosen distribution."""
+    skills = load_skill_matcher().skills
+    skills = [skills[i] for i in np.random.RandomState(seed).permutation(len(skills))]
+    return skills, _skill_weights(len(skills), distribution, zipf_exponent)
+
+
+def _write_document(task):
+    """Generates and writes one document (runs in a worker process). Returns its manifest entry."""
+    kind, index, options = task
+    skills, weights = _corpus_skills(options['seed'], options['skill_distribution'], options['zipf_exponent'])
+    seed = options['seed'] * 1_000_003 + index + (0 if kind == "resume" else 500_000_000)
+    if kind == "resume":
+        text, facts = resume_text(seed, skills, weights, options['min_words'], options['max_words'],
+                                  options['mean_skills'])
+    else:
+        text, facts = jd_text(seed, skills, weights)
+    file_format = options['formats'][index % len(options['formats'])] if kind == "resume" else "txt"
+    file_name = f"{kind}_{index:06d}.{file_format}"
+    if file_format == "pdf":
+        content = make_pdf(text)
+    elif file_format == "docx":
+        content = make_docx(text)
+    else:
+        content = text.encode("utf-8")
+    folder = "resumes" if kind == "resume" else "jds"
+    with open(os.path.join(options['out_dir'], folder, file_name), "wb") as f:
+        f.write(content)
+    return dict(facts, file=f"{folder}/{file_name}", format=file_format)
+
+
+def generate_corpus(out_dir, resumes=100, jds=3, seed=0, formats=("pdf", "docx"), min_words=300, max_words=800,
+                    mean_skills=12, skill_distribution="zipf", zipf_exponent=1.1, workers=None):
+    """
+    Writes out_dir/resumes/*.pdf|docx, out_dir/jds/*.txt and the corpus.json manifest.
+    Resume formats alternate in the order given. Returns the manifest.
+    """
+    options = {'out_dir': out_dir, 'seed': seed, 'formats': list(formats), 'min_words': min_words,
+               'max_words': max_words, 'mean_skills': mean_skills, 'skill_distribution': skill_distribution,
+               'zipf_exponent': zipf_exponent}
+    for folder in ("resumes", "jds"):
+        os.makedirs(os.path.join(out_dir, folder), exist_ok=True)
+    tasks = [("resume", i, options) for i in range(resumes)] + [("jd", i, options) for i in range(jds)]
+    if workers == 1:
+        documents = [_write_document(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            documents = list(executor.map(_write_document, tasks, chunksize=64))
+    manifest = {
+        'options': {key: value for key, value in options.items() if key != 'out_dir'},
+        'resumes': [document for document in documents if document['file'].startswith("resumes/")],
+        'jds': [document for document in documents if document['file'].startswith("jds/")]
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def load_corpus(corpus_dir):
+    """The corpus manifest, with each document's bytes (resumes) or text (JDs) under 'content'."""
+    with open(os.path.join(corpus_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    for document in manifest['resumes']:
+        with open(os.path.join(corpus_dir, document['file']), "rb") as f:
+            document['content'] = f.read()
+    for document in manifest['jds']:
+        with open(os.path.join(corpus_dir, document['file']), encoding="utf-8") as f:
+            document['content'] = f.read()
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume/JD corpus for benchmarks")
+    parser.add_argument("out_dir")
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--jds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--formats", default="pdf,docx", help="Comma-separated resume formats, used in turn")
+    parser.add_argument("--min-words", type=int, default=300)
+    parser.add_argument("--max-words", type=int, default=800)
+    parser.add_argument("--mean-skills", type=int, default=12, help="Average number of skills per resume")
+    parser.add_argument("--skill-distribution", choices=["zipf", "uniform"], default="zipf")
+    parser.add_argument("--zipf-exponent", type=float, default=1.1)
+    parser.add_argument("--workers", type=int, default=None, help="Generator processes (default: CPU count)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    manifest = generate_corpus(args.out_dir, args.resumes, args.jds, args.seed, args.formats.split(","),
+                               args.min_words, args.max_words, args.mean_skills, args.skill_distribution,
+                               args.zipf_exponent, args.workers)
+    print(f"Wrote {len(manifest['resumes'])} resumes and {len(manifest['jds'])} JDs to {args.out_dir} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
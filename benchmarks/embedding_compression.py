@@ -0,0 +1,149 @@
+# benchmarks/embedding_compression.py
+"""
+Compressed embedding report: recall@k of ranking from compressed embeddings (embedding_codec.py)
+against exact float32 cosine ranking, with memory and scoring time per codec.
+
+    python -m benchmarks.embedding_compression --candidates 20000 --queries 50 --output compression.json
+    python -m benchmarks.embedding_compression --db ~/.cache/talentsift/candidates.sqlite3 --codecs float16,pq:48
+
+The candidate pool is the store's embeddings (--db) or freshly encoded synthetic resumes
+(benchmarks/corpus.py); queries are encoded JDs (generated, or the .txt files in --jd-dir).
+Each codec is trained on a sample of the pool, as candidate_store.py compress does.
+recall@k is the share of the exact top k found in the codec's top k; shortlist recall@k is
+the share found in the codec's top --shortlist * k, for re-ranking a shortlist exactly.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.run_benchmarks import environment_info
+
+DEFAULT_CODECS = "float16,pca:128,pq:96,pq:48"
+
+
+def candidate_pool(candidates, db_path=None, mode='full', seed=0):
+    """float32 unit-length candidate embeddings: from the store, or `candidates` encoded synthetic resumes."""
+    if db_path:
+        from candidate_store import CandidateStore
+        from model_bundle import SEMANTIC_MODEL_NAME
+        store = CandidateStore(db_path)
+        try:
+            _, _, embeddings = store.load_embedding_shard(SEMANTIC_MODEL_NAME, mode)
+        finally:
+            store.close()
+        if not len(embeddings):
+            raise ValueError(f"No {SEMANTIC_MODEL_NAME} ({mode}) embeddings in {db_path}")
+        return embeddings[:candidates] if candidates else embeddings
+    from advanced_utils import semantic_model
+    from benchmarks.encode_scaling import synthetic_texts
+    return semantic_model.encode(synthetic_texts(candidates, seed), batch_size=32, convert_to_numpy=True,
+                                 normalize_embeddings=True).astype(np.float32)
+
+
+def _top(scores, k):
+    top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    return set(top.tolist())
+
+
+def _time_scores(codec, codes, queries):
+    codec.scores(codes, queries[0])  # warm-up
+    started = time.perf_counter()
+    results = [codec.scores(codes, query) for query in queries]
+    return results, (time.perf_counter() - started) / len(queries)
+
+
+def evaluate_codec(spec, embeddings, queries, exact_scores, ks, shortlist, sample_size):
+    from embedding_codec import make_codec
+    sample = embeddings[::max(1, len(embeddings) // sample_size)][:sample_size]
+    started = time.perf_counter()
+    codec = make_codec(spec).fit(sample)
+    fit_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    codes = codec.encode(embeddings)
+    encode_seconds = time.perf_counter() - started
+    approximate_scores, seconds_per_query = _time_scores(codec, codes, queries)
+    recall, shortlist_recall = {}, {}
+    for k in ks:
+        exact_top = [_top(scores, k) for scores in exact_scores]
+        recall[k] = round(float(np.mean([len(top & _top(scores, k)) / len(top)
+                                         for top, scores in zip(exact_top, approximate_scores)])), 4)
+        shortlist_recall[k] = round(float(np.mean([len(top & _top(scores, shortlist * k)) / len(top)
+                                                   for top, scores in zip(exact_top, approximate_scores)])), 4)
+    return {
+        'codec': codec.spec,
+        'bytes_per_vector': codec.bytes_per_vector(),
+        'compression': round(embeddings.shape[1] * 4 / codec.bytes_per_vector(), 1),
+        'pool_mb': round(codes.nbytes / 2 ** 20, 2),
+        'fit_seconds': round(fit_seconds, 2),
+        'encode_seconds': round(encode_seconds, 2),
+        'score_ms_per_query': round(seconds_per_query * 1000, 2),
+        'recall_at_k': recall,
+        'shortlist_recall_at_k': shortlist_recall,
+        'mean_abs_score_error': round(float(np.mean([np.abs(approximate - exact).mean()
+                                                     for approximate, exact in zip(approximate_scores, exact_scores)])), 5)
+    }
+
+
+def run_compression_report(codecs, candidates=20000, queries=50, db_path=None, mode='full', jd_dir=None,
+                           ks=(10, 50, 100), shortlist=4, sample_size=None):
+    from advanced_utils import semantic_model
+    from benchmarks.classifier_quantization import jd_corpus
+    from candidate_store import COMPRESS_SAMPLE_SIZE
+    from embedding_codec import make_codec
+
+    embeddings = np.ascontiguousarray(candidate_pool(candidates, db_path, mode), dtype=np.float32)
+    jd_embeddings = semantic_model.encode(jd_corpus(queries, jd_dir), batch_size=32, convert_to_numpy=True,
+                                          normalize_embeddings=True).astype(np.float32)
+    ks = [k for k in ks if k <= len(embeddings)]
+    reference = make_codec("float32").fit(embeddings[:1])
+    exact_scores, exact_seconds = _time_scores(reference, embeddings, jd_embeddings)
+    results = [evaluate_codec(spec, embeddings, jd_embeddings, exact_scores, ks, shortlist,
+                              sample_size or COMPRESS_SAMPLE_SIZE)
+               for spec in codecs]
+    return {
+        'meta': environment_info(),
+        'settings': {'candidates': len(embeddings), 'dimension': int(embeddings.shape[1]), 'queries': len(jd_embeddings),
+                     'source': db_path or "synthetic", 'mode': mode, 'ks': ks, 'shortlist': shortlist},
+        'float32': {'bytes_per_vector': int(embeddings.shape[1] * 4), 'pool_mb': round(embeddings.nbytes / 2 ** 20, 2),
+                    'score_ms_per_query': round(exact_seconds * 1000, 2)},
+        'codecs': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed embedding recall@k report")
+    parser.add_argument("--codecs", default=DEFAULT_CODECS, help="Comma-separated codec specs (see embedding_codec.py)")
+    parser.add_argument("--candidates", type=int, default=20000, help="Pool size (with --db: at most this many; 0 = all)")
+    parser.add_argument("--queries", type=int, default=50, help="JDs to rank the pool for")
+    parser.add_argument("--db", help="Use this candidate store's embeddings as the pool")
+    parser.add_argument("--mode", choices=['full', 'sections'], default='full')
+    parser.add_argument("--jd-dir", help="Folder of .txt job descriptions (default: generated ones)")
+    parser.add_argument("--k", default="10,50,100", help="Comma-separated k values for recall@k")
+    parser.add_argument("--shortlist", type=int, default=4, help="Shortlist size as a multiple of k")
+    parser.add_argument("--sample", type=int, default=None, help="Embeddings to train each codec on")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    report = run_compression_report([spec.strip() for spec in args.codecs.split(",") if spec.strip()],
+                                    args.candidates, args.queries, args.db, args.mode, args.jd_dir,
+                                    [int(k) for k in args.k.split(",")], args.shortlist, args.sample)
+    baseline = report['float32']
+    print(f"float32: {baseline['bytes_per_vector']} B per candidate, {baseline['score_ms_per_query']:.1f} ms per JD",
+          file=sys.stderr)
+    for result in report['codecs']:
+        recall = ", ".join(f"@{k} {value:.3f}" for k, value in result['recall_at_k'].items())
+        print(f"{result['codec']:>8}: {result['bytes_per_vector']} B ({result['compression']}x smaller), "
+              f"{result['score_ms_per_query']:.1f} ms per JD, recall {recall}", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
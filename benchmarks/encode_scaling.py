@@ -0,0 +1,79 @@
+# benchmarks/encode_scaling.py
+"""
+Scaling of sharded encoding (sharded_encoder.ShardedEncoder) with the number of processes.
+
+    python -m benchmarks.encode_scaling --texts 20000 --processes 1,2,4,8,16 --output scaling.json
+
+Encodes the same synthetic resume texts (see benchmarks/corpus.py) once in-process, as
+rank_resumes_advanced does, and then with each process count. Reports texts per second,
+speedup over the in-process run and parallel efficiency (speedup / processes).
+Pool start-up (forking, model loading) is excluded; it is reported as startup_seconds.
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.corpus import _corpus_skills, resume_text
+from benchmarks.run_benchmarks import environment_info
+
+
+def synthetic_texts(count, seed=0):
+    skills, weights = _corpus_skills(seed, "zipf", 1.1)
+    return [resume_text(seed * 1_000_003 + i, skills, weights)[0] for i in range(count)]
+
+
+def run_scaling(texts, process_counts, chunk_size=256, batch_size=32):
+    from advanced_utils import semantic_model
+    from sharded_encoder import ShardedEncoder
+
+    started = time.perf_counter()
+    semantic_model.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+    baseline = time.perf_counter() - started
+    levels = [{'processes': 0, 'label': "in-process", 'seconds': round(baseline, 3),
+               'texts_per_second': round(len(texts) / baseline, 1), 'speedup': 1.0, 'efficiency': None}]
+    for processes in process_counts:
+        started = time.perf_counter()
+        with ShardedEncoder(processes=processes, chunk_size=chunk_size, batch_size=batch_size) as encoder:
+            encoder.encode(texts[:processes * batch_size])   # start every worker and load its model
+            startup = time.perf_counter() - started
+            started = time.perf_counter()
+            encoder.encode(texts)
+            seconds = time.perf_counter() - started
+        levels.append({
+            'processes': processes,
+            'label': f"{processes} processes",
+            'seconds': round(seconds, 3),
+            'startup_seconds': round(startup, 3),
+            'texts_per_second': round(len(texts) / seconds, 1),
+            'speedup': round(baseline / seconds, 2),
+            'efficiency': round(baseline / seconds / processes, 2)
+        })
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded encoder scaling benchmark")
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--processes", default="1,2,4,8", help="Comma-separated process counts")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    texts = synthetic_texts(args.texts)
+    levels = run_scaling(texts, [int(count) for count in args.processes.split(",")], args.chunk_size, args.batch_size)
+    for level in levels:
+        print(f"{level['label']:>14}: {level['texts_per_second']:>9.1f} texts/s, speedup {level['speedup']:.2f}x",
+              file=sys.stderr)
+    results = {'meta': environment_info(), 'texts': len(texts), 'levels': levels}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/import_budget.py
+"""
+Import-time budget: what starting the app costs before the first page renders.
+
+    python -m benchmarks.import_budget --budget-ms 3000 --output import_budget.json
+
+Runs the top-level imports of an entry script (app.py by default) in a fresh interpreter
+under `python -X importtime` and checks two things:
+
+- no heavy library is imported at startup: TensorFlow/Keras/JAX must not be imported at
+  all, and torch, transformers, sentence-transformers and plotly.express only once they
+  are used (the models load on first use or on the warm-up thread, see
+  advanced_utils.load_models),
+- the total import time stays within --budget-ms.
+
+Exits with code 1 if either check fails, so it can gate CI. Reports the slowest top-level
+imports (cumulative, i.e. with everything they import).
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+
+from benchmarks.run_benchmarks import REPO_DIR, environment_info
+
+DEFAULT_BUDGET_MS = 3000
+# Modules (and their submodules) that must not be imported when the entry script starts
+FORBIDDEN_MODULES = ("tensorflow", "keras", "tf_keras", "jax", "flax", "torch", "transformers",
+                     "sentence_transformers", "plotly.express")
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def entry_imports(path):
+    """Modules imported at the top level of a script (not inside functions), in order."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return modules
+
+
+def profile_imports(modules):
+    """
+    Imports the modules in a fresh interpreter under -X importtime. Returns one entry per
+    imported module: name, self and cumulative microseconds, and nesting depth (1 = top level).
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.environ.get("PYTHONPATH")])))
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+                               cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{completed.stderr[-2000:]}")
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports.append({'module': match.group(4), 'self_us': int(match.group(1)),
+                            'cumulative_us': int(match.group(2)), 'depth': (len(match.group(3)) + 1) // 2})
+    return imports
+
+
+def forbidden_imports(imports, forbidden=FORBIDDEN_MODULES):
+    """The forbidden modules that were imported, themselves or through a submodule."""
+    names = {entry['module'] for entry in imports}
+    return [module for module in forbidden
+            if any(name == module or name.startswith(module + ".") for name in names)]
+
+
+def run_import_budget(entry="app.py", budget_ms=DEFAULT_BUDGET_MS, top=15):
+    modules = entry_imports(os.path.join(REPO_DIR, entry))
+    imports = profile_imports(modules)
+    top_level = [entry for entry in imports if entry['depth'] == 1]
+    total_ms = sum(entry['cumulative_us'] for entry in top_level) / 1000
+    forbidden = forbidden_imports(imports)
+    slowest = sorted(top_level, key=lambda entry: entry['cumulative_us'], reverse=True)[:top]
+    return {
+        'meta': environment_info(),
+        'settings': {'entry': entry, 'budget_ms': budget_ms, 'forbidden_modules': list(FORBIDDEN_MODULES)},
+        'entry_imports': modules,
+        'total_ms': round(total_ms, 1),
+        'modules_imported': len(imports),
+        'slowest': [{'module': entry['module'], 'cumulative_ms': round(entry['cumulative_us'] / 1000, 1)}
+                    for entry in slowest],
+        'forbidden_imported': forbidden,
+        'within_budget': total_ms <= budget_ms,
+        'passed': total_ms <= budget_ms and not forbidden
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentSift AI import-time budget check")
+    parser.add_argument("--entry", default="app.py", help="Script whose top-level imports are profiled")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Allowed total import time")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to report")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    report = run_import_budget(args.entry, args.budget_ms, args.top)
+    for entry in report['slowest'][:5]:
+        print(f"{entry['module']:>30}: {entry['cumulative_ms']:.0f} ms", file=sys.stderr)
+    print(f"Startup imports: {report['total_ms']:.0f} ms (budget {args.budget_ms:.0f} ms), "
+          f"{report['modules_imported']} modules", file=sys.stderr)
+    if report['forbidden_imported']:
+        print(f"Imported at startup but should load on first use: {', '.join(report['forbidden_imported'])}",
+              file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if not report['passed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# benchmarks/load_test.py
+"""
+Load test: N recruiters analysing resumes at the same time on one app host.
+
+Streamlit runs every browser session as a thread of one server process, sharing the
+loaded models. Each simulated session here is such a thread, driving the code paths
+app.py uses for an analysis: the streaming screening pipeline (extraction, JD bias check,
+batched encoding), a ScreeningSession (insights, scoring, ranking), the composite scorer
+and the skill drill-down of the top candidate.
+
+    python -m benchmarks.load_test --corpus bench_corpus --concurrency 1,2,4,8 --batch-size 50
+    python -m benchmarks.load_test --resumes 200 --concurrency 1,4 --output load.json
+
+Per concurrency level it reports analyses and resumes per second, analysis latency
+percentiles, peak RSS and CPU utilisation (process CPU time over wall time, as a share
+of the cores it may use). --inference-slots, --torch-threads and --cpu-cores set the
+inference layer's configuration (see inference.py), so configurations can be compared.
+Models are loaded from the local cache only (HF_HUB_OFFLINE), so a run never touches
+the network; download them once beforehand.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.corpus import generate_corpus, load_corpus
+from benchmarks.run_benchmarks import environment_info
+from inference import available_cores
+
+RSS_SAMPLE_SECONDS = 0.05
+
+
+def current_rss_bytes():
+    """Resident set size of this process (Linux /proc; falls back to the peak from getrusage)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RSSSampler:
+    """Samples RSS on a background thread and keeps the peak since start()."""
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.peak = current_rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+        return self.peak
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_bytes())
+
+
+def run_analysis(job_description, files):
+    """One analysis as the app runs it (without the Streamlit caches), returning the ranked DataFrame."""
+    from advanced_utils import analyze_skill_match, build_composite_scorer
+    from pipeline import run_screening_pipeline, ScreeningSession
+    from resume_parser import parse_resume
+    from utils import extract_text, file_content_hash, file_from_bytes, text_hash
+
+    def extract_resume(file):
+        text = extract_text(file)
+        if not text:
+            return None
+        return {'id': file_content_hash(file), 'name': file.name, 'text': text, 'parsed': parse_resume(text)}
+
+    # Each session gets its own file objects, as each browser upload does
+    files = [file_from_bytes(content, name) for name, content in files]
+    session = ScreeningSession(settings_key=None)
+    result = run_screening_pipeline(job_description, files, extract_fn=extract_resume)
+    session.set_job_description(text_hash(job_description), result['jd_embedding'], result['bias'])
+    session.add(job_description, result, {file_content_hash(file): file.name for file in files})
+    results_df = session.results_df()
+    ranked_df = build_composite_scorer(job_description, session.candidates, results_df).rank()
+    if len(ranked_df):
+        top = session.candidates.resume(session.candidates.row_by_id[ranked_df['Candidate ID'].iloc[0]])
+        analyze_skill_match(job_description, top['parsed'])
+    return ranked_df
+
+
+def run_level(concurrency, analyses_per_session, batches, jds):
+    """
+    Runs `concurrency` sessions at once, each doing analyses_per_session analyses on its own
+    rotation of resume batches and JDs. Returns the level's result entry.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def session_thread(session_index):
+        start_barrier.wait()
+        for analysis in range(analyses_per_session):
+            step = session_index * analyses_per_session + analysis
+            started = time.perf_counter()
+            try:
+                run_analysis(jds[step % len(jds)], batches[step % len(batches)])
+            except Exception as e:
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}")
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=session_thread, args=(i,), name=f"session-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    sampler = RSSSampler()
+    sampler.start()
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    peak_rss = sampler.stop()
+
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    resumes = sum(len(batches[(i * analyses_per_session + a) % len(batches)])
+                  for i in range(concurrency) for a in range(analyses_per_session))
+    return {
+        'concurrency': concurrency,
+        'analyses': len(latencies),
+        'errors': len(errors),
+        'error_samples': errors[:3],
+        'wall_seconds': round(wall, 3),
+        'analyses_per_second': round(len(latencies) / wall, 3),
+        'resumes_per_second': round(resumes / wall, 2),
+        'p50_ms': round(float(np.percentile(latencies_ms, 50)), 1),
+        'p95_ms': round(float(np.percentile(latencies_ms, 95)), 1),
+        'p99_ms': round(float(np.percentile(latencies_ms, 99)), 1),
+        'peak_rss_mb': round(peak_rss / 2 ** 20, 1),
+        'cpu_utilisation': round(cpu / wall / len(available_cores()), 3)
+    }
+
+
+def run_load_test(corpus, concurrency_levels, batch_size=50, analyses_per_session=2):
+    """Warms the models up, then runs each concurrency level in turn. Returns the results dict."""
+    # Local models only: a load test must not depend on (or measure) the network
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    model_load_started = time.perf_counter()
+    from advanced_utils import inference_gate, load_models
+    load_models()
+    model_load_seconds = time.perf_counter() - model_load_started
+
+    documents = [(os.path.basename(document['file']), document['content']) for document in corpus['resumes']]
+    batches = [documents[i:i + batch_size] for i in range(0, len(documents), batch_size)]
+    jds = [document['content'] for document in corpus['jds']]
+    run_analysis(jds[0], batches[0])
+
+    try:
+        import torch
+        torch_threads = (torch.get_num_threads(), torch.get_num_interop_threads())
+    except ImportError:
+        torch_threads = (None, None)
+    levels = [run_level(concurrency, analyses_per_session, batches, jds) for concurrency in concurrency_levels]
+    return {
+        'meta': dict(environment_info(), model_load_seconds=round(model_load_seconds, 3),
+                     inference_slots=inference_gate.slots, torch_threads=torch_threads[0],
+                     torch_interop_threads=torch_threads[1], cpu_cores=os.environ.get("TALENTSIFT_CPU_CORES"),
+                     model_calls=inference_gate.stats()),
+        'settings': {'batch_size': batch_size, 'analyses_per_session': analyses_per_session,
+                     'resumes': len(documents), 'jds': len(jds)},
+        'levels': levels
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentSift AI concurrent-session load test")
+    parser.add_argument("--corpus", help="Corpus folder from benchmarks.corpus (default: generate a temporary one)")
+    parser.add_argument("--resumes", type=int, default=200, help="Resumes to generate when --corpus is not given")
+    parser.add_argument("--jds", type=int, default=3, help="JDs to generate when --corpus is not given")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated numbers of concurrent sessions")
+    parser.add_argument("--batch-size", type=int, default=50, help="Resumes uploaded per analysis")
+    parser.add_argument("--analyses", type=int, default=2, help="Analyses per session at each level")
+    parser.add_argument("--inference-slots", type=int, help="Model calls allowed at once (TALENTSIFT_INFERENCE_SLOTS)")
+    parser.add_argument("--torch-threads", type=int, help="Intra-op threads per model call (TALENTSIFT_TORCH_THREADS)")
+    parser.add_argument("--cpu-cores", help="Pin the test to these cores, e.g. 0-7 (TALENTSIFT_CPU_CORES)")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    # Inference settings must be in place before advanced_utils loads the models
+    for name, value in [("TALENTSIFT_INFERENCE_SLOTS", args.inference_slots),
+                        ("TALENTSIFT_TORCH_THREADS", args.torch_threads), ("TALENTSIFT_CPU_CORES", args.cpu_cores)]:
+        if value is not None:
+            os.environ[name] = str(value)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus_dir = args.corpus
+        if corpus_dir is None:
+            corpus_dir = temp_dir
+            generate_corpus(corpus_dir, args.resumes, args.jds)
+        corpus = load_corpus(corpus_dir)
+    results = run_load_test(corpus, [int(level) for level in args.concurrency.split(",")],
+                            batch_size=args.batch_size, analyses_per_session=args.analyses)
+
+    for level in results['levels']:
+        print(f"{level['concurrency']:>3} sessions: {level['analyses_per_second']:.2f} analyses/s, "
+              f"{level['resumes_per_second']:.1f} resumes/s, p50 {level['p50_ms']:.0f} ms, p99 {level['p99_ms']:.0f} ms, "
+              f"peak RSS {level['peak_rss_mb']:.0f} MB, CPU {level['cpu_utilisation']:.0%}, {level['errors']} errors",
+              file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
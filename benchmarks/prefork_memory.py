@@ -0,0 +1,106 @@
+# benchmarks/prefork_memory.py
+"""
+Memory per worker: pre-forked workers sharing the models (prefork_pool.PreforkPool)
+against workers that load the models themselves.
+
+    python -m benchmarks.prefork_memory --processes 4 --output prefork.json
+
+Starts a fresh process that loads the models (the cost of a worker started from scratch),
+then a pre-forked pool whose workers each run real encode and classify calls, so they
+touch the model pages as screening does. Reports RSS, PSS and USS (memory only that
+process uses) of the fresh process, the pool's parent and each worker, and the total
+for N workers either way. Linux only (/proc/<pid>/smaps_rollup).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.run_benchmarks import environment_info
+
+MB = 2 ** 20
+
+
+def screening_work(texts):
+    """A worker's share of screening: encode resumes and classify a JD. Returns the worker's pid."""
+    from advanced_utils import classifier, semantic_model, BIAS_MODEL_MAX_CHARS
+    semantic_model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    classifier([text[:BIAS_MODEL_MAX_CHARS] for text in texts[:4]])
+    return os.getpid()
+
+
+def sample_texts(count):
+    from benchmarks.encode_scaling import synthetic_texts
+    return synthetic_texts(count)
+
+
+def run_prefork_memory(processes, texts_per_job=32, jobs_per_worker=3):
+    from prefork_pool import PreforkPool, fresh_load_memory
+
+    # Measured first, before this process loads anything
+    fresh = fresh_load_memory()
+    texts = sample_texts(texts_per_job)
+
+    started = time.perf_counter()
+    with PreforkPool(processes) as pool:
+        startup_seconds = time.perf_counter() - started
+        pids = set(pool.map(screening_work, [texts] * (processes * jobs_per_worker)))
+        report = pool.memory_report()
+        restarts = pool.restarts
+    workers = [worker for worker in report['workers'] if worker['memory'] is not None]
+    if fresh['memory'] is None or report['parent'] is None or not workers:
+        raise RuntimeError("Per-process memory needs /proc/<pid>/smaps_rollup (Linux)")
+
+    worker_uss = [worker['memory']['uss'] for worker in workers]
+    fresh_rss = fresh['memory']['rss']
+    prefork_total = report['parent']['uss'] + report['parent']['shared'] + sum(worker_uss)
+    return {
+        'meta': environment_info(),
+        'settings': {'processes': processes, 'texts_per_job': texts_per_job, 'jobs_per_worker': jobs_per_worker},
+        'fresh_load': {'load_seconds': fresh['load_seconds'], 'rss_mb': round(fresh_rss / MB, 1),
+                       'uss_mb': round(fresh['memory']['uss'] / MB, 1)},
+        'prefork': {
+            'startup_seconds': round(startup_seconds, 3),
+            'workers_used': len(pids),
+            'restarts': restarts,
+            'parent_rss_mb': round(report['parent']['rss'] / MB, 1),
+            'workers': [{'pid': worker['pid'], 'rss_mb': round(worker['memory']['rss'] / MB, 1),
+                         'pss_mb': round(worker['memory']['pss'] / MB, 1),
+                         'uss_mb': round(worker['memory']['uss'] / MB, 1)} for worker in workers],
+            'mean_worker_uss_mb': round(sum(worker_uss) / len(worker_uss) / MB, 1)
+        },
+        'totals': {
+            # N fresh workers each hold everything; pre-forked ones share the parent's pages
+            'fresh_workers_mb': round(processes * fresh_rss / MB, 1),
+            'prefork_mb': round(prefork_total / MB, 1),
+            'worker_uss_vs_fresh_rss': round(sum(worker_uss) / len(worker_uss) / fresh_rss, 3)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-forked worker memory benchmark")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--texts", type=int, default=32, help="Texts encoded per job")
+    parser.add_argument("--jobs-per-worker", type=int, default=3)
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    results = run_prefork_memory(args.processes, args.texts, args.jobs_per_worker)
+    fresh, prefork, totals = results['fresh_load'], results['prefork'], results['totals']
+    print(f"Fresh worker: {fresh['rss_mb']:.0f} MB RSS, {fresh['load_seconds']:.1f}s to load the models", file=sys.stderr)
+    print(f"Pre-forked worker: {prefork['mean_worker_uss_mb']:.0f} MB unique (mean), "
+          f"pool started in {prefork['startup_seconds']:.1f}s", file=sys.stderr)
+    print(f"{args.processes} workers: {totals['fresh_workers_mb']:.0f} MB loading separately, "
+          f"{totals['prefork_mb']:.0f} MB pre-forked", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark suite: times each pipeline stage separately and the whole screening end to end,
+on a synthetic corpus (see benchmarks/corpus.py), and writes the results as JSON.
+
+    python -m benchmarks.run_benchmarks --corpus bench_corpus --output results.json
+    python -m benchmarks.run_benchmarks --resumes 500 --jds 3 --output results.json
+    python -m benchmarks.run_benchmarks --corpus bench_corpus --compare baseline.json
+
+Without --corpus a corpus is generated into a temporary folder (same seed, same files).
+Stages: extract_text, detect_bias, rank_resumes_advanced, analyze_skill_match and
+generate_insights, then end_to_end (the app's streaming pipeline plus insights and
+composite scoring). Each stage reports the median and best total over --repeat runs,
+per-item latency percentiles and throughput. Model loading is timed separately
+(model_load_seconds) and excluded from every stage.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.corpus import generate_corpus, load_corpus
+
+RESULTS_SCHEMA_VERSION = 1
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment_info():
+    """Where the results come from: commit, time, Python, platform and CPU count."""
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__
+    }
+
+
+def run_stage(fn, items, repeat):
+    """
+    Calls fn(item) for every item, repeat times. Returns the stage's result entry:
+    median/best total seconds, per-item latency percentiles (over all runs) and throughput.
+    """
+    totals, latencies = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            item_started = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - item_started)
+        totals.append(time.perf_counter() - started)
+    return _stage_result(totals, latencies, len(items))
+
+
+def run_batch_stage(fn, repeat, items_per_run):
+    """Like run_stage for a stage that processes a whole batch per call (items_per_run items)."""
+    totals = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        totals.append(time.perf_counter() - started)
+    return _stage_result(totals, [total / max(items_per_run, 1) for total in totals], items_per_run)
+
+
+def _stage_result(totals, latencies, items):
+    latencies_ms = np.array(latencies) * 1000
+    median_total = float(np.median(totals))
+    return {
+        'items': items,
+        'runs': len(totals),
+        'median_seconds': round(median_total, 4),
+        'best_seconds': round(float(min(totals)), 4),
+        'p50_ms': round(float(np.percentile(latencies_ms, 50)), 3),
+        'p99_ms': round(float(np.percentile(latencies_ms, 99)), 3),
+        'mean_ms': round(float(latencies_ms.mean()), 3),
+        'items_per_second': round(items / median_total, 2) if median_total > 0 else None
+    }
+
+
+def run_benchmarks(corpus, repeat=3, skill_sample=200):
+    """Runs every benchmark on a loaded corpus (see corpus.load_corpus). Returns the results dict."""
+    model_load_started = time.perf_counter()
+    from advanced_utils import (detect_bias, rank_resumes_advanced, analyze_skill_match, generate_insights,
+                                generate_insights_batch, build_composite_scorer, load_models)
+    from pipeline import run_screening_pipeline
+    from resume_parser import parse_resume
+    from utils import extract_text, file_from_bytes, file_content_hash
+    load_models()
+    model_load_seconds = time.perf_counter() - model_load_started
+
+    # File objects are built up front, so disk reads are not timed
+    files = [file_from_bytes(document['content'], os.path.basename(document['file'])) for document in corpus['resumes']]
+    jds = [document['content'] for document in corpus['jds']]
+    job_description = jds[0]
+
+    def extract(file):
+        file.seek(0)
+        return extract_text(file)
+
+    texts = [extract(file) for file in files]
+    resumes = [{'id': file_content_hash(file), 'name': file.name, 'text': text}
+               for file, text in zip(files, texts) if text]
+    sample = [resume['text'] for resume in resumes[:skill_sample]]
+
+    def extract_resume(file):
+        text = extract(file)
+        if not text:
+            return None
+        return {'id': file_content_hash(file), 'name': file.name, 'text': text, 'parsed': parse_resume(text)}
+
+    def end_to_end():
+        result = run_screening_pipeline(job_description, files, extract_fn=extract_resume)
+        generate_insights_batch(job_description, result['resumes'])
+        build_composite_scorer(job_description, result['resumes'], result['results_df'])
+
+    benchmarks = {
+        'extract_text': run_stage(extract, files, repeat),
+        'detect_bias': run_stage(detect_bias, jds, repeat),
+        'rank_resumes_advanced': run_batch_stage(lambda: rank_resumes_advanced(job_description, resumes),
+                                                 repeat, len(resumes)),
+        'analyze_skill_match': run_stage(lambda text: analyze_skill_match(job_description, text), sample, repeat),
+        'generate_insights': run_stage(lambda text: generate_insights(job_description, text),
+                                       [resume['text'] for resume in resumes], repeat),
+        'end_to_end': run_batch_stage(end_to_end, repeat, len(files)),
+    }
+    return {
+        'schema_version': RESULTS_SCHEMA_VERSION,
+        'meta': dict(environment_info(), model_load_seconds=round(model_load_seconds, 3)),
+        'corpus': dict(corpus['options'], resumes=len(corpus['resumes']), jds=len(corpus['jds']),
+                       extracted=len(resumes)),
+        'benchmarks': benchmarks
+    }
+
+
+def compare(results, baseline, out=sys.stdout):
+    """Prints median time per stage against a baseline results file (ratio > 1 means slower now)."""
+    print(f"{'stage':<24}{'baseline s':>12}{'current s':>12}{'ratio':>8}", file=out)
+    for stage, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(stage)
+        if previous is None:
+            print(f"{stage:<24}{'-':>12}{current['median_seconds']:>12.4f}{'-':>8}", file=out)
+            continue
+        ratio = current['median_seconds'] / previous['median_seconds'] if previous['median_seconds'] else float('nan')
+        print(f"{stage:<24}{previous['median_seconds']:>12.4f}{current['median_seconds']:>12.4f}{ratio:>8.2f}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentSift AI benchmark suite")
+    parser.add_argument("--corpus", help="Corpus folder from benchmarks.corpus (default: generate a temporary one)")
+    parser.add_argument("--resumes", type=int, default=200, help="Resumes to generate when --corpus is not given")
+    parser.add_argument("--jds", type=int, default=3, help="JDs to generate when --corpus is not given")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage")
+    parser.add_argument("--skill-sample", type=int, default=200, help="Resumes used for analyze_skill_match")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus_dir = args.corpus
+        if corpus_dir is None:
+            corpus_dir = temp_dir
+            generate_corpus(corpus_dir, args.resumes, args.jds, args.seed)
+        corpus = load_corpus(corpus_dir)
+    results = run_benchmarks(corpus, repeat=args.repeat, skill_sample=args.skill_sample)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            # Keep stdout pure JSON when the results go there
+            compare(results, json.load(f), out=sys.stdout if args.output else sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
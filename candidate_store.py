@@ -0,0 +1,489 @@
+# candidate_store.py
+"""
+Persistent candidate store (SQLite).
+
+Keeps everything computed per candidate beyond the Streamlit session: the extracted text
+(zlib-compressed), parse-time features (sections, experience, degree, skill ids, MinHash signature),
+embeddings per model and ranking mode, JD bias reports per classifier and semantic scores per JD.
+Candidates are looked up by content hash (the app's candidate ID) or by their
+integer row ID, both indexed.
+
+Bulk import of a folder of resumes (extraction in parallel processes, batched inserts):
+
+    python candidate_store.py import ./resumes --workers 8
+    python candidate_store.py stats
+
+Embeddings can also be kept compressed (float16, PCA or product quantization; see
+embedding_codec.py) for ranking large pools from less memory:
+
+    python candidate_store.py compress --codec pq:48
+
+The database defaults to ~/.cache/talentsift/candidates.sqlite3 (set TALENTSIFT_CANDIDATE_DB to change it).
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from resume_parser import ParsedResume, normalize_text
+from skill_matcher import DEFAULT_CACHE_DIR
+
+DEFAULT_DB_PATH = os.path.join(DEFAULT_CACHE_DIR, "candidates.sqlite3")
+IMPORT_BATCH_SIZE = 1000
+COMPRESS_SAMPLE_SIZE = 20000
+COMPRESS_BATCH_SIZE = 10000
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    candidate_id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    text_z BLOB NOT NULL,               -- zlib-compressed extracted text
+    sections TEXT NOT NULL,             -- JSON: section -> [[start, end], ...] offsets into the normalized text
+    years_experience REAL NOT NULL,
+    degree_level INTEGER NOT NULL,
+    skill_years TEXT NOT NULL,          -- JSON: skill id -> years
+    skill_ids BLOB NOT NULL,            -- uint16 skill ids
+    created_at REAL NOT NULL,
+    minhash BLOB                        -- uint32 MinHash signature for near-duplicate detection
+);
+
+CREATE TABLE IF NOT EXISTS embeddings (
+    candidate_id INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    mode TEXT NOT NULL,                 -- 'full' (whole text) or 'sections' (section-weighted)
+    vector BLOB NOT NULL,               -- float32
+    PRIMARY KEY (candidate_id, model, mode)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS embedding_codecs (
+    model TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    codec TEXT NOT NULL,                -- codec spec, e.g. 'float16' or 'pq:48' (see embedding_codec.py)
+    params BLOB NOT NULL,               -- trained parameters (npz)
+    created_at REAL NOT NULL,
+    PRIMARY KEY (model, mode, codec)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS embedding_codes (
+    candidate_id INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    code BLOB NOT NULL,                 -- the embedding encoded by that codec
+    PRIMARY KEY (candidate_id, model, mode, codec)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS job_descriptions (
+    jd_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    bias TEXT,                          -- no longer written or read (not keyed by classifier); see bias_reports
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS bias_reports (
+    jd_hash TEXT NOT NULL,
+    classifier TEXT NOT NULL,           -- model and precision that made the report, e.g. '<model>:int8'
+    report TEXT NOT NULL,               -- JSON bias report
+    created_at REAL NOT NULL,
+    PRIMARY KEY (jd_hash, classifier)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS scores (
+    jd_hash TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    semantic REAL NOT NULL,
+    PRIMARY KEY (jd_hash, mode, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scores_ranking ON scores (jd_hash, mode, semantic DESC);
+"""
+
+
+class CandidateStore:
+    """
+    Thread-safe handle on the candidate database. All writes are batched: one
+    executemany per call inside one transaction.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.environ.get("TALENTSIFT_CANDIDATE_DB", DEFAULT_DB_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        # Extraction threads read from the store, so the connection is shared behind a lock
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._codecs = {}         # (model, mode, codec spec) -> (created_at, trained codec)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            # Stores created before near-duplicate detection lack the signature column
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(candidates)")}
+            if 'minhash' not in columns:
+                self._conn.execute("ALTER TABLE candidates ADD COLUMN minhash BLOB")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _query_in(self, sql, values, extra_params=()):
+        """Runs a query with an `IN (...)` over values, in chunks under SQLite's variable limit."""
+        values = list(values)
+        rows = []
+        for start in range(0, len(values), 900):
+            chunk = values[start:start + 900]
+            rows.extend(self._query(sql.format(placeholders=",".join("?" * len(chunk))), list(extra_params) + chunk))
+        return rows
+
+    # --- Candidates ---
+    def candidate_ids(self, content_hashes):
+        """Maps the stored content hashes among the given ones to their candidate IDs."""
+        return dict(self._query_in("SELECT content_hash, candidate_id FROM candidates WHERE content_hash IN ({placeholders})",
+                                   content_hashes))
+
+    def add_resumes(self, resumes):
+        """
+        Stores resume dicts ({'id': content hash, 'name', 'text', 'parsed'}); hashes already
+        stored are skipped. Returns the number of candidates added.
+        """
+        now = time.time()
+        rows = [(resume['id'], resume['name'], zlib.compress(resume['text'].encode("utf-8")),
+                 json.dumps(resume['parsed'].sections), float(resume['parsed'].years_experience),
+                 int(resume['parsed'].degree_level), json.dumps(resume['parsed'].skill_years),
+                 np.array(sorted(resume['parsed'].skill_ids or ()), dtype=np.uint16).tobytes(), now,
+                 None if resume['parsed'].minhash is None else resume['parsed'].minhash.tobytes())
+                for resume in resumes]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO candidates (content_hash, name, text_z, sections, "
+                                   "years_experience, degree_level, skill_years, skill_ids, created_at, minhash) "
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            return self._conn.total_changes - before
+
+    def load_resumes(self, content_hashes=None, candidate_ids=None):
+        """
+        Loads stored candidates as resume dicts with a ParsedResume rebuilt from the stored
+        features (no re-parsing). Returns {content hash: resume}.
+        """
+        columns = "content_hash, name, text_z, sections, years_experience, degree_level, skill_years, skill_ids, minhash"
+        if candidate_ids is not None:
+            rows = self._query_in(f"SELECT {columns} FROM candidates WHERE candidate_id IN ({{placeholders}})", candidate_ids)
+        else:
+            rows = self._query_in(f"SELECT {columns} FROM candidates WHERE content_hash IN ({{placeholders}})", content_hashes)
+        resumes = {}
+        for content_hash, name, text_z, sections, years, degree_level, skill_years, skill_ids, minhash in rows:
+            text = zlib.decompress(text_z).decode("utf-8")
+            parsed = ParsedResume(normalize_text(text),
+                                  {section: [tuple(span) for span in spans] for section, spans in json.loads(sections).items()},
+                                  years, degree_level,
+                                  {int(skill_id): value for skill_id, value in json.loads(skill_years).items()},
+                                  frozenset(np.frombuffer(skill_ids, dtype=np.uint16).tolist()),
+                                  None if minhash is None else np.frombuffer(minhash, dtype=np.uint32))
+            resumes[content_hash] = {'id': content_hash, 'name': name, 'text': text, 'parsed': parsed}
+        return resumes
+
+    # --- Embeddings ---
+    def put_embeddings(self, content_hashes, embeddings, model, mode):
+        ids = self.candidate_ids(content_hashes)
+        rows = [(ids[content_hash], model, mode, np.asarray(embedding, dtype=np.float32).tobytes())
+                for content_hash, embedding in zip(content_hashes, embeddings) if content_hash in ids]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (candidate_id, model, mode, vector) "
+                                   "VALUES (?, ?, ?, ?)", rows)
+        # Codecs already trained for this model and mode encode new embeddings as they arrive
+        for spec in self.codec_specs(model, mode):
+            self._put_codes(self.get_codec(model, mode, spec), [row[0] for row in rows],
+                            [np.frombuffer(row[3], dtype=np.float32) for row in rows], model, mode)
+
+    def get_embeddings(self, content_hashes, model, mode):
+        """Returns {content hash: float32 embedding} for the stored ones among content_hashes."""
+        rows = self._query_in("SELECT c.content_hash, e.vector FROM candidates c JOIN embeddings e "
+                              "ON e.candidate_id = c.candidate_id AND e.model = ? AND e.mode = ? "
+                              "WHERE c.content_hash IN ({placeholders})", content_hashes, (model, mode))
+        return {content_hash: np.frombuffer(vector, dtype=np.float32) for content_hash, vector in rows}
+
+    def load_embedding_shard(self, model, mode, shard=0, shards=1):
+        """
+        Shard `shard` of `shards` of the stored embeddings (candidates whose row ID is shard modulo shards),
+        as (content hashes, names, float32 matrix). Rows are copied straight into one preallocated matrix.
+        """
+        where = ("FROM candidates c JOIN embeddings e ON e.candidate_id = c.candidate_id "
+                 "WHERE e.model = ? AND e.mode = ? AND c.candidate_id % ? = ?")
+        params = (model, mode, shards, shard)
+        content_hashes, names, matrix = [], [], None
+        with self._lock:
+            count = self._conn.execute(f"SELECT COUNT(*) {where}", params).fetchone()[0]
+            cursor = self._conn.execute(f"SELECT c.content_hash, c.name, e.vector {where} ORDER BY c.candidate_id", params)
+            for content_hash, name, vector in cursor:
+                if matrix is None:
+                    matrix = np.empty((count, len(vector) // 4), dtype=np.float32)
+                if len(content_hashes) == count:
+                    # Rows imported by another process since the count; they belong to the next load
+                    break
+                matrix[len(content_hashes)] = np.frombuffer(vector, dtype=np.float32)
+                content_hashes.append(content_hash)
+                names.append(name)
+        if matrix is None:
+            return [], [], np.zeros((0, 0), dtype=np.float32)
+        return content_hashes, names, matrix[:len(content_hashes)]
+
+    # --- Compressed embeddings ---
+    def codec_specs(self, model, mode):
+        """Specs of the codecs trained for this model and mode."""
+        return [row[0] for row in self._query("SELECT codec FROM embedding_codecs WHERE model = ? AND mode = ?",
+                                              (model, mode))]
+
+    def get_codec(self, model, mode, spec):
+        """The trained codec (embedding_codec.EmbeddingCodec) for this model and mode, or None."""
+        from embedding_codec import load_codec
+        key = (model, mode, spec)
+        rows = self._query("SELECT created_at FROM embedding_codecs WHERE model = ? AND mode = ? AND codec = ?", key)
+        if not rows:
+            return None
+        # Retrained by another process since it was cached: its codes now follow the new parameters
+        if key not in self._codecs or self._codecs[key][0] != rows[0][0]:
+            params = self._query("SELECT params FROM embedding_codecs WHERE model = ? AND mode = ? AND codec = ?", key)
+            self._codecs[key] = (rows[0][0], load_codec(spec, params[0][0]))
+        return self._codecs[key][1]
+
+    def _put_codes(self, codec, candidate_ids, embeddings, model, mode):
+        if not candidate_ids:
+            return
+        codes = codec.encode(np.vstack(embeddings))
+        rows = [(candidate_id, model, mode, codec.spec, code.tobytes()) for candidate_id, code in zip(candidate_ids, codes)]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embedding_codes (candidate_id, model, mode, codec, code) "
+                                   "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def compress_embeddings(self, model, mode, spec, sample_size=COMPRESS_SAMPLE_SIZE, on_progress=None):
+        """
+        Trains codec `spec` (see embedding_codec.make_codec) on up to sample_size stored embeddings,
+        spread evenly over the store, and encodes every stored embedding with it, in batches.
+        Replaces earlier codes of the same spec. The float32 vectors are kept: they are what
+        codecs are trained from, and what cached rankings reuse. Returns the codec.
+        """
+        from embedding_codec import make_codec
+        candidate_ids = [row[0] for row in self._query("SELECT candidate_id FROM embeddings WHERE model = ? AND mode = ? "
+                                                       "ORDER BY candidate_id", (model, mode))]
+        if not candidate_ids:
+            raise ValueError(f"No {model} ({mode}) embeddings stored to compress")
+        sample_ids = candidate_ids[::max(1, len(candidate_ids) // sample_size)][:sample_size]
+        codec = make_codec(spec).fit(np.vstack(self._embeddings_by_id(sample_ids, model, mode)))
+        created_at = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM embedding_codes WHERE model = ? AND mode = ? AND codec = ?",
+                               (model, mode, codec.spec))
+            self._conn.execute("INSERT OR REPLACE INTO embedding_codecs (model, mode, codec, params, created_at) "
+                               "VALUES (?, ?, ?, ?, ?)", (model, mode, codec.spec, codec.to_bytes(), created_at))
+        self._codecs[(model, mode, codec.spec)] = (created_at, codec)
+        for start in range(0, len(candidate_ids), COMPRESS_BATCH_SIZE):
+            batch = candidate_ids[start:start + COMPRESS_BATCH_SIZE]
+            self._put_codes(codec, batch, self._embeddings_by_id(batch, model, mode), model, mode)
+            if on_progress:
+                on_progress(min(start + COMPRESS_BATCH_SIZE, len(candidate_ids)), len(candidate_ids))
+        return codec
+
+    def _embeddings_by_id(self, candidate_ids, model, mode):
+        """float32 embeddings of the given candidates, in the given order."""
+        vectors = dict(self._query_in("SELECT candidate_id, vector FROM embeddings WHERE model = ? AND mode = ? "
+                                      "AND candidate_id IN ({placeholders})", candidate_ids, (model, mode)))
+        return [np.frombuffer(vectors[candidate_id], dtype=np.float32) for candidate_id in candidate_ids]
+
+    def load_code_shard(self, model, mode, spec, shard=0, shards=1):
+        """
+        load_embedding_shard for the codes of codec `spec`: (content hashes, names, codes, codec),
+        the codes one row per candidate. Raises ValueError if the codec was never trained.
+        """
+        codec = self.get_codec(model, mode, spec)
+        if codec is None:
+            raise ValueError(f"No {spec} codes for {model} ({mode}); run: python candidate_store.py compress --codec {spec}")
+        where = ("FROM candidates c JOIN embedding_codes e ON e.candidate_id = c.candidate_id "
+                 "WHERE e.model = ? AND e.mode = ? AND e.codec = ? AND c.candidate_id % ? = ?")
+        params = (model, mode, codec.spec, shards, shard)
+        content_hashes, names = [], []
+        with self._lock:
+            count = self._conn.execute(f"SELECT COUNT(*) {where}", params).fetchone()[0]
+            codes = np.empty((count, codec.code_size), dtype=codec.code_dtype)
+            cursor = self._conn.execute(f"SELECT c.content_hash, c.name, e.code {where} ORDER BY c.candidate_id", params)
+            for content_hash, name, code in cursor:
+                if len(content_hashes) == count:
+                    # Rows imported by another process since the count; they belong to the next load
+                    break
+                codes[len(content_hashes)] = np.frombuffer(code, dtype=codec.code_dtype)
+                content_hashes.append(content_hash)
+                names.append(name)
+        return content_hashes, names, codes[:len(content_hashes)], codec
+
+    # --- Job descriptions, bias reports and scores ---
+    def put_job_description(self, jd_hash, text, bias=None, classifier=None):
+        """
+        Stores a JD and its detect_bias() result (summary, masculine/feminine counts, emotion DataFrame),
+        keyed by the classifier that made it (e.g. advanced_utils.CLASSIFIER_KEY), as embeddings are by model.
+        """
+        if bias is not None and classifier is None:
+            raise ValueError("A bias report needs the classifier that made it")
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO job_descriptions (jd_hash, text, created_at) VALUES (?, ?, ?) "
+                               "ON CONFLICT (jd_hash) DO UPDATE SET text = excluded.text", (jd_hash, text, now))
+            if bias is not None:
+                bias_summary, masculine_counts, feminine_counts, emotion_df = bias
+                report = json.dumps({'summary': bias_summary, 'masculine_counts': masculine_counts,
+                                     'feminine_counts': feminine_counts,
+                                     'emotions': emotion_df.to_dict(orient='records')}, default=float)
+                self._conn.execute("INSERT OR REPLACE INTO bias_reports (jd_hash, classifier, report, created_at) "
+                                   "VALUES (?, ?, ?, ?)", (jd_hash, classifier, report, now))
+
+    def get_bias(self, jd_hash, classifier):
+        """The bias report stored for a JD by this classifier, in detect_bias() form, or None."""
+        rows = self._query("SELECT report FROM bias_reports WHERE jd_hash = ? AND classifier = ?",
+                           (jd_hash, classifier))
+        if not rows:
+            return None
+        report = json.loads(rows[0][0])
+        return report['summary'], report['masculine_counts'], report['feminine_counts'], pd.DataFrame(report['emotions'])
+
+    def put_scores(self, jd_hash, mode, content_hashes, scores):
+        """Stores semantic scores (cosine similarity) of candidates against a JD."""
+        ids = self.candidate_ids(content_hashes)
+        rows = [(jd_hash, mode, ids[content_hash], float(score))
+                for content_hash, score in zip(content_hashes, scores) if content_hash in ids]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO scores (jd_hash, mode, candidate_id, semantic) "
+                                   "VALUES (?, ?, ?, ?)", rows)
+
+    def top_candidates(self, jd_hash, mode, limit=50):
+        """Best stored candidates for a JD as [(content hash, name, score)], using the ranking index."""
+        return self._query("SELECT c.content_hash, c.name, s.semantic FROM scores s "
+                           "JOIN candidates c ON c.candidate_id = s.candidate_id "
+                           "WHERE s.jd_hash = ? AND s.mode = ? ORDER BY s.semantic DESC LIMIT ?",
+                           (jd_hash, mode, limit))
+
+    def stats(self):
+        counts = {}
+        for table in ('candidates', 'embeddings', 'embedding_codes', 'job_descriptions', 'bias_reports', 'scores'):
+            counts[table] = self._query(f"SELECT COUNT(*) FROM {table}")[0][0]
+        return counts
+
+
+# --- Bulk import ---
+def _extract_path(path):
+    """Extracts and parses one resume file (runs in a worker process; no models are loaded)."""
+    from resume_parser import parse_resume
+    from utils import extract_text, file_from_bytes, file_content_hash
+
+    with open(path, "rb") as f:
+        file = file_from_bytes(f.read(), os.path.basename(path))
+    text = extract_text(file)
+    if not text:
+        return None
+    return {'id': file_content_hash(file), 'name': file.name, 'text': text, 'parsed': parse_resume(text)}
+
+
+def bulk_import(store, paths, workers=None, embed=True, section_weighted=False, on_progress=None, encoder=None):
+    """
+    Imports resume files into the store: extraction and parsing fan out over worker
+    processes, and results are written (and optionally embedded) in batches of
+    IMPORT_BATCH_SIZE, each in a single transaction. Returns (imported, failed).
+    encoder: optional sharded_encoder.ShardedEncoder to embed on a pool of processes.
+    """
+    imported = failed = done = 0
+    batch = []
+
+    def flush():
+        nonlocal imported
+        stored = store.candidate_ids([resume['id'] for resume in batch])
+        new_resumes = [resume for resume in batch if resume['id'] not in stored]
+        imported += store.add_resumes(new_resumes)
+        if embed and new_resumes:
+            from advanced_utils import encode_resumes, DEFAULT_SECTION_WEIGHTS, SEMANTIC_MODEL_NAME
+            embeddings = encode_resumes(new_resumes, DEFAULT_SECTION_WEIGHTS if section_weighted else None,
+                                        encoder=encoder)
+            store.put_embeddings([resume['id'] for resume in new_resumes], embeddings,
+                                 SEMANTIC_MODEL_NAME, 'sections' if section_weighted else 'full')
+        batch.clear()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for resume in executor.map(_extract_path, paths, chunksize=16):
+            done += 1
+            if resume is None:
+                failed += 1
+            else:
+                batch.append(resume)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    flush()
+            if on_progress and done % 100 == 0:
+                on_progress(done, len(paths))
+    flush()
+    return imported, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentSift AI candidate store")
+    parser.add_argument("--db", help="Store path (default: TALENTSIFT_CANDIDATE_DB or ~/.cache/talentsift/candidates.sqlite3)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Bulk import a folder of PDF/DOCX resumes")
+    import_parser.add_argument("folder")
+    import_parser.add_argument("--workers", type=int, default=None, help="Extraction processes (default: CPU count)")
+    import_parser.add_argument("--no-embed", action="store_true", help="Store text and features only")
+    import_parser.add_argument("--section-weighted", action="store_true", help="Store section-weighted embeddings")
+    import_parser.add_argument("--encode-processes", type=int, default=None,
+                               help="Embed on this many processes (sharded_encoder; default: in-process)")
+    compress_parser = subparsers.add_parser("compress", help="Train a codec and store compressed embeddings")
+    compress_parser.add_argument("--codec", required=True, help="float16, pca:<dimensions> or pq:<subspaces> (see embedding_codec.py)")
+    compress_parser.add_argument("--mode", choices=['full', 'sections'], default='full')
+    compress_parser.add_argument("--sample", type=int, default=COMPRESS_SAMPLE_SIZE, help="Embeddings to train the codec on")
+    subparsers.add_parser("stats", help="Show row counts")
+    args = parser.parse_args()
+
+    store = CandidateStore(args.db)
+    try:
+        if args.command == "stats":
+            for table, count in store.stats().items():
+                print(f"{table}: {count}")
+            return
+        if args.command == "compress":
+            from model_bundle import SEMANTIC_MODEL_NAME
+            started = time.perf_counter()
+            try:
+                codec = store.compress_embeddings(SEMANTIC_MODEL_NAME, args.mode, args.codec, args.sample,
+                                                  on_progress=lambda done, total: print(f"{done}/{total} embeddings"))
+            except ValueError as e:
+                parser.error(str(e))
+            print(f"Compressed with {codec.spec}: {codec.bytes_per_vector()} bytes per candidate "
+                  f"(float32: {codec.dimension * 4}) in {time.perf_counter() - started:.1f}s")
+            return
+        paths = sorted(os.path.join(root, name) for root, _, names in os.walk(args.folder)
+                       for name in names if name.lower().endswith(RESUME_EXTENSIONS))
+        started = time.perf_counter()
+        encoder = None
+        if args.encode_processes and not args.no_embed:
+            from sharded_encoder import ShardedEncoder
+            encoder = ShardedEncoder(processes=args.encode_processes)
+        try:
+            imported, failed = bulk_import(store, paths, workers=args.workers, embed=not args.no_embed,
+                                           section_weighted=args.section_weighted, encoder=encoder,
+                                           on_progress=lambda done, total: print(f"{done}/{total} files"))
+        finally:
+            if encoder is not None:
+                encoder.close()
+        print(f"Imported {imported} new candidates from {len(paths)} files ({failed} unreadable) "
+              f"in {time.perf_counter() - started:.1f}s")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
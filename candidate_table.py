@@ -0,0 +1,179 @@
+# candidate_table.py
+"""
+Columnar, memory-compact table of screened candidates.
+
+A list of resume dicts keeps, per candidate, the raw text, its lowercased copy, section
+strings, a float32 embedding and a dict/object header for each of them. Here each
+attribute is one column instead: names and insights are interned (insights repeat a
+lot), texts are zlib-compressed, parse-time facts are NumPy arrays, skill ids are one
+flat array for all candidates and embeddings are a float16 matrix.
+
+Stages that need a full resume (e.g. the candidate drill-down) get one rebuilt on
+demand with resume(row); iterating a table yields such resume dicts, so code written
+for lists of resumes still works on it.
+"""
+import hashlib
+import sys
+import zlib
+
+import numpy as np
+
+from resume_parser import ParsedResume, SECTIONS, normalize_text
+
+# Section spans are packed as int32 (section code, start, end) triples
+SECTION_CODES = SECTIONS + ('header',)
+_SECTION_CODE = {section: code for code, section in enumerate(SECTION_CODES)}
+# Rows scored per block, so float16 -> float32 conversion never copies the whole matrix
+SCORE_CHUNK_ROWS = 8192
+
+
+class CandidateTable:
+    """
+    One row per candidate, in the order they were appended.
+
+    Columns: ids, names, insights (lists of interned strings), years_experience (float32),
+    degree_levels (int8), embeddings (float16, one row per candidate), plus compressed
+    texts, packed section spans and skill ids, read through text(), parsed() and skill_ids().
+    The skill years used by the hard filters are not kept: filters run before candidates join.
+    """
+
+    def __init__(self, compress_text=True):
+        self.compress_text = compress_text
+        self.ids = []
+        self.names = []
+        self.insights = []
+        self.row_by_id = {}
+        self.years_experience = np.zeros(0, dtype=np.float32)
+        self.degree_levels = np.zeros(0, dtype=np.int8)
+        self.embeddings = None
+        self._texts = []                                   # zlib-compressed UTF-8 (or str without compression)
+        self._sections = []                                # packed int32 (code, start, end) triples
+        self._skill_values = np.zeros(0, dtype=np.uint16)  # skill ids of all candidates, row by row
+        self._skill_rows = np.zeros(0, dtype=np.int32)     # row of each value in _skill_values
+
+    @classmethod
+    def from_resumes(cls, resumes, embeddings=None, insights=None, compress_text=True):
+        table = cls(compress_text=compress_text)
+        table.append(resumes, embeddings, insights)
+        return table
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.resume(row)
+
+    def __getitem__(self, row):
+        return self.resume(row)
+
+    # --- Building ---
+    def append(self, resumes, embeddings=None, insights=None):
+        """
+        Appends resume dicts ({'id', 'name', 'text', 'parsed'}) with their embeddings and
+        insights (one per resume, or None). Returns the first new row.
+        """
+        first_row = len(self)
+        years, degrees, skill_values, skill_rows = [], [], [], []
+        for offset, resume in enumerate(resumes):
+            parsed = resume['parsed']
+            candidate_id = sys.intern(str(resume['id']))
+            self.row_by_id.setdefault(candidate_id, first_row + offset)
+            self.ids.append(candidate_id)
+            self.names.append(sys.intern(resume['name']))
+            self._texts.append(zlib.compress(resume['text'].encode("utf-8")) if self.compress_text else resume['text'])
+            self._sections.append(np.array([(_SECTION_CODE[section], start, end)
+                                            for section, spans in parsed.sections.items() for start, end in spans],
+                                           dtype=np.int32).tobytes())
+            years.append(parsed.years_experience)
+            degrees.append(parsed.degree_level)
+            skill_ids = sorted(parsed.skill_ids or ())
+            skill_values.extend(skill_ids)
+            skill_rows.extend([first_row + offset] * len(skill_ids))
+        added = len(self) - first_row
+        self.insights.extend(sys.intern(insight) for insight in (insights or [""] * added))
+        self.years_experience = np.concatenate([self.years_experience, np.array(years, dtype=np.float32)])
+        self.degree_levels = np.concatenate([self.degree_levels, np.array(degrees, dtype=np.int8)])
+        self._skill_values = np.concatenate([self._skill_values, np.array(skill_values, dtype=np.uint16)])
+        self._skill_rows = np.concatenate([self._skill_rows, np.array(skill_rows, dtype=np.int32)])
+        if embeddings is not None and added:
+            embeddings = np.asarray(embeddings, dtype=np.float16)
+            self.embeddings = embeddings if self.embeddings is None else np.vstack([self.embeddings, embeddings])
+        return first_row
+
+    def take(self, rows):
+        """A new table with only the given rows, in that order (e.g. after candidates were removed)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        table = CandidateTable(compress_text=self.compress_text)
+        table.ids = [self.ids[row] for row in rows]
+        table.names = [self.names[row] for row in rows]
+        table.insights = [self.insights[row] for row in rows]
+        for row, candidate_id in enumerate(table.ids):
+            table.row_by_id.setdefault(candidate_id, row)
+        table.years_experience = self.years_experience[rows]
+        table.degree_levels = self.degree_levels[rows]
+        table.embeddings = None if self.embeddings is None else self.embeddings[rows]
+        table._texts = [self._texts[row] for row in rows]
+        table._sections = [self._sections[row] for row in rows]
+        new_row = np.full(len(self), -1, dtype=np.int32)
+        new_row[rows] = np.arange(len(rows), dtype=np.int32)
+        kept = new_row[self._skill_rows] >= 0
+        table._skill_rows = new_row[self._skill_rows[kept]]
+        table._skill_values = self._skill_values[kept]
+        by_row = np.argsort(table._skill_rows, kind='stable')
+        table._skill_rows, table._skill_values = table._skill_rows[by_row], table._skill_values[by_row]
+        return table
+
+    # --- Reading ---
+    def text(self, row):
+        text = self._texts[row]
+        return zlib.decompress(text).decode("utf-8") if self.compress_text else text
+
+    def skill_ids(self, row):
+        start, end = np.searchsorted(self._skill_rows, [row, row + 1])
+        return frozenset(self._skill_values[start:end].tolist())
+
+    def parsed(self, row, text=None):
+        """Rebuilds the row's ParsedResume (normalized text, sections, experience, degree and skill ids)."""
+        sections = {}
+        for code, start, end in np.frombuffer(self._sections[row], dtype=np.int32).reshape(-1, 3).tolist():
+            sections.setdefault(SECTION_CODES[code], []).append((start, end))
+        return ParsedResume(normalize_text(self.text(row) if text is None else text), sections,
+                            float(self.years_experience[row]), int(self.degree_levels[row]),
+                            skill_ids=self.skill_ids(row))
+
+    def resume(self, row):
+        """The row as a resume dict, as produced at extraction time."""
+        text = self.text(row)
+        return {'id': self.ids[row], 'name': self.names[row], 'text': text, 'parsed': self.parsed(row, text)}
+
+    def skill_match_counts(self, skill_ids):
+        """How many of skill_ids each candidate has, for all rows at once."""
+        matched = np.isin(self._skill_values, np.fromiter(skill_ids, dtype=np.uint16, count=len(skill_ids)))
+        return np.bincount(self._skill_rows[matched], minlength=len(self)).astype(np.int32)
+
+    def scores(self, query_embedding, start=0):
+        """Dot products of a unit-length query with every embedding from row start on, as float32."""
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        if self.embeddings is None:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate([self.embeddings[block:block + SCORE_CHUNK_ROWS].astype(np.float32) @ query_embedding
+                               for block in range(start, len(self), SCORE_CHUNK_ROWS)] or [np.zeros(0, dtype=np.float32)])
+
+    def fingerprint(self):
+        """Short hash of the candidate IDs and names, in row order (a cache key for the table)."""
+        digest = hashlib.sha1()
+        for candidate_id, name in zip(self.ids, self.names):
+            digest.update(f"{candidate_id}\x00{name}\x00".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def memory_bytes(self):
+        """Approximate memory held by the table's columns, in bytes (interned strings counted once)."""
+        strings = {id(value): sys.getsizeof(value) for column in (self.ids, self.names, self.insights) for value in column}
+        arrays = [self.years_experience, self.degree_levels, self._skill_values, self._skill_rows]
+        if self.embeddings is not None:
+            arrays.append(self.embeddings)
+        return (sum(strings.values()) + sum(array.nbytes for array in arrays)
+                + sum(sys.getsizeof(value) for column in (self._texts, self._sections) for value in column)
+                + sum(sys.getsizeof(column) for column in (self.ids, self.names, self.insights, self._texts, self._sections))
+                + sys.getsizeof(self.row_by_id))
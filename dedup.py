@@ -0,0 +1,123 @@
+# dedup.py
+"""
+Near-duplicate resume detection with MinHash signatures and an LSH index.
+
+A resume's signature is computed once at extraction time from its word 3-shingles.
+The LSH index splits signatures into bands, so finding the near-duplicates of a
+resume only compares it with resumes sharing at least one band bucket, not with the whole pool.
+"""
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 128
+LSH_BANDS = 16             # 16 bands x 8 rows: pairs above ~0.7 similarity almost always share a bucket
+SHINGLE_WORDS = 3
+DUPLICATE_THRESHOLD = 0.8  # estimated Jaccard similarity above which two resumes are near-duplicates
+
+WORD_PATTERN = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Fixed seed: signatures are stored (candidate store, job queue), so permutations must not change between runs
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def minhash_signature(lower_text):
+    """
+    MinHash signature (NUM_PERM uint32 values) of a lowercased text's word shingles.
+    The fraction of equal positions in two signatures estimates their Jaccard similarity.
+    """
+    words = WORD_PATTERN.findall(lower_text)
+    if len(words) < SHINGLE_WORDS:
+        words = words + [""] * (SHINGLE_WORDS - len(words))
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    # (a * x + b) mod p for every permutation and shingle at once; a, x < 2^32 so nothing overflows
+    permuted = (hashes[None, :] * _PERM_A[:, None] + _PERM_B[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimated_similarity(signature_a, signature_b):
+    return float(np.count_nonzero(signature_a == signature_b)) / len(signature_a)
+
+
+class LSHIndex:
+    """
+    Banded LSH over MinHash signatures. Each band of a signature is a bucket key;
+    resumes sharing a bucket are candidates, confirmed by their estimated similarity.
+    """
+
+    def __init__(self, bands=LSH_BANDS, threshold=DUPLICATE_THRESHOLD):
+        self.bands = bands
+        self.threshold = threshold
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature):
+        return [band.tobytes() for band in np.split(np.asarray(signature, dtype=np.uint32), self.bands)]
+
+    def query(self, signature):
+        """Keys of indexed resumes that are near-duplicates of the signature, most similar first."""
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+        matches = [(estimated_similarity(signature, self._signatures[key]), key) for key in candidates]
+        return [key for similarity, key in sorted(matches, reverse=True) if similarity >= self.threshold]
+
+    def add(self, key, signature):
+        if key in self._signatures:
+            return
+        self._signatures[key] = signature
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, []).append(key)
+
+    def remove(self, key):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del buckets[band_key]
+
+    def find_or_add(self, key, signature):
+        """
+        Returns the key of an indexed near-duplicate (the representative), or None after
+        indexing this resume as a new representative.
+        """
+        matches = self.query(signature)
+        if matches:
+            return matches[0]
+        self.add(key, signature)
+        return None
+
+
+def duplicate_groups(resumes, threshold=DUPLICATE_THRESHOLD):
+    """
+    Maps each resume index to the index of its representative (the first resume of its
+    near-duplicate group); unique resumes map to themselves.
+    """
+    index = LSHIndex(threshold=threshold)
+    representatives = []
+    for i, resume in enumerate(resumes):
+        representative = index.find_or_add(i, resume_signature(resume))
+        representatives.append(i if representative is None else representative)
+    return representatives
+
+
+def resume_signature(resume):
+    """The signature stored with a resume's ParsedResume, computing it if extraction did not."""
+    parsed = resume.get('parsed')
+    if parsed is not None and parsed.minhash is not None:
+        return parsed.minhash
+    return minhash_signature(parsed.lower if parsed is not None else resume['text'].lower())
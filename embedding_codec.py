@@ -0,0 +1,258 @@
+# embedding_codec.py
+"""
+Compressed candidate embeddings, scored against a JD without decompressing them.
+
+A 384-dimension float32 embedding is 1.5 KB per candidate, and brute-force ranking reads
+all of them once per JD, so ranking a large pool is bound by memory bandwidth. A codec
+stores them smaller:
+
+    float16   2 bytes per dimension (768 B), practically exact
+    pca:128   the 128 leading principal components, as float16 (256 B)
+    pq:48     product quantization: 48 sub-vectors, each replaced by the nearest of
+              256 trained centroids and stored as its one-byte index (48 B)
+
+Scoring is asymmetric: the JD embedding stays float32 and only the candidate side is
+compressed. PCA projects the JD once into the reduced space; PQ turns it into a table of
+sub-vector dot products per centroid, so a candidate's score is a sum of 48 lookups.
+Scores approximate the cosine similarity; benchmarks/embedding_compression.py reports
+recall@k against exact float32 ranking.
+
+    codec = make_codec("pq:48").fit(sample_embeddings)
+    codes = codec.encode(embeddings)
+    scores = codec.scores(codes, jd_embedding)
+
+The candidate store keeps trained codecs and codes next to the float32 vectors
+(python candidate_store.py compress --codec pq:48), and shard workers can rank from the
+codes (python shard_cluster.py worker ... --codec pq:48).
+"""
+import io
+
+import numpy as np
+
+# Rows scored (or encoded) per step, so temporaries stay small (cache-sized) however large the pool is
+CHUNK_ROWS = 4096
+PQ_CENTROIDS = 256
+PQ_TRAIN_ITERATIONS = 20
+
+
+def _widened_dot(codes, vector):
+    """
+    codes (float16 rows) . vector (float32), widening the codes to float32 a chunk at a time so
+    only the stored side is approximate. numpy's float16 conversion is slow, so torch does it
+    when installed (it is, with the models); numpy otherwise.
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    scores = np.empty(len(codes), dtype=np.float32)
+    try:
+        import torch
+    except ImportError:
+        widened = np.empty((min(CHUNK_ROWS, len(codes)), codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(codes), CHUNK_ROWS):
+            chunk = codes[start:start + CHUNK_ROWS]
+            widened[:len(chunk)] = chunk
+            np.matmul(widened[:len(chunk)], vector, out=scores[start:start + len(chunk)])
+        return scores
+    codes_t, vector_t, scores_t = (torch.from_numpy(np.ascontiguousarray(array)) for array in (codes, vector, scores))
+    with torch.inference_mode():
+        for start in range(0, len(codes), CHUNK_ROWS):
+            torch.mv(codes_t[start:start + CHUNK_ROWS].float(), vector_t, out=scores_t[start:start + CHUNK_ROWS])
+    return scores
+
+
+class EmbeddingCodec:
+    """Float32, uncompressed: the reference the other codecs are measured against."""
+
+    spec = "float32"
+    code_dtype = np.float32
+    dimension = None              # of the raw embeddings, set by fit()
+
+    def fit(self, sample):
+        """Trains the codec on a sample of embeddings (rows). Returns self."""
+        self.dimension = int(np.asarray(sample).shape[1])
+        return self
+
+    @property
+    def code_size(self):
+        """Code values per embedding."""
+        return self.dimension
+
+    def bytes_per_vector(self):
+        return self.code_size * np.dtype(self.code_dtype).itemsize
+
+    def encode(self, embeddings):
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def scores(self, codes, query):
+        """Dot product of the float32 query with every encoded row."""
+        return codes @ np.asarray(query, dtype=np.float32)
+
+    def state(self):
+        """Trained parameters as {name: array}, for to_bytes()."""
+        return {'dimension': np.array(self.dimension)}
+
+    def load_state(self, state):
+        self.dimension = int(state['dimension'])
+
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        np.savez(buffer, **self.state())
+        return buffer.getvalue()
+
+
+class Float16Codec(EmbeddingCodec):
+    """Half precision: half the bytes, errors around 1e-4 on unit vectors."""
+
+    spec = "float16"
+    code_dtype = np.float16
+
+    def encode(self, embeddings):
+        return np.asarray(embeddings, dtype=np.float32).astype(np.float16)
+
+    def scores(self, codes, query):
+        return _widened_dot(codes, query)
+
+
+class PCACodec(EmbeddingCodec):
+    """
+    The `dimensions` leading principal components of the embeddings, as float16. A row x is
+    approximated by mean + code @ components, so x . q ~= code . (components q) + mean . q.
+    """
+
+    code_dtype = np.float16
+
+    def __init__(self, dimensions):
+        self.dimensions = int(dimensions)
+        self.spec = f"pca:{self.dimensions}"
+        self.mean = None
+        self.components = None
+
+    @property
+    def code_size(self):
+        return self.dimensions
+
+    def fit(self, sample):
+        sample = np.asarray(sample, dtype=np.float32)
+        if self.dimensions > min(sample.shape):
+            raise ValueError(f"{self.spec} needs a sample of at least {self.dimensions} embeddings "
+                             f"of at least {self.dimensions} dimensions")
+        super().fit(sample)
+        self.mean = sample.mean(axis=0)
+        _, _, vt = np.linalg.svd(sample - self.mean, full_matrices=False)
+        self.components = np.ascontiguousarray(vt[:self.dimensions])
+        return self
+
+    def encode(self, embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        return ((embeddings - self.mean) @ self.components.T).astype(np.float16)
+
+    def scores(self, codes, query):
+        query = np.asarray(query, dtype=np.float32)
+        scores = _widened_dot(codes, self.components @ query)
+        scores += np.float32(self.mean @ query)
+        return scores
+
+    def state(self):
+        return dict(super().state(), mean=self.mean, components=self.components)
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.mean = state['mean']
+        self.components = state['components']
+
+
+class PQCodec(EmbeddingCodec):
+    """
+    Product quantization: the embedding is cut into `subspaces` equal sub-vectors and each is
+    stored as the index of its nearest centroid (k-means, PQ_CENTROIDS per subspace, fewer for
+    samples smaller than that), one byte. Scores use a per-query lookup table of
+    centroid . query-sub-vector products.
+    """
+
+    code_dtype = np.uint8
+
+    def __init__(self, subspaces, seed=0):
+        self.subspaces = int(subspaces)
+        self.spec = f"pq:{self.subspaces}"
+        self.seed = seed
+        self.centroids = None         # (subspaces, PQ_CENTROIDS, sub-vector dimension)
+
+    @property
+    def code_size(self):
+        return self.subspaces
+
+    def _split(self, embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.shape[1] % self.subspaces:
+            raise ValueError(f"{self.spec}: {embeddings.shape[1]} dimensions do not split into {self.subspaces} sub-vectors")
+        return embeddings.reshape(len(embeddings), self.subspaces, -1)
+
+    @staticmethod
+    def _nearest(vectors, centroids):
+        # argmin of squared distance; |v|^2 is the same for every centroid and is left out
+        return np.argmin((centroids * centroids).sum(axis=1) - 2 * (vectors @ centroids.T), axis=1)
+
+    def fit(self, sample):
+        parts = self._split(sample)
+        super().fit(sample)
+        rng = np.random.default_rng(self.seed)
+        centroid_count = min(PQ_CENTROIDS, len(parts))
+        self.centroids = np.empty((self.subspaces, centroid_count, parts.shape[2]), dtype=np.float32)
+        for subspace in range(self.subspaces):
+            vectors = np.ascontiguousarray(parts[:, subspace])
+            centroids = vectors[rng.choice(len(vectors), centroid_count, replace=False)].copy()
+            for _ in range(PQ_TRAIN_ITERATIONS):
+                assignment = self._nearest(vectors, centroids)
+                counts = np.bincount(assignment, minlength=centroid_count)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, vectors)
+                empty = counts == 0
+                centroids[~empty] = sums[~empty] / counts[~empty, None]
+                # An empty cluster restarts on a random sample vector
+                centroids[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+            self.centroids[subspace] = centroids
+        return self
+
+    def encode(self, embeddings):
+        parts = self._split(embeddings)
+        codes = np.empty((len(parts), self.subspaces), dtype=np.uint8)
+        for start in range(0, len(parts), CHUNK_ROWS):
+            chunk = parts[start:start + CHUNK_ROWS]
+            for subspace in range(self.subspaces):
+                codes[start:start + CHUNK_ROWS, subspace] = self._nearest(chunk[:, subspace], self.centroids[subspace])
+        return codes
+
+    def scores(self, codes, query):
+        query = self._split(np.asarray(query, dtype=np.float32)[None, :])[0]
+        # table[s, c]: dot product of centroid c of subspace s with the query's sub-vector s, flattened
+        # so a code row plus the subspace offsets indexes its entries in one take
+        table = np.einsum('scd,sd->sc', self.centroids, query).ravel()
+        offsets = np.arange(self.subspaces, dtype=np.intp) * self.centroids.shape[1]
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), CHUNK_ROWS):
+            scores[start:start + CHUNK_ROWS] = np.take(table, codes[start:start + CHUNK_ROWS] + offsets).sum(axis=1)
+        return scores
+
+    def state(self):
+        return dict(super().state(), centroids=self.centroids)
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.centroids = state['centroids']
+
+
+def make_codec(spec):
+    """A new (untrained) codec from its spec: float32, float16, pca:<dimensions> or pq:<subspaces>."""
+    name, _, size = spec.partition(":")
+    if name in ("float32", "float16") and not size:
+        return EmbeddingCodec() if name == "float32" else Float16Codec()
+    if name in ("pca", "pq") and size.isdigit() and int(size) > 0:
+        return PCACodec(int(size)) if name == "pca" else PQCodec(int(size))
+    raise ValueError(f"Unknown embedding codec {spec!r} (float32, float16, pca:<dimensions> or pq:<subspaces>)")
+
+
+def load_codec(spec, params):
+    """A trained codec from its spec and to_bytes() parameters."""
+    codec = make_codec(spec)
+    with np.load(io.BytesIO(params)) as state:
+        codec.load_state({name: state[name] for name in state.files})
+    return codec
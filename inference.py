@@ -0,0 +1,223 @@
+# inference.py
+"""
+Inference execution layer: torch thread pools, bounded concurrent model calls and CPU pinning.
+
+By default every model call uses torch's default intra-op pool (one thread per core), so
+two sessions encoding at once run twice as many busy threads as there are cores, and both
+slow down. Here:
+
+- torch's intra-op and inter-op thread counts are set explicitly (configure_threads),
+- at most `slots` model calls run at once and the cores are split evenly between them;
+  further calls wait their turn (ModelGate, wrapped around the models by GatedModel),
+- a process can be pinned to a core set, and worker processes to disjoint core sets
+  (pin_to_cores, pin_worker).
+
+Settings come from the environment (see configure_from_env):
+
+    TALENTSIFT_INFERENCE_SLOTS        model calls allowed at once (default 1: serialized)
+    TALENTSIFT_TORCH_THREADS          intra-op threads per call (default: cores // slots)
+    TALENTSIFT_TORCH_INTEROP_THREADS  inter-op threads (default 1)
+    TALENTSIFT_CPU_CORES              pin this process to these cores, e.g. "0-7" or "0,2,4,6"
+"""
+import os
+import sys
+import threading
+import time
+
+DEFAULT_INFERENCE_SLOTS = 1
+DEFAULT_INTEROP_THREADS = 1
+
+
+# --- Cores and pinning ---
+def available_cores():
+    """Cores this process may run on (its affinity mask where the OS exposes one)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_cores(spec):
+    """Parses a core list like "0-3,8,10-11" into sorted core numbers."""
+    cores = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cores.update(range(int(first), int(last) + 1))
+        else:
+            cores.add(int(part))
+    return sorted(cores)
+
+
+def partition_cores(cores, parts):
+    """Splits cores into `parts` contiguous, near-equal groups (every group gets at least one core)."""
+    parts = max(1, min(parts, len(cores)))
+    size, extra = divmod(len(cores), parts)
+    groups, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(cores[start:end])
+        start = end
+    return groups
+
+
+def pin_to_cores(cores):
+    """Restricts this process to the given cores. Returns False where affinity is not supported (e.g. macOS)."""
+    if not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(0, cores)
+    except OSError as e:
+        print(f"Could not pin process to cores {cores}: {e}")
+        return False
+    return True
+
+
+def pin_worker(index, count):
+    """
+    Pins worker process `index` of `count` to its own share of this process's cores, so
+    parallel workers never compete for a core. Call it before the models are loaded
+    (configure_from_env then sizes the thread pools to the pinned cores).
+    Returns the worker's cores.
+    """
+    groups = partition_cores(available_cores(), count)
+    cores = groups[index % len(groups)]
+    pin_to_cores(cores)
+    return cores
+
+
+# --- Torch thread pools ---
+# The last configure_threads() sizes, applied to torch once it is imported
+_thread_settings = None
+
+
+def configure_threads(intra_op, inter_op=DEFAULT_INTEROP_THREADS):
+    """
+    Sets torch's intra-op and inter-op pool sizes (and OpenMP/MKL's, for libraries loaded later).
+    torch is not imported for this: if it is not loaded yet, the sizes are applied by
+    apply_thread_settings() when the models load.
+    """
+    global _thread_settings
+    os.environ["OMP_NUM_THREADS"] = str(intra_op)
+    os.environ["MKL_NUM_THREADS"] = str(intra_op)
+    _thread_settings = (intra_op, inter_op)
+    if 'torch' in sys.modules:
+        apply_thread_settings()
+
+
+def apply_thread_settings():
+    """Applies the configure_threads() sizes to torch (importing it). Call it before loading a model."""
+    if _thread_settings is None:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    intra_op, inter_op = _thread_settings
+    torch.set_num_threads(intra_op)
+    try:
+        torch.set_num_interop_threads(inter_op)
+    except RuntimeError:
+        # Only settable before torch's first parallel work; the earlier value stays
+        pass
+
+
+# --- Bounded model calls ---
+class ModelGate:
+    """
+    Lets at most `slots` model calls run at once; other callers block until a slot frees up.
+    Keeps counts of calls and of the time spent waiting for a slot.
+    """
+
+    def __init__(self, slots=DEFAULT_INFERENCE_SLOTS):
+        self.slots = max(1, slots)
+        self.reset()
+
+    def reset(self):
+        """
+        Fresh slots and counts. A forked child must call it: a slot held by another of the
+        parent's threads at fork time would never be released in the child.
+        """
+        self._semaphore = threading.BoundedSemaphore(self.slots)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.waited_calls = 0
+        self.wait_seconds = 0.0
+        self.waiting = 0
+        self.max_waiting = 0
+
+    def run(self, fn, *args, **kwargs):
+        waited = not self._semaphore.acquire(blocking=False)
+        if waited:
+            with self._lock:
+                self.waiting += 1
+                self.max_waiting = max(self.max_waiting, self.waiting)
+            started = time.perf_counter()
+            self._semaphore.acquire()
+            with self._lock:
+                self.waiting -= 1
+                self.wait_seconds += time.perf_counter() - started
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._semaphore.release()
+            with self._lock:
+                self.calls += 1
+                self.waited_calls += int(waited)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'slots': self.slots,
+                'calls': self.calls,
+                'waited_calls': self.waited_calls,
+                'mean_wait_ms': round(self.wait_seconds / self.calls * 1000, 2) if self.calls else 0.0,
+                'max_waiting': self.max_waiting
+            }
+
+
+class GatedModel:
+    """
+    Wraps a model so its calls (encode() for sentence-transformers, __call__ for pipelines)
+    go through a ModelGate; every other attribute is passed through.
+    """
+
+    def __init__(self, model, gate):
+        self.model = model
+        self.gate = gate
+
+    def encode(self, *args, **kwargs):
+        return self.gate.run(self.model.encode, *args, **kwargs)
+
+    def __call__(self, *args, **kwargs):
+        return self.gate.run(self.model, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        print(f"Ignoring {name}={value!r}: not an integer")
+        return default
+
+
+def configure_from_env():
+    """
+    Applies the TALENTSIFT_* inference settings (pinning first, then the thread pools sized
+    to the cores left) and returns the ModelGate the models should be wrapped with.
+    """
+    core_spec = os.environ.get("TALENTSIFT_CPU_CORES")
+    if core_spec:
+        pin_to_cores(parse_cores(core_spec))
+    slots = _env_int("TALENTSIFT_INFERENCE_SLOTS", DEFAULT_INFERENCE_SLOTS)
+    intra_op = _env_int("TALENTSIFT_TORCH_THREADS", max(1, len(available_cores()) // slots))
+    configure_threads(intra_op, _env_int("TALENTSIFT_TORCH_INTEROP_THREADS", DEFAULT_INTEROP_THREADS))
+    return ModelGate(slots)
@@ -0,0 +1,457 @@
+# job_queue.py
+"""
+Durable background queue for large screening runs.
+
+Jobs and their files live in a SQLite database, so a run survives the browser tab
+(or the Streamlit server) going away. Worker processes claim queued jobs, screen
+the files in chunks and checkpoint every chunk; a job whose worker stops sending
+heartbeats is picked up again by another worker and continues from its last checkpoint.
+Every write a worker makes is conditional on it still owning the job, so a worker that
+was too slow and lost its job to another one stops instead of overwriting its results.
+
+    python job_queue.py worker --processes 2 --pin-cores
+    python job_queue.py status [JOB_ID]
+
+The database defaults to ~/.cache/talentsift/jobs.sqlite3 (set TALENTSIFT_JOB_DB to change it).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+
+import numpy as np
+
+from inference import pin_worker
+from skill_matcher import DEFAULT_CACHE_DIR
+
+DEFAULT_DB_PATH = os.path.join(DEFAULT_CACHE_DIR, "jobs.sqlite3")
+# Files screened per checkpoint (one encode batch, one transaction)
+CHECKPOINT_FILES = 32
+# A running job without a heartbeat for this long is considered abandoned and re-claimed
+STALE_SECONDS = 120
+# A worker refreshes its job's heartbeat at most this often (well within STALE_SECONDS)
+HEARTBEAT_SECONDS = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,               -- queued / running / done / failed
+    job_description TEXT NOT NULL,
+    options TEXT NOT NULL,              -- JSON: section_weighted, collapse_duplicates, min_years, min_degree, min_skill_years
+    total_files INTEGER NOT NULL,
+    processed_files INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    heartbeat_at REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT,
+    jd_embedding BLOB,
+    bias BLOB
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    content BLOB,                       -- dropped once the file is processed
+    status TEXT NOT NULL,               -- pending / done / failed / rejected / duplicate
+    candidate_id TEXT,
+    duplicate_of TEXT,                  -- candidate ID of the near-duplicate this file was collapsed into
+    text TEXT,
+    parsed BLOB,
+    embedding BLOB,
+    PRIMARY KEY (job_id, idx)
+);
+
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    heartbeat_at REAL NOT NULL
+);
+"""
+
+
+def connect(db_path=None):
+    """Opens the queue database (creating it if needed) in WAL mode, so readers never block workers."""
+    db_path = db_path or os.environ.get("TALENTSIFT_JOB_DB", DEFAULT_DB_PATH)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    # Queues created before near-duplicate detection lack the duplicate_of column
+    if 'duplicate_of' not in {row[1] for row in conn.execute("PRAGMA table_info(job_files)")}:
+        conn.execute("ALTER TABLE job_files ADD COLUMN duplicate_of TEXT")
+    return conn
+
+
+# --- Submitting and polling (used by the app; no models needed) ---
+def submit_job(job_description, files, options=None, db_path=None):
+    """
+    Queues a screening job. files is a list of (file name, bytes) pairs.
+    options may set section_weighted, collapse_duplicates, min_years, min_degree and
+    min_skill_years ({skill id: years}).
+    Returns the job ID.
+    """
+    options = dict(options or {})
+    options['min_skill_years'] = sorted((options.get('min_skill_years') or {}).items())
+    job_id = uuid.uuid4().hex[:12]
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("INSERT INTO jobs (id, status, job_description, options, total_files, created_at) "
+                         "VALUES (?, 'queued', ?, ?, ?, ?)",
+                         (job_id, job_description, json.dumps(options), len(files), time.time()))
+            conn.executemany("INSERT INTO job_files (job_id, idx, name, content, status) VALUES (?, ?, ?, ?, 'pending')",
+                             [(job_id, idx, name, content) for idx, (name, content) in enumerate(files)])
+    finally:
+        conn.close()
+    return job_id
+
+
+def _job_options(options_json):
+    options = json.loads(options_json)
+    options['min_skill_years'] = {int(skill_id): years for skill_id, years in options.get('min_skill_years', [])}
+    return options
+
+
+def list_jobs(job_ids=None, limit=20, db_path=None):
+    """Status of the given jobs (or the most recent ones), newest first."""
+    conn = connect(db_path)
+    try:
+        query = ("SELECT j.id, j.status, j.total_files, j.processed_files, j.created_at, j.started_at, "
+                 "j.finished_at, j.error, j.options, "
+                 "(SELECT COUNT(*) FROM job_files f WHERE f.job_id = j.id AND f.status = 'done'), "
+                 "(SELECT COUNT(*) FROM job_files f WHERE f.job_id = j.id AND f.status = 'failed'), "
+                 "(SELECT COUNT(*) FROM job_files f WHERE f.job_id = j.id AND f.status = 'rejected'), "
+                 "(SELECT COUNT(*) FROM job_files f WHERE f.job_id = j.id AND f.status = 'duplicate') "
+                 "FROM jobs j")
+        params = []
+        if job_ids is not None:
+            query += f" WHERE j.id IN ({','.join('?' * len(job_ids))})"
+            params = list(job_ids)
+        query += " ORDER BY j.created_at DESC LIMIT ?"
+        rows = conn.execute(query, params + [limit]).fetchall()
+    finally:
+        conn.close()
+    return [{
+        'id': row[0], 'status': row[1], 'total_files': row[2], 'processed_files': row[3],
+        'created_at': row[4], 'started_at': row[5], 'finished_at': row[6], 'error': row[7],
+        'options': _job_options(row[8]), 'accepted': row[9], 'failed': row[10], 'rejected': row[11],
+        'duplicates': row[12]
+    } for row in rows]
+
+
+def job_status(job_id, db_path=None):
+    """Status dict for one job (see list_jobs), or None if it does not exist."""
+    jobs = list_jobs([job_id], limit=1, db_path=db_path)
+    return jobs[0] if jobs else None
+
+
+def load_job_result(job_id, db_path=None):
+    """
+    Results of a finished job, in the same shape as run_screening_pipeline's result
+    (results_df, resumes, embeddings, jd_embedding, bias, problem_files, rejected, problem_indices,
+    rejected_indices, duplicates, timings), plus the job_description and options. Returns None until the job is done.
+    The indices point into 'file_keys' (content hash -> file name of the job's files), so
+    ScreeningSession.add(job_description, result, result['file_keys']) records every file.
+    """
+    from advanced_utils import results_from_scores
+
+    conn = connect(db_path)
+    try:
+        job = conn.execute("SELECT status, job_description, options, jd_embedding, bias, started_at, finished_at "
+                           "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None or job[0] != 'done':
+            return None
+        files = conn.execute("SELECT name, status, candidate_id, text, parsed, embedding, duplicate_of FROM job_files "
+                             "WHERE job_id = ? ORDER BY idx", (job_id,)).fetchall()
+    finally:
+        conn.close()
+
+    jd_embedding = np.frombuffer(job[3], dtype=np.float32)
+    resumes, embeddings, problem_files, rejected, duplicates = [], [], [], [], []
+    file_keys, positions, problem_indices, rejected_indices = {}, {}, [], []
+    for name, status, candidate_id, text, parsed, embedding, duplicate_of in files:
+        if candidate_id is not None and candidate_id not in positions:
+            positions[candidate_id] = len(file_keys)
+            file_keys[candidate_id] = name
+        if status == 'done':
+            resumes.append({'id': candidate_id, 'name': name, 'text': text, 'parsed': pickle.loads(parsed)})
+            embeddings.append(np.frombuffer(embedding, dtype=np.float32))
+        elif status == 'failed':
+            problem_files.append(name)
+            # Jobs screened before unreadable files kept their content hash cannot be keyed
+            if candidate_id is not None:
+                problem_indices.append(positions[candidate_id])
+        elif status == 'rejected':
+            rejected.append(name)
+            rejected_indices.append(positions[candidate_id])
+        elif status == 'duplicate':
+            duplicates.append(({'id': candidate_id, 'name': name}, duplicate_of))
+    embedding_matrix = np.vstack(embeddings) if embeddings else np.zeros((0, jd_embedding.shape[0]), dtype=np.float32)
+    return {
+        'job_description': job[1],
+        'options': _job_options(job[2]),
+        'results_df': results_from_scores(resumes, embedding_matrix @ jd_embedding if resumes else []),
+        'resumes': resumes,
+        'embeddings': embedding_matrix,
+        'jd_embedding': jd_embedding,
+        'bias': pickle.loads(job[4]),
+        'problem_files': problem_files,
+        'rejected': rejected,
+        'file_keys': file_keys,
+        'problem_indices': problem_indices,
+        'rejected_indices': rejected_indices,
+        'duplicates': duplicates,
+        'timings': {'total_seconds': round(job[6] - job[5], 3)}
+    }
+
+
+# --- Workers ---
+class JobLost(Exception):
+    """The job was re-claimed by another worker (this one's heartbeat went stale)."""
+
+
+def _claim_job(conn, worker_id):
+    """Atomically takes the oldest queued job, or a running job whose worker went silent."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' OR (status = 'running' AND heartbeat_at < ?) "
+                           "ORDER BY created_at LIMIT 1", (now - STALE_SECONDS,)).fetchone()
+        if row is not None:
+            conn.execute("UPDATE jobs SET status = 'running', worker_id = ?, heartbeat_at = ?, "
+                         "started_at = COALESCE(started_at, ?) WHERE id = ?", (worker_id, now, now, row[0]))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return row[0] if row else None
+
+
+def _owned_update(conn, query, params, job_id, worker_id):
+    """Runs an UPDATE of this worker's job row (query ends in `WHERE id = ? AND worker_id = ?`)."""
+    if conn.execute(query, (*params, job_id, worker_id)).rowcount == 0:
+        raise JobLost(f"Job {job_id} was taken over by another worker")
+
+
+class _Heartbeat:
+    """Refreshes the job's heartbeat (at most every HEARTBEAT_SECONDS) while the worker is busy with it."""
+
+    def __init__(self, conn, job_id, worker_id):
+        self.conn, self.job_id, self.worker_id = conn, job_id, worker_id
+        self.last = time.time()
+
+    def __call__(self, force=False):
+        now = time.time()
+        if not force and now - self.last < HEARTBEAT_SECONDS:
+            return
+        with self.conn:
+            _owned_update(self.conn, "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND worker_id = ?",
+                          (now,), self.job_id, self.worker_id)
+            self.conn.execute("UPDATE workers SET heartbeat_at = ? WHERE id = ?", (now, self.worker_id))
+        self.last = now
+
+
+def _process_job(conn, job_id, worker_id):
+    """
+    Screens the job's pending files chunk by chunk, then stores the JD-side results.
+    Raises JobLost as soon as another worker has taken the job over.
+    """
+    from advanced_utils import detect_bias, encode_job_description, encode_resumes, DEFAULT_SECTION_WEIGHTS
+    from dedup import LSHIndex, resume_signature
+    from resume_parser import parse_resume, resume_passes_filters
+    from utils import extract_text, file_from_bytes, file_content_hash
+
+    job_description, options_json = conn.execute(
+        "SELECT job_description, options FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    options = _job_options(options_json)
+    section_weights = DEFAULT_SECTION_WEIGHTS if options.get('section_weighted') else None
+    heartbeat = _Heartbeat(conn, job_id, worker_id)
+
+    # Content hashes of the files ranked so far (including before a restart): an exact copy of one
+    # of them has the same candidate ID and is recorded as its duplicate rather than ranked twice
+    ranked_ids = set()
+    duplicate_index = LSHIndex() if options.get('collapse_duplicates') else None
+    for candidate_id, parsed in conn.execute("SELECT candidate_id, parsed FROM job_files "
+                                             "WHERE job_id = ? AND status = 'done'", (job_id,)):
+        ranked_ids.add(candidate_id)
+        if duplicate_index is not None:
+            duplicate_index.add(candidate_id, resume_signature({'parsed': pickle.loads(parsed)}))
+
+    while True:
+        rows = conn.execute("SELECT idx, name, content FROM job_files WHERE job_id = ? AND status = 'pending' "
+                            "ORDER BY idx LIMIT ?", (job_id, CHECKPOINT_FILES)).fetchall()
+        if not rows:
+            break
+        updates, accepted = [], []
+        for idx, name, content in rows:
+            heartbeat()
+            file = file_from_bytes(content, name)
+            candidate_id = file_content_hash(file)
+            if candidate_id in ranked_ids:
+                updates.append(('duplicate', candidate_id, None, None, None, candidate_id, job_id, idx))
+                continue
+            text = extract_text(file)
+            if not text:
+                updates.append(('failed', candidate_id, None, None, None, None, job_id, idx))
+                continue
+            resume = {'id': candidate_id, 'name': name, 'text': text, 'parsed': parse_resume(text)}
+            if not resume_passes_filters(resume['parsed'], min_years=options.get('min_years', 0),
+                                         min_degree=options.get('min_degree', 0),
+                                         min_skill_years=options['min_skill_years']):
+                updates.append(('rejected', resume['id'], None, None, None, None, job_id, idx))
+                continue
+            if duplicate_index is not None:
+                representative = duplicate_index.find_or_add(resume['id'], resume_signature(resume))
+                if representative is not None and representative != resume['id']:
+                    # Near-duplicate of a resume already in this job: never encoded
+                    updates.append(('duplicate', resume['id'], None, None, None, representative, job_id, idx))
+                    continue
+            ranked_ids.add(resume['id'])
+            accepted.append((idx, resume))
+
+        if accepted:
+            heartbeat()
+            embeddings = encode_resumes([resume for _, resume in accepted], section_weights).astype(np.float32)
+            for (idx, resume), embedding in zip(accepted, embeddings):
+                updates.append(('done', resume['id'], resume['text'], pickle.dumps(resume['parsed']),
+                                embedding.tobytes(), None, job_id, idx))
+
+        # Checkpoint: the whole chunk and the job's progress commit together, or not at all
+        # once another worker owns the job (its UPDATE then matches no row and the chunk rolls back)
+        with conn:
+            _owned_update(conn, "UPDATE jobs SET processed_files = processed_files + ?, heartbeat_at = ? "
+                          "WHERE id = ? AND worker_id = ?", (len(updates), time.time()), job_id, worker_id)
+            conn.executemany("UPDATE job_files SET status = ?, candidate_id = ?, text = ?, parsed = ?, embedding = ?, "
+                             "duplicate_of = ?, content = NULL WHERE job_id = ? AND idx = ? AND "
+                             "EXISTS (SELECT 1 FROM jobs WHERE jobs.id = job_files.job_id AND jobs.worker_id = ?)",
+                             [update + (worker_id,) for update in updates])
+            conn.execute("UPDATE workers SET heartbeat_at = ? WHERE id = ?", (time.time(), worker_id))
+        heartbeat.last = time.time()
+
+    heartbeat(force=True)
+    jd_embedding = encode_job_description(job_description).astype(np.float32)
+    bias = detect_bias(job_description)
+    with conn:
+        _owned_update(conn, "UPDATE jobs SET status = 'done', finished_at = ?, jd_embedding = ?, bias = ? "
+                      "WHERE id = ? AND worker_id = ?", (time.time(), jd_embedding.tobytes(), pickle.dumps(bias)),
+                      job_id, worker_id)
+
+
+def run_worker(db_path=None, poll_seconds=1.0, once=False, pin=None):
+    """
+    Worker loop: claims and processes jobs until interrupted (or, with once=True, until the queue is empty).
+    pin=(index, count) pins this worker to its own share of the cores before any model is loaded.
+    """
+    if pin is not None:
+        cores = pin_worker(*pin)
+        print(f"Worker {pin[0] + 1}/{pin[1]} pinned to cores {cores}")
+    # Models load before the first claim, so a slow first load cannot let the job's heartbeat go stale
+    from advanced_utils import load_models
+    load_models()
+    worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    conn = connect(db_path)
+    print(f"Worker {worker_id} waiting for jobs...")
+    try:
+        while True:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO workers (id, pid, heartbeat_at) VALUES (?, ?, ?)",
+                             (worker_id, os.getpid(), time.time()))
+            job_id = _claim_job(conn, worker_id)
+            if job_id is None:
+                if once:
+                    break
+                time.sleep(poll_seconds)
+                continue
+            print(f"Worker {worker_id} processing job {job_id}")
+            try:
+                _process_job(conn, job_id, worker_id)
+            except JobLost as e:
+                print(f"Worker {worker_id} stopped: {e}")
+            except Exception as e:
+                print(f"Job {job_id} failed: {e}")
+                with conn:
+                    conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                                 "WHERE id = ? AND worker_id = ?", (str(e), time.time(), job_id, worker_id))
+    finally:
+        with conn:
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+        conn.close()
+
+
+def live_worker_count(db_path=None):
+    conn = connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM workers WHERE heartbeat_at >= ?",
+                            (time.time() - STALE_SECONDS,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def ensure_workers(count=1, db_path=None):
+    """
+    Starts detached worker processes until `count` are alive, so queued jobs keep
+    running after the browser tab or Streamlit session that submitted them is gone.
+    Returns the number of workers started.
+    """
+    missing = max(count - live_worker_count(db_path), 0)
+    env = dict(os.environ)
+    if db_path:
+        env["TALENTSIFT_JOB_DB"] = db_path
+    for _ in range(missing):
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker"], env=env,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentSift AI background job queue")
+    parser.add_argument("--db", help="Queue database path (default: TALENTSIFT_JOB_DB or ~/.cache/talentsift/jobs.sqlite3)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    worker_parser = subparsers.add_parser("worker", help="Run worker processes")
+    worker_parser.add_argument("--processes", type=int, default=1,
+                               help="Worker processes (forked after loading the models once; see prefork_pool.py)")
+    worker_parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    worker_parser.add_argument("--pin-cores", action="store_true",
+                               help="Give each worker process its own set of cores (see inference.py)")
+    status_parser = subparsers.add_parser("status", help="Show job status")
+    status_parser.add_argument("job_id", nargs="?")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        jobs = [job_status(args.job_id, args.db)] if args.job_id else list_jobs(db_path=args.db)
+        for job in filter(None, jobs):
+            print(f"{job['id']}  {job['status']:<8} {job['processed_files']}/{job['total_files']} files  "
+                  f"{job['accepted']} ranked, {job['failed']} failed, {job['rejected']} rejected, "
+                  f"{job['duplicates']} duplicates")
+    elif args.processes <= 1:
+        run_worker(args.db, once=args.once)
+    elif "fork" in multiprocessing.get_all_start_methods():
+        # The models are loaded once, here, and shared copy-on-write by the forked workers
+        from prefork_pool import PreforkPool
+        with PreforkPool(args.processes, pin=args.pin_cores) as pool:
+            for future in [pool.submit(run_worker, args.db, once=args.once) for _ in range(args.processes)]:
+                future.result()
+    else:
+        # No fork (Windows): every worker process loads its own models
+        processes = [multiprocessing.Process(target=run_worker, args=(args.db,),
+                                             kwargs={'once': args.once, 'pin': (i, args.processes) if args.pin_cores else None})
+                     for i in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+# model_bundle.py
+"""
+Offline model bundle for fast cold starts.
+
+Without a bundle, every start resolves both models through the Hugging Face hub cache
+(network lookups included) and loads their weights from whatever format the hub has.
+bundle-models packs both models into one local folder as safetensors, which load by
+memory-mapping the file instead of unpickling and copying it, next to their tokenizers
+and configs. When a bundle is found, models load from it with hub lookups switched off.
+
+    python model_bundle.py bundle-models ./models
+    TALENTSIFT_MODEL_BUNDLE=./models streamlit run app.py
+    python model_bundle.py info ./models
+
+Without TALENTSIFT_MODEL_BUNDLE, a bundle in ~/.cache/talentsift/models is used if present
+(TALENTSIFT_MODEL_BUNDLE=none always loads from the hub).
+python -m benchmarks.cold_start compares time-to-first-ranking with and without a bundle.
+
+TALENTSIFT_CLASSIFIER_PRECISION=int8 runs the emotion classifier with int8 linear layers and
+embeddings (dynamic quantization, applied after loading; the bundle keeps float32 weights).
+python -m benchmarks.classifier_quantization reports its agreement with float32.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import warnings
+
+from skill_matcher import DEFAULT_CACHE_DIR
+
+SEMANTIC_MODEL_NAME = 'all-MiniLM-L6-v2'
+CLASSIFIER_MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+DEFAULT_BUNDLE_DIR = os.path.join(DEFAULT_CACHE_DIR, "models")
+BUNDLE_MANIFEST = "bundle.json"
+BUNDLE_FORMAT_VERSION = 1
+CLASSIFIER_PRECISIONS = ("float32", "int8")
+
+
+# --- Finding a bundle ---
+def find_bundle(path=None):
+    """
+    The bundle manifest (with its absolute 'root') from path, TALENTSIFT_MODEL_BUNDLE or the
+    default folder, or None when there is no bundle (or TALENTSIFT_MODEL_BUNDLE=none). An explicitly
+    given bundle that cannot be read is reported and ignored, so the app still starts (from the hub).
+    """
+    explicit = path or os.environ.get("TALENTSIFT_MODEL_BUNDLE")
+    if explicit == "none":
+        return None
+    root = os.path.abspath(explicit or DEFAULT_BUNDLE_DIR)
+    manifest_path = os.path.join(root, BUNDLE_MANIFEST)
+    if not os.path.exists(manifest_path):
+        if explicit:
+            print(f"No model bundle at {root} ({BUNDLE_MANIFEST} missing); loading models from the hub")
+        return None
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring model bundle at {root}: {e}")
+        return None
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        print(f"Ignoring model bundle at {root}: format {manifest.get('format_version')}, "
+              f"expected {BUNDLE_FORMAT_VERSION} (re-run bundle-models)")
+        return None
+    manifest['root'] = root
+    return manifest
+
+
+def enable_offline_mode():
+    """Switches Hugging Face hub lookups off (before the libraries are imported, where possible)."""
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+    os.environ["HF_DATASETS_OFFLINE"] = "1"
+    if 'huggingface_hub' in sys.modules:
+        # Already imported: its constants were read at import time
+        sys.modules['huggingface_hub'].constants.HF_HUB_OFFLINE = True
+
+
+def _bundled_path(bundle, role, name):
+    """The local folder of `role` in the bundle, if the bundle holds that model."""
+    if bundle is None:
+        return None
+    entry = bundle['models'].get(role)
+    if entry is None or entry['source'] != name:
+        return None
+    return os.path.join(bundle['root'], entry['path'])
+
+
+# --- Loading ---
+def _torch_only():
+    """Keeps transformers from importing TensorFlow/Flax when they happen to be installed: both models run on torch."""
+    os.environ.setdefault("USE_TF", "0")
+    os.environ.setdefault("USE_FLAX", "0")
+    os.environ.setdefault("USE_TORCH", "1")
+
+
+class LazyModel:
+    """
+    A model loaded on first use: the first call, encode() or attribute access runs `loader`
+    (once, however many threads get there at the same time). Until then nothing of torch,
+    transformers or sentence-transformers is imported.
+    """
+
+    def __init__(self, loader, description):
+        self._loader = loader
+        self.description = description
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    print(f"Loading {self.description}...")
+                    self._model = self._loader()
+        return self._model
+
+    def encode(self, *args, **kwargs):
+        return self.load().encode(*args, **kwargs)
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            # Protocol lookups (copy, pickle) must not trigger a load
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
+def load_semantic_model(bundle=None, name=SEMANTIC_MODEL_NAME):
+    """The SentenceTransformer `name`, from the bundle when it holds it, otherwise from the hub."""
+    _torch_only()
+    from sentence_transformers import SentenceTransformer
+    path = _bundled_path(bundle, 'semantic', name)
+    if path is None:
+        return SentenceTransformer(name)
+    # low_cpu_mem_usage: no throwaway random initialisation before the weights are mapped in
+    return SentenceTransformer(path, local_files_only=True, model_kwargs={'low_cpu_mem_usage': True})
+
+
+def classifier_precision():
+    """The classifier precision from TALENTSIFT_CLASSIFIER_PRECISION (default float32)."""
+    precision = os.environ.get("TALENTSIFT_CLASSIFIER_PRECISION", "float32").strip().lower()
+    if precision not in CLASSIFIER_PRECISIONS:
+        print(f"Ignoring TALENTSIFT_CLASSIFIER_PRECISION={precision!r}: expected one of {', '.join(CLASSIFIER_PRECISIONS)}")
+        return "float32"
+    return precision
+
+
+def quantize_int8(model):
+    """
+    Dynamic int8 quantization, in place: linear layers (the compute) get int8 weights and
+    activations quantized per call; embedding tables (for DistilRoBERTa, a third of the
+    weights) get int8 weights only. Layer norms stay float32. Returns the model.
+    """
+    import torch
+    from torch.ao.quantization import default_dynamic_qconfig, float_qparams_weight_only_qconfig
+    if torch.backends.quantized.engine == "none" and "qnnpack" in torch.backends.quantized.supported_engines:
+        # ARM builds
+        torch.backends.quantized.engine = "qnnpack"
+    with warnings.catch_warnings():
+        # torch.ao.quantization is deprecated in favour of torchao, which is not a dependency here
+        warnings.simplefilter("ignore")
+        return torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear: default_dynamic_qconfig, torch.nn.Embedding: float_qparams_weight_only_qconfig},
+            inplace=True)
+
+
+def load_classifier(bundle=None, name=CLASSIFIER_MODEL_NAME, precision="float32"):
+    """
+    The emotion text-classification pipeline, from the bundle when it holds it, otherwise from
+    the hub. precision="int8" quantizes its linear layers (quantize_int8).
+    """
+    _torch_only()
+    from transformers import pipeline
+    path = _bundled_path(bundle, 'classifier', name)
+    if path is None:
+        classifier = pipeline("text-classification", model=name, return_all_scores=True)
+    else:
+        classifier = pipeline("text-classification", model=path, tokenizer=path, return_all_scores=True,
+                              model_kwargs={'low_cpu_mem_usage': True})
+    if precision == "int8":
+        quantize_int8(classifier.model)
+    return classifier
+
+
+def model_bytes(model):
+    """Bytes held by a torch model's weights and buffers (quantized layers' packed int8 weights included)."""
+    import torch
+
+    def tensor_bytes(value):
+        if isinstance(value, torch.Tensor):
+            return value.numel() * value.element_size()
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(item) for item in value)
+        return 0
+
+    return sum(tensor_bytes(value) for value in model.state_dict().values())
+
+
+# --- Building a bundle ---
+def _folder_bytes(folder):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(folder) for name in names)
+
+
+def _weight_files(folder):
+    return sorted(os.path.relpath(os.path.join(root, name), folder) for root, _, names in os.walk(folder)
+                  for name in names if name.endswith((".safetensors", ".bin", ".pt", ".pth", ".h5", ".msgpack")))
+
+
+def bundle_models(out_dir, semantic_name=SEMANTIC_MODEL_NAME, classifier_name=CLASSIFIER_MODEL_NAME):
+    """
+    Downloads (or reads from the hub cache) both models and writes them to out_dir as
+    safetensors with their tokenizers and configs, plus a bundle.json manifest.
+    The bundle is built next to out_dir and moved into place at the end, so a failed
+    run never leaves a half-written bundle behind. Returns the manifest.
+    """
+    _torch_only()
+    import sentence_transformers
+    import torch
+    import transformers
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    out_dir = os.path.abspath(out_dir)
+    if os.path.isdir(out_dir) and os.listdir(out_dir) and not os.path.exists(os.path.join(out_dir, BUNDLE_MANIFEST)):
+        # Only an earlier bundle is ever replaced
+        raise ValueError(f"{out_dir} exists and is not a model bundle")
+    staging = f"{out_dir}.partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        semantic_dir = os.path.join(staging, "semantic")
+        sentence_transformers.SentenceTransformer(semantic_name).save(semantic_dir, safe_serialization=True,
+                                                                      create_model_card=False)
+        classifier_dir = os.path.join(staging, "classifier")
+        AutoTokenizer.from_pretrained(classifier_name).save_pretrained(classifier_dir)
+        AutoModelForSequenceClassification.from_pretrained(classifier_name).save_pretrained(
+            classifier_dir, safe_serialization=True)
+
+        models = {}
+        for role, name, folder in [('semantic', semantic_name, semantic_dir),
+                                   ('classifier', classifier_name, classifier_dir)]:
+            weights = _weight_files(folder)
+            pickled = [weight for weight in weights if not weight.endswith(".safetensors")]
+            if pickled:
+                raise RuntimeError(f"{name} was saved with non-safetensors weights: {', '.join(pickled)}")
+            models[role] = {'source': name, 'path': role, 'weights': weights, 'bytes': _folder_bytes(folder)}
+        manifest = {
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'created_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            'models': models,
+            'versions': {'transformers': transformers.__version__,
+                         'sentence_transformers': sentence_transformers.__version__, 'torch': torch.__version__}
+        }
+        with open(os.path.join(staging, BUNDLE_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(staging, out_dir)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentSift AI offline model bundle")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    bundle_parser = subparsers.add_parser("bundle-models", help="Pack both models into a local folder (safetensors)")
+    bundle_parser.add_argument("out_dir", nargs="?", default=DEFAULT_BUNDLE_DIR)
+    bundle_parser.add_argument("--semantic-model", default=SEMANTIC_MODEL_NAME)
+    bundle_parser.add_argument("--classifier-model", default=CLASSIFIER_MODEL_NAME)
+    info_parser = subparsers.add_parser("info", help="Show what a bundle holds")
+    info_parser.add_argument("bundle_dir", nargs="?", default=None)
+    args = parser.parse_args()
+
+    if args.command == "bundle-models":
+        started = time.perf_counter()
+        manifest = bundle_models(args.out_dir, args.semantic_model, args.classifier_model)
+        size = sum(model['bytes'] for model in manifest['models'].values())
+        print(f"Bundled {len(manifest['models'])} models into {os.path.abspath(args.out_dir)} "
+              f"({size / 2 ** 20:.0f} MB) in {time.perf_counter() - started:.1f}s")
+        print(f"Use it with TALENTSIFT_MODEL_BUNDLE={os.path.abspath(args.out_dir)}")
+        return
+    bundle = find_bundle(args.bundle_dir)
+    if bundle is None:
+        print("No model bundle found")
+        sys.exit(1)
+    print(f"{bundle['root']} (created {bundle['created_at']})")
+    for role, model in bundle['models'].items():
+        print(f"  {role}: {model['source']}, {model['bytes'] / 2 ** 20:.0f} MB, {', '.join(model['weights'])}")
+
+
+if __name__ == "__main__":
+    main()
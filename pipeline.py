@@ -0,0 +1,325 @@
+# pipeline.py
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from advanced_utils import (detect_bias, encode_job_description, encode_resumes, results_from_scores, generate_insights_batch,
+                            ranking_order)
+from candidate_table import CandidateTable
+from dedup import LSHIndex, resume_signature
+
+def run_screening_pipeline(job_description, files, extract_fn, bias_fn=detect_bias, section_weights=None,
+                           accept_fn=None, duplicate_fn=None, embedding_cache=None, on_progress=None,
+                           extract_workers=4, batch_size=32, queue_size=64, thread_initializer=None):
+    """
+    Screens a batch of uploaded files with overlapping stages:
+
+    - extraction workers turn files into resumes and stream them into a bounded queue
+      (a full queue makes the workers wait, so memory stays bounded),
+    - the calling thread consumes the queue and encodes resumes in batches as they arrive,
+    - bias detection on the JD runs concurrently on its own thread.
+
+    extract_fn(file) returns a resume dict ({'id', 'name', 'text', 'parsed'}) or None.
+    accept_fn(resume) can reject resumes (hard filters) before they are encoded.
+    duplicate_fn(resume) returns the candidate ID of an earlier near-duplicate (or None);
+    duplicates are not encoded and are returned as (resume, representative ID) pairs.
+    embedding_cache maps candidate ID -> embedding; hits skip encoding and new embeddings are added.
+    on_progress(extracted, encoded, total) is called from the calling thread after every file and batch.
+    thread_initializer runs in each worker thread (e.g. to attach a Streamlit script context).
+
+    Returns a dict with the ranked 'results_df', the accepted 'resumes' (upload order) and their
+    'embeddings', the 'bias' result, 'problem_files', 'rejected' names, 'duplicates' and stage 'timings'.
+    'problem_indices' and 'rejected_indices' are the upload indices of the problem and rejected
+    files (file names need not be unique).
+    """
+    started = time.perf_counter()
+    total = len(files)
+    work_queue = queue.Queue(maxsize=queue_size)
+    embedding_cache = {} if embedding_cache is None else embedding_cache
+    stop = threading.Event()
+
+    def extract_into_queue(index, file):
+        try:
+            resume = extract_fn(file)
+        except Exception as e:
+            print(f"Error extracting {file.name}: {e}")
+            resume = None
+        # Wait for queue space, but give up if the consumer has stopped (e.g. after an error)
+        while not stop.is_set():
+            try:
+                work_queue.put((index, file.name, resume), timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    bias_executor = ThreadPoolExecutor(max_workers=1, initializer=thread_initializer)
+    extract_executor = ThreadPoolExecutor(max_workers=max(1, extract_workers), initializer=thread_initializer)
+    try:
+        bias_future = bias_executor.submit(bias_fn, job_description)
+        for index, file in enumerate(files):
+            extract_executor.submit(extract_into_queue, index, file)
+
+        jd_embedding = encode_job_description(job_description)
+
+        accepted = {}      # upload index -> resume
+        embeddings = {}    # upload index -> embedding
+        pending = []       # (upload index, resume) waiting to be encoded
+        problem_files, rejected, duplicates = [], [], []
+        problem_indices, rejected_indices = [], []
+        extracted = encoded = 0
+        encode_seconds = 0.0
+
+        def encode_pending():
+            nonlocal encoded, encode_seconds
+            if not pending:
+                return
+            batch_started = time.perf_counter()
+            batch_embeddings = encode_resumes([resume for _, resume in pending], section_weights, batch_size=batch_size)
+            encode_seconds += time.perf_counter() - batch_started
+            for (index, resume), embedding in zip(pending, batch_embeddings):
+                embeddings[index] = embedding
+                embedding_cache[resume['id']] = embedding
+            encoded += len(pending)
+            pending.clear()
+
+        def report():
+            if on_progress:
+                on_progress(extracted, encoded, total)
+
+        def consume(index, file_name, resume):
+            nonlocal encoded
+            if resume is None:
+                problem_files.append(file_name)
+                problem_indices.append(index)
+                encoded += 1
+            elif accept_fn is not None and not accept_fn(resume):
+                rejected.append(file_name)
+                rejected_indices.append(index)
+                encoded += 1
+            else:
+                representative = duplicate_fn(resume) if duplicate_fn is not None else None
+                if representative is not None:
+                    # Near-duplicate of a resume already ranked: never encoded
+                    duplicates.append((resume, representative))
+                    encoded += 1
+                else:
+                    accepted[index] = resume
+                    cached = embedding_cache.get(resume['id'])
+                    if cached is not None:
+                        embeddings[index] = cached
+                        encoded += 1
+                    else:
+                        pending.append((index, resume))
+                        if len(pending) >= batch_size:
+                            encode_pending()
+
+        # Files finish extracting in any order; they are consumed in upload order, so
+        # results (e.g. which copy of a duplicate is kept) do not depend on thread timing
+        finished = {}
+        index = 0
+        for _ in range(total):
+            finished_index, file_name, resume = work_queue.get()
+            finished[finished_index] = (file_name, resume)
+            extracted += 1
+            while index in finished:
+                consume(index, *finished.pop(index))
+                index += 1
+            report()
+        extraction_done = time.perf_counter()
+        encode_pending()
+        report()
+
+        bias = bias_future.result()
+    finally:
+        stop.set()
+        extract_executor.shutdown(wait=False, cancel_futures=True)
+        bias_executor.shutdown(wait=False)
+
+    order = sorted(accepted)
+    resumes = [accepted[index] for index in order]
+    if resumes:
+        embedding_matrix = np.vstack([embeddings[index] for index in order]).astype(np.float32)
+        results_df = results_from_scores(resumes, embedding_matrix @ jd_embedding)
+    else:
+        embedding_matrix = np.zeros((0, jd_embedding.shape[0]), dtype=np.float32)
+        results_df = results_from_scores([], [])
+
+    return {
+        'results_df': results_df,
+        'resumes': resumes,
+        'embeddings': embedding_matrix,
+        'jd_embedding': jd_embedding,
+        'bias': bias,
+        'problem_files': problem_files,
+        'rejected': rejected,
+        'problem_indices': problem_indices,
+        'rejected_indices': rejected_indices,
+        'duplicates': duplicates,
+        'timings': {
+            'extraction_seconds': round(extraction_done - started, 3),
+            'encoding_seconds': round(encode_seconds, 3),
+            'total_seconds': round(time.perf_counter() - started, 3),
+        }
+    }
+
+
+def merge_ranked(order, scores, new_rows, candidate_ids):
+    """
+    Inserts new rows into an existing ranking (row indices in ranking_order: descending score,
+    ties by candidate ID). Only the new rows are sorted; each is then placed by binary search,
+    so adding k candidates to n costs O(k log k + n) instead of re-sorting all n + k.
+    """
+    candidate_ids = np.asarray(candidate_ids, dtype=str)
+    new_rows = np.asarray(new_rows, dtype=np.int64)
+    new_rows = new_rows[ranking_order(scores[new_rows], candidate_ids[new_rows])]
+    ranked = -scores[order]
+    positions = np.searchsorted(ranked, -scores[new_rows], side='left')
+    tie_ends = np.searchsorted(ranked, -scores[new_rows], side='right')
+    # Within a run of equal scores the existing rows are sorted by ID; place the new row among them
+    for i in np.flatnonzero(tie_ends > positions):
+        tied_ids = candidate_ids[order[positions[i]:tie_ends[i]]]
+        positions[i] += np.searchsorted(tied_ids, candidate_ids[new_rows[i]])
+    return np.insert(order, positions, new_rows)
+
+
+class ScreeningSession:
+    """
+    Candidates screened so far for one job description and set of options.
+
+    Everything per candidate (text, parse-time facts, embedding, insight) is kept in a
+    compact CandidateTable keyed by content hash, so re-running the analysis after more uploads only processes the
+    new files and merges their scores into the existing ranking.
+    None of that depends on the job description: a JD edit only needs the new JD
+    embedding and one matrix-vector product (set_job_description).
+    settings_key identifies what the stored resume-side results depend on (ranking mode,
+    hard filters, duplicate collapsing); a different key needs a new session.
+    With collapse_duplicates, near-duplicates of a ranked resume are recorded against it
+    instead of being encoded and ranked (see find_duplicate).
+    """
+
+    def __init__(self, settings_key, collapse_duplicates=False):
+        self.settings_key = settings_key
+        self.duplicate_index = LSHIndex() if collapse_duplicates else None
+        self.duplicates = {}         # content hash -> (file name, representative candidate ID)
+        self.candidates = CandidateTable()   # accepted candidates, in the order they were added
+        self.scores = np.zeros(0, dtype=np.float64)
+        self.order = np.zeros(0, dtype=np.int64)   # rows by descending score
+        self.problem_files = {}      # content hash -> file name, for files without text
+        self.rejected = {}           # content hash -> file name, for files failing the hard filters
+        self.jd_hash = None
+        self.jd_embedding = None
+        self.bias = None
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def has_file(self, file_key):
+        return (file_key in self.candidates.row_by_id or file_key in self.problem_files or file_key in self.rejected
+                or file_key in self.duplicates)
+
+    def find_duplicate(self, resume):
+        """
+        duplicate_fn for run_screening_pipeline: the candidate ID of an earlier near-duplicate,
+        or None after indexing this resume as a new representative. LSH keeps this sub-linear in pool size.
+        """
+        representative = self.duplicate_index.find_or_add(resume['id'], resume_signature(resume))
+        return representative if representative != resume['id'] else None
+
+    def retain(self, file_keys):
+        """
+        Drops candidates whose files are no longer uploaded; the ranking order is kept.
+        Copies of a dropped representative are forgotten, so they are screened again on the next run.
+        """
+        file_keys = set(file_keys)
+        self.problem_files = {key: name for key, name in self.problem_files.items() if key in file_keys}
+        self.rejected = {key: name for key, name in self.rejected.items() if key in file_keys}
+        self.duplicates = {key: (name, representative) for key, (name, representative) in self.duplicates.items()
+                           if key in file_keys and representative in file_keys}
+        keep = np.array([candidate_id in file_keys for candidate_id in self.candidates.ids], dtype=bool)
+        if keep.all():
+            return
+        if self.duplicate_index is not None:
+            for candidate_id, kept in zip(self.candidates.ids, keep):
+                if not kept:
+                    self.duplicate_index.remove(candidate_id)
+        new_rows = np.cumsum(keep) - 1
+        self.order = new_rows[self.order[keep[self.order]]]
+        self.candidates = self.candidates.take(np.flatnonzero(keep))
+        self.scores = self.scores[keep]
+
+    def set_job_description(self, jd_hash, jd_embedding, bias):
+        """
+        Switches the session to a (possibly edited) job description. When the JD changed,
+        every stored candidate is re-scored against the new JD embedding and re-ranked;
+        nothing resume-side is extracted or encoded again. Returns True if the JD changed.
+        """
+        self.bias = bias
+        if jd_hash == self.jd_hash:
+            return False
+        self.jd_hash = jd_hash
+        self.jd_embedding = jd_embedding
+        if len(self.candidates):
+            self.scores = self.candidates.scores(jd_embedding).astype(np.float64)
+            self.order = ranking_order(self.scores, self.candidates.ids)
+        return True
+
+    def add(self, job_description, pipeline_result, file_keys):
+        """
+        Adds the output of run_screening_pipeline for the files identified by file_keys
+        (content hash -> file name, one entry per file passed to it, in the same order; the
+        'problem_indices' and 'rejected_indices' of the result point into it).
+        Call set_job_description first, so new and stored candidates are scored against the same JD.
+        Returns the number of candidates added.
+        """
+        # By upload index, not name: two different uploads can share a file name
+        keys = list(file_keys)
+        for index in pipeline_result.get('problem_indices', []):
+            self.problem_files[keys[index]] = file_keys[keys[index]]
+        for index in pipeline_result.get('rejected_indices', []):
+            self.rejected[keys[index]] = file_keys[keys[index]]
+        for resume, representative in pipeline_result.get('duplicates', []):
+            self.duplicates[resume['id']] = (resume['name'], representative)
+
+        new_resumes, new_embeddings, new_ids = [], [], set()
+        for resume, embedding in zip(pipeline_result['resumes'], pipeline_result['embeddings']):
+            if resume['id'] in self.candidates.row_by_id or resume['id'] in new_ids:
+                continue
+            new_ids.add(resume['id'])
+            new_resumes.append(resume)
+            new_embeddings.append(embedding)
+        if not new_resumes:
+            return 0
+
+        insights_df = generate_insights_batch(job_description, new_resumes)
+        insight_by_id = dict(zip(insights_df['Candidate ID'], insights_df['AI Insights']))
+        first_row = self.candidates.append(new_resumes, np.vstack(new_embeddings),
+                                           [insight_by_id[resume['id']] for resume in new_resumes])
+        # Scored from the stored float16 embeddings, exactly as a later JD edit re-scores them
+        self.scores = np.concatenate([self.scores, self.candidates.scores(self.jd_embedding, start=first_row).astype(np.float64)])
+        self.order = merge_ranked(self.order, self.scores, np.arange(first_row, len(self.candidates)), self.candidates.ids)
+        return len(new_resumes)
+
+    def results_df(self):
+        """
+        Ranked results (same columns as results_from_scores plus 'AI Insights'), without re-sorting.
+        When duplicates are collapsed, 'Duplicates' names the copies folded into each candidate.
+        """
+        order = self.order
+        candidates = self.candidates
+        results_df = pd.DataFrame({
+            'Rank': np.arange(1, len(order) + 1),
+            'Candidate ID': [candidates.ids[row] for row in order],
+            'Candidate': [candidates.names[row] for row in order],
+            'Semantic Similarity Score': np.round(self.scores[order] * 100, 2),
+            'AI Insights': [candidates.insights[row] for row in order]
+        })
+        if self.duplicate_index is not None:
+            copies = {}
+            for name, representative in self.duplicates.values():
+                copies.setdefault(representative, []).append(name)
+            results_df['Duplicates'] = [", ".join(copies.get(candidate_id, [])) for candidate_id in results_df['Candidate ID']]
+        return results_df
@@ -0,0 +1,274 @@
+# prefork_pool.py
+"""
+Pre-forked worker pool that shares the loaded models with its workers copy-on-write.
+
+A worker process started from scratch (or with "spawn") re-imports advanced_utils and
+loads both models again: seconds of start-up and hundreds of MB per worker. Here the
+parent loads the models once and forks the workers afterwards, so the weights stay in
+pages the workers share with the parent; a worker only pays for the memory it writes to.
+
+    with PreforkPool(processes=4, pin=True) as pool:
+        future = pool.submit(rank_resumes_advanced, job_description, resumes)
+        results_df = future.result()
+
+Jobs go through one task queue that idle workers pull from; functions and arguments are
+pickled (so functions must be importable, e.g. module level). A worker that dies fails
+the job it was running and is replaced by a fresh fork. process_memory() and
+fresh_load_memory() measure what a worker really costs (see benchmarks/prefork_memory.py).
+
+Requires the "fork" start method (Linux; macOS).
+"""
+import gc
+import itertools
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+
+from inference import configure_threads, pin_worker
+
+WORKER_POLL_SECONDS = 1.0
+
+
+# --- Memory measurement ---
+def process_memory(pid=None):
+    """
+    Memory of a process in bytes from /proc/<pid>/smaps_rollup (Linux): rss, pss (shared
+    pages split between their users), uss (pages only this process uses: what it really
+    costs) and shared. None where /proc is not available.
+    """
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared', 'Shared_Dirty': 'shared',
+              'Private_Clean': 'uss', 'Private_Dirty': 'uss'}
+    memory = {'rss': 0, 'pss': 0, 'uss': 0, 'shared': 0}
+    try:
+        with open(f"/proc/{pid or os.getpid()}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    memory[fields[name]] += int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return memory
+
+
+def _measure_fresh_load(conn):
+    started = time.perf_counter()
+    import advanced_utils
+    advanced_utils.load_models()
+    conn.send({'load_seconds': round(time.perf_counter() - started, 3), 'memory': process_memory()})
+    conn.close()
+
+
+def fresh_load_memory():
+    """
+    What a worker that loads the models itself costs: starts a fresh ("spawn") process,
+    lets it load the models and returns its load time and process_memory().
+    """
+    context = multiprocessing.get_context("spawn")
+    reader, writer = context.Pipe(duplex=False)
+    process = context.Process(target=_measure_fresh_load, args=(writer,), name="fresh-load")
+    process.start()
+    writer.close()
+    try:
+        return reader.recv()
+    except EOFError:
+        process.join()
+        raise RuntimeError(f"Fresh model load failed (exit code {process.exitcode})")
+    finally:
+        process.join()
+
+
+# --- Pool ---
+def preload_models():
+    """Loads the models in this process (they otherwise load on first use) so forked workers inherit them."""
+    import advanced_utils
+    advanced_utils.load_models()
+
+
+def _worker_main(index, processes, pin, tasks, results, results_lock):
+    if pin:
+        cores = pin_worker(index, processes)
+        configure_threads(len(cores))
+    else:
+        configure_threads(max(1, (os.cpu_count() or 1) // processes))
+    if 'advanced_utils' in sys.modules:
+        sys.modules['advanced_utils'].inference_gate.reset()
+    pid = os.getpid()
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, fn, args, kwargs = task
+        with results_lock:
+            results.send(('start', task_id, pid))
+        try:
+            message = ('done', task_id, fn(*args, **kwargs))
+        except BaseException as e:
+            message = ('error', task_id, e)
+        with results_lock:
+            try:
+                results.send(message)
+            except Exception as e:
+                # Unpicklable result or exception
+                results.send(('error', task_id, RuntimeError(f"Could not return the result: {e!r}")))
+
+
+class PreforkPool:
+    """
+    `processes` workers forked from this process after it loaded the models (preload=True).
+    pin=True gives every worker its own share of the cores (see inference.pin_worker);
+    each worker sizes its torch thread pool to its cores.
+
+    Run no model call in the parent before creating the pool: thread pools that already
+    exist (torch's OpenMP threads, a busy inference gate) do not survive a fork cleanly.
+    """
+
+    def __init__(self, processes=None, pin=False, preload=True):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("PreforkPool needs the 'fork' start method (Linux or macOS)")
+        if preload:
+            preload_models()
+        self.processes = processes or os.cpu_count() or 1
+        self.pin = pin
+        self._context = multiprocessing.get_context("fork")
+        self._tasks = self._context.SimpleQueue()
+        self._results, self._results_writer = self._context.Pipe(duplex=False)
+        self._results_lock = self._context.Lock()
+        self._task_ids = itertools.count()
+        self._futures = {}
+        self._running = {}        # worker pid -> task id
+        self._lock = threading.Lock()
+        self._closing = False
+        self.restarts = 0
+        self._workers = self._fork_workers(range(self.processes))
+        self._collector = threading.Thread(target=self._collect, name="prefork-collector", daemon=True)
+        self._collector.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def _fork_workers(self, indices):
+        # Objects alive now (the models' Python side included) move to a generation the collector
+        # never scans, so no collection in a worker writes to, and un-shares, the parent's pages.
+        # The workers keep that state; the parent unfreezes once they are forked, so its own
+        # later garbage is still collected.
+        gc.collect()
+        gc.freeze()
+        try:
+            processes = []
+            for index in indices:
+                process = self._context.Process(target=_worker_main, name=f"prefork-{index}", daemon=True,
+                                                args=(index, self.processes, self.pin, self._tasks,
+                                                      self._results_writer, self._results_lock))
+                process.start()
+                processes.append(process)
+            return processes
+        finally:
+            gc.unfreeze()
+
+    @property
+    def worker_pids(self):
+        return [process.pid for process in self._workers]
+
+    def submit(self, fn, *args, **kwargs):
+        if self._closing:
+            raise RuntimeError("Pool is closed")
+        future = Future()
+        with self._lock:
+            task_id = next(self._task_ids)
+            self._futures[task_id] = future
+        self._tasks.put((task_id, fn, args, kwargs))
+        return future
+
+    def map(self, fn, *iterables):
+        """Like Executor.map: submits every call at once and yields results in order."""
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        return (future.result() for future in futures)
+
+    def _resolve(self, message):
+        kind, task_id, value = message
+        with self._lock:
+            if kind == 'start':
+                self._running[value] = task_id
+                future = self._futures.get(task_id)
+                if future is not None:
+                    future.set_running_or_notify_cancel()
+                return
+            future = self._futures.pop(task_id, None)
+            for pid, running_task in list(self._running.items()):
+                if running_task == task_id:
+                    del self._running[pid]
+        if future is None or future.done():
+            return
+        if kind == 'done':
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+    def _collect(self):
+        """Resolves futures from the workers' messages and replaces workers that died."""
+        while True:
+            with self._lock:
+                if self._closing and not self._futures:
+                    return
+            sentinels = {process.sentinel: index for index, process in enumerate(self._workers)}
+            ready = wait([self._results] + list(sentinels), timeout=WORKER_POLL_SECONDS)
+            # Messages first: a worker that finished a job and then died has both ready
+            while self._results.poll():
+                try:
+                    self._resolve(self._results.recv())
+                except EOFError:
+                    return
+            for sentinel in ready:
+                if sentinel in sentinels:
+                    self._worker_exited(sentinels[sentinel])
+
+    def _worker_exited(self, index):
+        process = self._workers[index]
+        process.join()
+        with self._lock:
+            task_id = self._running.pop(process.pid, None)
+            future = self._futures.pop(task_id, None) if task_id is not None else None
+        if future is not None:
+            future.set_exception(RuntimeError(f"Worker {process.pid} died (exit code {process.exitcode}) running this job"))
+        if not self._closing:
+            print(f"Worker {process.pid} exited with code {process.exitcode}; forking a replacement")
+            self.restarts += 1
+            self._workers[index], = self._fork_workers([index])
+
+    def memory_report(self):
+        """process_memory() of the parent and of every worker."""
+        return {'parent': process_memory(os.getpid()),
+                'workers': [dict(pid=pid, memory=process_memory(pid)) for pid in self.worker_pids]}
+
+    def close(self):
+        """Lets the workers finish the queued jobs, then stops them."""
+        self._closing = True
+        for _ in self._workers:
+            self._tasks.put(None)
+        for process in self._workers:
+            process.join()
+        self._collector.join()
+
+    def terminate(self):
+        """Stops the workers at once; unfinished jobs fail."""
+        self._closing = True
+        for process in self._workers:
+            process.terminate()
+        for process in self._workers:
+            process.join()
+        self._collector.join()
+        with self._lock:
+            futures, self._futures = list(self._futures.values()), {}
+        for future in futures:
+            if not future.done():
+                future.set_exception(RuntimeError("Pool terminated"))
@@ -0,0 +1,327 @@
+# resume_parser.py
+import re
+from datetime import date
+
+import numpy as np
+
+from dedup import minhash_signature
+from skill_matcher import load_skill_matcher
+
+# --- Section headings ---
+# A heading is a short line on its own (optionally followed by a colon) naming one of these sections
+SECTION_HEADINGS = {
+    'summary': ["summary", "professional summary", "career summary", "profile", "professional profile",
+                "about me", "objective", "career objective", "overview"],
+    'experience': ["experience", "work experience", "professional experience", "employment history",
+                   "work history", "career history", "relevant experience", "internships?"],
+    'education': ["education", "academic background", "academic qualifications", "qualifications",
+                  "education and training", "certifications?", "education & certifications"],
+    'skills': ["skills", "technical skills", "core skills", "key skills", "core competencies",
+               "competencies", "technologies", "tech stack", "tools and technologies", "skills & tools"],
+    'projects': ["projects", "personal projects", "academic projects", "key projects", "selected projects",
+                 "portfolio"],
+}
+SECTIONS = tuple(SECTION_HEADINGS)
+
+HEADING_PATTERN = re.compile(
+    r"^[ \t]*(?:" + "|".join(
+        f"(?P<{section}>{'|'.join(headings)})" for section, headings in SECTION_HEADINGS.items()
+    ) + r")[ \t]*:?[ \t]*$",
+    re.MULTILINE
+)
+WHITESPACE_PATTERN = re.compile(r"[ \t\r\f\v]+")
+BLANK_LINES_PATTERN = re.compile(r"\n\s*\n+")
+
+
+def normalize_text(text):
+    """Lowercases text and collapses runs of spaces; line breaks are kept for heading detection."""
+    text = WHITESPACE_PATTERN.sub(" ", text.lower())
+    return BLANK_LINES_PATTERN.sub("\n", text).strip()
+
+
+class ParsedResume:
+    """
+    A resume normalized once at extraction time.
+
+    `lower` is the normalized (lowercase) text; sections are stored as (start, end)
+    offsets into it, so section access is a slice rather than another copy.
+    Text before the first recognised heading is kept under 'header'.
+    Experience and degree facts are extracted here too, for the filter index,
+    along with the taxonomy skill ids found in the full text and the MinHash signature
+    used for near-duplicate detection (None if not computed).
+    """
+    __slots__ = ('lower', 'sections', 'years_experience', 'degree_level', 'skill_years', 'skill_ids', 'minhash')
+
+    def __init__(self, lower, sections, years_experience=0.0, degree_level=0, skill_years=None, skill_ids=None,
+                 minhash=None):
+        self.lower = lower
+        self.sections = sections
+        self.years_experience = years_experience
+        self.degree_level = degree_level
+        self.skill_years = skill_years or {}
+        self.skill_ids = skill_ids
+        self.minhash = minhash
+
+    def section(self, name):
+        """Returns the normalized text of one section ('' if the resume has none)."""
+        spans = self.sections.get(name)
+        if not spans:
+            return ""
+        return "\n".join(self.lower[start:end] for start, end in spans)
+
+    def section_text(self, names):
+        """Joins several sections; falls back to the full text when none of them were found."""
+        parts = [self.section(name) for name in names if name in self.sections]
+        return "\n".join(parts) if parts else self.lower
+
+    def has_section(self, name):
+        return name in self.sections
+
+
+# --- Experience extraction ---
+MONTH = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+MONTH_NUMBERS = {name: i + 1 for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])}
+DATE_RANGE_PATTERN = re.compile(
+    rf"\b(?:(?P<start_month>{MONTH})\s*|(?P<start_num>\d{{1,2}})[/.\-])?(?P<start_year>(?:19|20)\d{{2}})"
+    r"\s*(?:-|–|—|to|until|till)\s*"
+    rf"(?:(?P<present>present|current(?:ly)?|now|today|ongoing|to date|till date)"
+    rf"|(?:(?P<end_month>{MONTH})\s*|(?P<end_num>\d{{1,2}})[/.\-])?(?P<end_year>(?:19|20)\d{{2}}))\b"
+)
+YEARS_OF_EXPERIENCE_PATTERN = re.compile(
+    r"(?P<years>\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\s+(?:of\s+)?"
+    r"(?:professional\s+|industry\s+|work\s+|hands-on\s+|relevant\s+|total\s+)?(?:experience|exp)\b"
+)
+SKILL_YEARS_PATTERN = re.compile(
+    r"(?P<years>\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:\w+\s+)?(?:experience\s+)?"
+    r"(?:in|with|using|of|developing|building)\s+(?P<skills>[^\n.;]{1,60})"
+)
+MAX_CAREER_MONTHS = 50 * 12
+
+
+def _month_index(month_name, month_num, year):
+    """Months since year 0; a missing month counts as January."""
+    month = 1
+    if month_name:
+        month = MONTH_NUMBERS.get(month_name[:3], 1)
+    elif month_num and 1 <= int(month_num) <= 12:
+        month = int(month_num)
+    return int(year) * 12 + month - 1
+
+
+def _merge_months(intervals):
+    """Total months covered by (start, end) intervals, counting overlaps once."""
+    total, current_start, current_end = 0, None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def _experience_text(lower, sections):
+    """Experience section if there is one, otherwise everything except education."""
+    if 'experience' in sections:
+        return "\n".join(lower[start:end] for start, end in sections['experience'])
+    spans = [span for name, section_spans in sections.items() if name != 'education' for span in section_spans]
+    return "\n".join(lower[start:end] for start, end in sorted(spans))
+
+
+def extract_experience(experience_text, matcher, full_text=None, today=None):
+    """
+    Years of experience from date ranges ("Jan 2018 - Present", "03/2015 – 2019") and explicit
+    statements ("5+ years of experience"), plus years per skill.
+    A skill gets the duration of every job entry (date line up to the next date line)
+    that mentions it, or an explicit "N years of/with <skill>" statement.
+    Date ranges are read from experience_text only; explicit statements anywhere in full_text.
+    Returns (total_years, {skill_id: years}).
+    """
+    full_text = experience_text if full_text is None else full_text
+    today = today or date.today()
+    now = today.year * 12 + today.month - 1
+
+    ranges = []
+    for match in DATE_RANGE_PATTERN.finditer(experience_text):
+        start = _month_index(match.group('start_month'), match.group('start_num'), match.group('start_year'))
+        if match.group('present'):
+            end = now
+        else:
+            end = _month_index(match.group('end_month'), match.group('end_num'), match.group('end_year'))
+        if start <= end <= now and end - start <= MAX_CAREER_MONTHS:
+            # The entry runs from the start of the date's line to the start of the next entry
+            entry_start = experience_text.rfind("\n", 0, match.start()) + 1
+            ranges.append((entry_start, start, end))
+
+    skill_intervals = {}
+    for i, (entry_start, start, end) in enumerate(ranges):
+        entry_end = ranges[i + 1][0] if i + 1 < len(ranges) else len(experience_text)
+        if entry_end <= entry_start:
+            continue
+        for skill_id in matcher.find_skill_ids(experience_text[entry_start:entry_end], lowered=True):
+            skill_intervals.setdefault(skill_id, []).append((start, end))
+
+    total_years = _merge_months([(start, end) for _, start, end in ranges]) / 12
+    for match in YEARS_OF_EXPERIENCE_PATTERN.finditer(full_text):
+        total_years = max(total_years, float(match.group('years')))
+
+    skill_years = {skill_id: _merge_months(intervals) / 12 for skill_id, intervals in skill_intervals.items()}
+    for match in SKILL_YEARS_PATTERN.finditer(full_text):
+        years = float(match.group('years'))
+        for skill_id in matcher.find_skill_ids(match.group('skills'), lowered=True):
+            skill_years[skill_id] = max(skill_years.get(skill_id, 0.0), years)
+
+    return round(total_years, 1), {skill_id: round(years, 1) for skill_id, years in skill_years.items()}
+
+
+# --- Degree detection ---
+DEGREE_LEVELS = {'none': 0, 'diploma': 1, 'bachelor': 2, 'master': 3, 'phd': 4}
+DEGREE_LABELS = {level: name for name, level in DEGREE_LEVELS.items()}
+DEGREE_DISPLAY_NAMES = {0: "None", 1: "Diploma/Associate", 2: "Bachelor's", 3: "Master's", 4: "PhD"}
+# Checked from highest to lowest; the first level with a match wins
+DEGREE_PATTERNS = [
+    (4, re.compile(r"\b(?:ph\.?\s?d|doctorate|doctoral|doctor of|d\.phil)(?!\w)")),
+    (3, re.compile(r"\b(?:(?<!scrum )master'?s?|m\.?sc|m\.?tech|m\.?eng|mba|m\.?phil|mca|m\.s\.|m\.a\.|postgraduate degree)(?!\w)")),
+    (2, re.compile(r"\b(?:bachelor'?s?|b\.?sc|b\.?tech|b\.?eng|bca|bba|b\.s\.|b\.a\.|b\.e\.|undergraduate degree)(?!\w)")),
+    (1, re.compile(r"\b(?:associate degree|associate'?s degree|diploma|hnd|foundation degree)(?!\w)")),
+]
+# Bare two-letter abbreviations ("MS", "BA") are too ambiguous outside the education section
+EDUCATION_ONLY_PATTERNS = [
+    (3, re.compile(r"\b(?:ms|ma|mres)\b")),
+    (2, re.compile(r"\b(?:bs|ba|be)\b(?=\s*(?:in|\(|,|-|of)\b)")),
+]
+
+
+def extract_degree_level(lower, sections):
+    """Highest degree mentioned, as a DEGREE_LEVELS value (0 when none is found)."""
+    education = "\n".join(lower[start:end] for start, end in sections.get('education', []))
+    for level, pattern in DEGREE_PATTERNS:
+        if pattern.search(education or lower):
+            return level
+    if education:
+        for level, pattern in EDUCATION_ONLY_PATTERNS:
+            if pattern.search(education):
+                return level
+        # Fall back to the whole resume when the education section names no degree
+        for level, pattern in DEGREE_PATTERNS:
+            if pattern.search(lower):
+                return level
+    return 0
+
+
+def parse_resume(text, matcher=None):
+    """
+    Splits resume text into sections (summary, experience, education, skills, projects)
+    and extracts years of experience (total and per skill), the highest degree and
+    the skills mentioned anywhere in the resume, plus its near-duplicate signature.
+    """
+    matcher = matcher or load_skill_matcher()
+    lower = normalize_text(text)
+    sections = {}
+    current, start = 'header', 0
+    for match in HEADING_PATTERN.finditer(lower):
+        if match.start() > start:
+            sections.setdefault(current, []).append((start, match.start()))
+        current, start = match.lastgroup, match.end()
+    if len(lower) > start:
+        sections.setdefault(current, []).append((start, len(lower)))
+    years_experience, skill_years = extract_experience(_experience_text(lower, sections), matcher, full_text=lower)
+    degree_level = extract_degree_level(lower, sections)
+    skill_ids = frozenset(matcher.find_skill_ids(lower, lowered=True))
+    return ParsedResume(lower, sections, years_experience, degree_level, skill_years, skill_ids,
+                        minhash_signature(lower))
+
+
+def extract_requirements(job_description):
+    """
+    Minimum years of experience and degree level a job description asks for
+    ("5+ years of experience", "Bachelor's degree required"). Returns (years, degree_level); 0 when unstated.
+    """
+    lower = normalize_text(job_description)
+    years = [float(match.group('years')) for match in YEARS_OF_EXPERIENCE_PATTERN.finditer(lower)]
+    degree_level = 0
+    for level, pattern in DEGREE_PATTERNS:
+        if pattern.search(lower):
+            degree_level = level
+    # The lowest degree named is the minimum requirement ("Bachelor's required, Master's preferred")
+    return (min(years) if years else 0.0), degree_level
+
+
+# --- Columnar filter index ---
+class ResumeFilterIndex:
+    """
+    Extraction-time facts for a candidate pool held as NumPy columns, so hard filters
+    ("≥5 years Python", "Master's or above") are vectorized masks over the whole pool.
+    Per-skill years are stored sparsely: for each skill, the rows that mention it and their years.
+    """
+
+    def __init__(self, parsed_resumes):
+        self.size = len(parsed_resumes)
+        self.years_experience = np.array([p.years_experience for p in parsed_resumes], dtype=np.float32)
+        self.degree_level = np.array([p.degree_level for p in parsed_resumes], dtype=np.int8)
+
+        skill_rows, skill_values = {}, {}
+        for row, parsed in enumerate(parsed_resumes):
+            for skill_id, years in parsed.skill_years.items():
+                skill_rows.setdefault(skill_id, []).append(row)
+                skill_values.setdefault(skill_id, []).append(years)
+        self.skill_rows = {skill_id: np.array(rows, dtype=np.int32) for skill_id, rows in skill_rows.items()}
+        self.skill_years = {skill_id: np.array(values, dtype=np.float32) for skill_id, values in skill_values.items()}
+
+    def mask(self, min_years=None, min_degree=None, min_skill_years=None):
+        """
+        Boolean mask of candidates passing every filter.
+        min_degree is a DEGREE_LEVELS key or value; min_skill_years maps skill id -> minimum years.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if min_years:
+            mask &= self.years_experience >= min_years
+        if min_degree:
+            level = DEGREE_LEVELS[min_degree] if isinstance(min_degree, str) else min_degree
+            mask &= self.degree_level >= level
+        for skill_id, years in (min_skill_years or {}).items():
+            skill_mask = np.zeros(self.size, dtype=bool)
+            rows = self.skill_rows.get(skill_id)
+            if rows is not None:
+                skill_mask[rows[self.skill_years[skill_id] >= years]] = True
+            mask &= skill_mask
+        return mask
+
+
+def resume_passes_filters(parsed, min_years=None, min_degree=None, min_skill_years=None):
+    """Single-resume form of ResumeFilterIndex.mask, for streaming pipelines that see one resume at a time."""
+    if min_years and parsed.years_experience < min_years:
+        return False
+    if min_degree:
+        level = DEGREE_LEVELS[min_degree] if isinstance(min_degree, str) else min_degree
+        if parsed.degree_level < level:
+            return False
+    return all(parsed.skill_years.get(skill_id, -1.0) >= years for skill_id, years in (min_skill_years or {}).items())
+
+
+def parse_skill_requirements(text, matcher=None):
+    """
+    Parses requirements such as "python:5, k8s:2" into {skill_id: years}.
+    Skills are resolved through the taxonomy, so aliases work; unknown names are returned separately.
+    """
+    matcher = matcher or load_skill_matcher()
+    requirements, unknown = {}, []
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, years = item.rpartition(":")
+        if not name:
+            name, years = years, "0"
+        skill_ids = matcher.find_skill_ids(name.strip().lower(), lowered=True)
+        try:
+            years = float(years)
+        except ValueError:
+            unknown.append(item)
+            continue
+        if not skill_ids:
+            unknown.append(name.strip())
+        for skill_id in skill_ids:
+            requirements[skill_id] = years
+    return requirements, unknown
@@ -0,0 +1,368 @@
+# shard_cluster.py
+"""
+Distributed ranking over a candidate pool too large for one machine.
+
+Each shard worker holds the embeddings of one shard of the candidate store (candidates whose
+row ID is shard modulo shards) and answers "top k for this JD embedding" with a dot product
+over its shard. The coordinator encodes the JD once, asks every worker at once, merges their
+sorted top-k lists and returns the same DataFrame as rank_resumes_advanced (restricted to
+the k best). Workers load no models; only the coordinator does.
+
+Workers and coordinator talk over plain TCP or Unix sockets (host:port or unix:/path),
+one length-prefixed JSON message per request and reply, so several local processes can
+stand in for nodes:
+
+    python shard_cluster.py worker --listen 10.0.0.5:7401 --shard 0 --shards 4
+    python shard_cluster.py worker --listen unix:/tmp/talentsift-shard1.sock --shard 1 --shards 4
+    python shard_cluster.py rank --workers 10.0.0.5:7401,unix:/tmp/talentsift-shard1.sock,... --jd jd.txt --top-k 20
+    python shard_cluster.py info --workers ...
+
+Every worker must be given the same --shards and a distinct --shard, and read a store with
+embeddings of the same model and mode (python candidate_store.py import fills it).
+With --codec (e.g. pq:48, after python candidate_store.py compress --codec pq:48) a worker
+holds and scores compressed embeddings instead (see embedding_codec.py): far less memory
+per candidate, for approximate scores.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from heapq import merge
+from itertools import islice
+
+import numpy as np
+
+from model_bundle import SEMANTIC_MODEL_NAME
+
+DEFAULT_EMBEDDING_MODEL = SEMANTIC_MODEL_NAME
+DEFAULT_TOP_K = 100
+DEFAULT_TIMEOUT_SECONDS = 30.0
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+_HEADER = struct.Struct(">I")
+
+
+# --- Wire protocol ---
+def parse_address(address):
+    """'unix:/path' (or a bare path) -> (AF_UNIX, path); 'host:port' -> (AF_INET, (host, port))."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if address.startswith("/"):
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Shard address must be host:port or unix:/path, got {address!r}")
+    return socket.AF_INET, (host, int(port))
+
+
+def send_message(sock, payload):
+    body = json.dumps(payload).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def _recv_exactly(sock, size):
+    chunks, remaining = [], size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock):
+    """The next message on sock, or None when the peer has closed the connection."""
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    size, = _HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message of {size} bytes exceeds {MAX_MESSAGE_BYTES}")
+    body = _recv_exactly(sock, size)
+    if body is None:
+        return None
+    return json.loads(body)
+
+
+# --- Worker ---
+class CandidateShard:
+    """
+    One shard of the candidate pool: IDs, names and unit-length float32 embeddings (one row each),
+    or, with a codec (embedding_codec.py), the embeddings' codes.
+    """
+
+    def __init__(self, candidate_ids, names, embeddings, shard=0, shards=1, codec=None):
+        self.candidate_ids = list(candidate_ids)
+        self.names = list(names)
+        self.codec = codec
+        self.embeddings = (np.ascontiguousarray(embeddings) if codec is not None
+                           else np.ascontiguousarray(embeddings, dtype=np.float32))
+        self.shard = shard
+        self.shards = shards
+
+    @classmethod
+    def from_store(cls, store, shard=0, shards=1, model=DEFAULT_EMBEDDING_MODEL, mode='full', codec=None):
+        if codec is not None:
+            candidate_ids, names, codes, trained_codec = store.load_code_shard(model, mode, codec, shard, shards)
+            return cls(candidate_ids, names, codes, shard, shards, trained_codec)
+        candidate_ids, names, embeddings = store.load_embedding_shard(model, mode, shard, shards)
+        return cls(candidate_ids, names, embeddings, shard, shards)
+
+    def info(self):
+        dimension = self.codec.dimension if self.codec is not None else self.embeddings.shape[1]
+        return {'shard': self.shard, 'shards': self.shards, 'candidates': len(self.candidate_ids),
+                'dimension': int(dimension) if len(self.candidate_ids) else None,
+                'codec': self.codec.spec if self.codec is not None else 'float32',
+                'memory_bytes': int(self.embeddings.nbytes)}
+
+    def top_k(self, jd_embedding, k=None):
+        """
+        The shard's k best candidates as [(candidate ID, name, score)], best first; ties are
+        ordered by candidate ID, so merged results do not depend on how the pool is sharded.
+        """
+        if not self.candidate_ids:
+            return []
+        if self.codec is not None:
+            scores = self.codec.scores(self.embeddings, jd_embedding)
+        else:
+            scores = self.embeddings @ np.asarray(jd_embedding, dtype=np.float32)
+        if k is not None and k < len(scores):
+            # Everything tied with the k-th best is kept, so the tie-break by ID below is exact
+            kth_best = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            rows = np.flatnonzero(scores >= kth_best)
+        else:
+            rows = np.arange(len(scores))
+        rows = sorted(rows.tolist(), key=lambda row: (-scores[row], self.candidate_ids[row]))[:k]
+        return [(self.candidate_ids[row], self.names[row], float(scores[row])) for row in rows]
+
+    def handle(self, request):
+        op = request.get('op')
+        if op == 'top_k':
+            k = request.get('k')
+            return {'results': self.top_k(request['jd_embedding'], None if k is None else int(k))}
+        if op == 'info':
+            return self.info()
+        raise ValueError(f"Unknown op {op!r}")
+
+
+class _ShardRequestHandler(socketserver.BaseRequestHandler):
+    """Answers requests on one connection until the coordinator closes it."""
+
+    def handle(self):
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (OSError, ValueError) as e:
+                print(f"Dropping connection: {e}")
+                return
+            if request is None:
+                return
+            try:
+                reply = self.server.shard.handle(request)
+            except (ValueError, KeyError, TypeError) as e:
+                reply = {'error': str(e)}
+            except Exception as e:
+                print(f"Error handling {request.get('op')!r}: {e}")
+                reply = {'error': "Internal shard error"}
+            send_message(self.request, reply)
+
+
+class _TCPShardServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixShardServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+
+def make_shard_server(shard, address):
+    """A threaded socket server answering for `shard` on `address` (not yet serving)."""
+    family, bind_address = parse_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(bind_address):
+            os.unlink(bind_address)
+        server = _UnixShardServer(bind_address, _ShardRequestHandler)
+    else:
+        server = _TCPShardServer(bind_address, _ShardRequestHandler)
+    server.shard = shard
+    return server
+
+
+def run_shard_worker(address, db_path=None, shard=0, shards=1, model=DEFAULT_EMBEDDING_MODEL, mode='full', codec=None):
+    """Loads a shard (codec: its compressed embeddings) from the candidate store and serves it on address until interrupted."""
+    from candidate_store import CandidateStore
+    store = CandidateStore(db_path)
+    try:
+        candidate_shard = CandidateShard.from_store(store, shard, shards, model, mode, codec)
+    finally:
+        store.close()
+    server = make_shard_server(candidate_shard, address)
+    print(f"Shard {shard}/{shards}: {len(candidate_shard.candidate_ids)} candidates ({candidate_shard.info()['codec']}) on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# --- Coordinator ---
+class ShardCoordinator:
+    """
+    Fans ranking requests out to shard workers and merges their answers. A shard that cannot
+    be reached (or answers with an error) fails the request with ConnectionError instead of
+    silently ranking without its candidates.
+    """
+
+    def __init__(self, addresses, timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.addresses = list(addresses)
+        for address in self.addresses:
+            parse_address(address)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.addresses)), thread_name_prefix="shard-client")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _request(self, address, request):
+        family, connect_address = parse_address(address)
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(connect_address)
+                send_message(sock, request)
+                reply = recv_message(sock)
+        except (OSError, ValueError) as e:
+            raise ConnectionError(f"Shard {address} failed: {e}") from e
+        if reply is None:
+            raise ConnectionError(f"Shard {address} closed the connection without replying")
+        if isinstance(reply, dict) and 'error' in reply:
+            raise ConnectionError(f"Shard {address} failed: {reply['error']}")
+        return reply
+
+    def _fan_out(self, request):
+        futures = [self._executor.submit(self._request, address, request) for address in self.addresses]
+        return [future.result() for future in futures]
+
+    def info(self):
+        """Each worker's shard info, in address order."""
+        return [dict(info, address=address) for address, info in zip(self.addresses, self._fan_out({'op': 'info'}))]
+
+    def top_k(self, jd_embedding, k=DEFAULT_TOP_K):
+        """The k best candidates over all shards as [(candidate ID, name, score)], best first."""
+        request = {'op': 'top_k', 'jd_embedding': np.asarray(jd_embedding, dtype=np.float32).tolist(), 'k': k}
+        shard_results = [reply['results'] for reply in self._fan_out(request)]
+        # Every shard's list is already sorted by (-score, ID)
+        merged = merge(*shard_results, key=lambda result: (-result[2], result[0]))
+        return list(merged if k is None else islice(merged, k))
+
+    def rank(self, job_description, top_k=DEFAULT_TOP_K, jd_embedding=None):
+        """
+        rank_resumes_advanced over the whole sharded pool, for its top_k best candidates
+        (top_k=None ranks everyone). Pass jd_embedding to skip encoding the JD.
+        """
+        from advanced_utils import encode_job_description, results_from_scores
+        if jd_embedding is None:
+            jd_embedding = encode_job_description(job_description)
+        results = self.top_k(jd_embedding, top_k)
+        candidates = [{'id': candidate_id, 'name': name} for candidate_id, name, _ in results]
+        return results_from_scores(candidates, [score for _, _, score in results])
+
+
+# --- Local cluster (several processes standing in for nodes) ---
+def _wait_for_socket(address, process, timeout):
+    family, connect_address = parse_address(address)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.connect(connect_address)
+            return
+        except OSError:
+            if not process.is_alive():
+                raise RuntimeError(f"Shard worker for {address} exited with code {process.exitcode}")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Shard worker for {address} did not start within {timeout}s")
+            time.sleep(0.05)
+
+
+def start_local_cluster(shards, socket_dir, db_path=None, model=DEFAULT_EMBEDDING_MODEL, mode='full',
+                        startup_timeout=120.0, codec=None):
+    """
+    Starts one worker process per shard on Unix sockets in socket_dir and waits until all of
+    them accept connections. Returns (processes, addresses); terminate the processes when done.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes, addresses = [], []
+    for shard in range(shards):
+        address = f"unix:{os.path.join(socket_dir, f'shard{shard}.sock')}"
+        process = context.Process(target=run_shard_worker, args=(address, db_path, shard, shards, model, mode, codec),
+                                  name=f"shard-{shard}", daemon=True)
+        process.start()
+        processes.append(process)
+        addresses.append(address)
+    for address, process in zip(addresses, processes):
+        _wait_for_socket(address, process, startup_timeout)
+    return processes, addresses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentSift AI distributed ranking")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    worker_parser = subparsers.add_parser("worker", help="Serve one shard of the candidate store")
+    worker_parser.add_argument("--listen", required=True, help="host:port or unix:/path")
+    worker_parser.add_argument("--db", help="Candidate store path (default: TALENTSIFT_CANDIDATE_DB or ~/.cache/talentsift/candidates.sqlite3)")
+    worker_parser.add_argument("--shard", type=int, default=0)
+    worker_parser.add_argument("--shards", type=int, default=1)
+    worker_parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    worker_parser.add_argument("--mode", choices=['full', 'sections'], default='full')
+    worker_parser.add_argument("--codec", help="Serve compressed embeddings of this codec, e.g. pq:48 (see embedding_codec.py)")
+    rank_parser = subparsers.add_parser("rank", help="Rank the sharded pool for a JD")
+    rank_parser.add_argument("--workers", required=True, help="Comma-separated worker addresses")
+    rank_parser.add_argument("--jd", required=True, help="Job description text file")
+    rank_parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    rank_parser.add_argument("--output", help="Write the ranking as CSV here (default: print it)")
+    info_parser = subparsers.add_parser("info", help="Show each worker's shard")
+    info_parser.add_argument("--workers", required=True, help="Comma-separated worker addresses")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        if not 0 <= args.shard < args.shards:
+            parser.error("--shard must be between 0 and --shards - 1")
+        run_shard_worker(args.listen, args.db, args.shard, args.shards, args.model, args.mode, args.codec)
+        return
+    with ShardCoordinator(args.workers.split(",")) as coordinator:
+        if args.command == "info":
+            for info in coordinator.info():
+                print(f"{info['address']}: shard {info['shard']}/{info['shards']}, {info['candidates']} candidates, "
+                      f"{info['codec']}, {info['memory_bytes'] / 2 ** 20:.1f} MB")
+            return
+        with open(args.jd, encoding="utf-8") as f:
+            job_description = f.read()
+        started = time.perf_counter()
+        results_df = coordinator.rank(job_description, top_k=args.top_k)
+        print(f"Ranked {len(args.workers.split(','))} shards in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    if args.output:
+        results_df.to_csv(args.output, index=False)
+    else:
+        print(results_df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
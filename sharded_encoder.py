@@ -0,0 +1,136 @@
+# sharded_encoder.py
+"""
+Multi-process sentence encoding for very large batches (e.g. nightly re-scoring).
+
+One SentenceTransformer.encode call runs in one interpreter. ShardedEncoder splits the
+texts into chunks and encodes them on a pool of worker processes, each with its own
+model and its own share of the cores. Workers write their embeddings straight into one
+shared-memory matrix at the texts' original rows, so nothing is pickled back and the
+result comes out in input order.
+
+    with ShardedEncoder(processes=8) as encoder:
+        embeddings = encoder.encode(texts)
+    results_df = rank_resumes_advanced(job_description, resumes, encoder=encoder)
+
+With the "fork" start method (Linux) and the models already loaded in the parent,
+workers reuse the parent's model pages copy-on-write instead of loading their own copy.
+"""
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from inference import configure_threads, pin_worker
+
+DEFAULT_CHUNK_SIZE = 256
+DEFAULT_BATCH_SIZE = 32
+
+# Per-worker state, set by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name, share_parent_model, worker_counter, processes, pin):
+    """Gives the worker its index, its cores, a right-sized torch thread pool and a model."""
+    global _worker_model
+    with worker_counter.get_lock():
+        index = worker_counter.value
+        worker_counter.value += 1
+    cores = pin_worker(index, processes) if pin else None
+    # Each worker gets cores / processes threads, so the pool never oversubscribes the machine
+    configure_threads(len(cores) if cores else max(1, (os.cpu_count() or 1) // processes))
+    if share_parent_model and 'advanced_utils' in sys.modules:
+        # Forked from a parent that loaded the model (see ShardedEncoder): reuse its pages (copy-on-write).
+        # The unwrapped model is used; the parent's inference gate does not apply across processes.
+        _worker_model = sys.modules['advanced_utils'].semantic_model.model
+    else:
+        from model_bundle import find_bundle, load_semantic_model
+        _worker_model = load_semantic_model(find_bundle(), model_name)
+
+
+def _worker_dimension():
+    return _worker_model.get_sentence_embedding_dimension()
+
+
+def _encode_chunk(shm_name, shape, rows, texts, batch_size):
+    """Encodes one chunk and writes its unit-length embeddings into the shared matrix at `rows`."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        output = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        output[rows] = _worker_model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                            normalize_embeddings=True)
+        del output
+    finally:
+        shm.close()
+    return len(rows)
+
+
+class ShardedEncoder:
+    """
+    A pool of encoding processes. encode(texts) returns float32 unit-length embeddings,
+    one row per text in input order, like semantic_model.encode(..., normalize_embeddings=True).
+
+    Texts are sorted by length before chunking, so each chunk pads to similar lengths;
+    chunks are handed out dynamically, so faster workers take more of them.
+    """
+
+    def __init__(self, processes=None, model_name=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 batch_size=DEFAULT_BATCH_SIZE, pin=True, start_method=None):
+        if model_name is None:
+            from model_bundle import SEMANTIC_MODEL_NAME
+            model_name = SEMANTIC_MODEL_NAME
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        start_method = start_method or ("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        context = multiprocessing.get_context(start_method)
+        # Workers must share the parent's resource tracker: one of their own would "clean up"
+        # (unlink) the shared matrices they attached to when they exit
+        resource_tracker.ensure_running()
+        if start_method == "fork" and 'advanced_utils' in sys.modules:
+            # Load the (lazily loaded) model once here, so the workers share it instead of each loading its own
+            sys.modules['advanced_utils'].semantic_model.model.load()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=context, initializer=_init_worker,
+            initargs=(model_name, start_method == "fork", context.Value('i', 0), self.processes, pin))
+        self._dimension = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    @property
+    def dimension(self):
+        if self._dimension is None:
+            self._dimension = self._executor.submit(_worker_dimension).result()
+        return self._dimension
+
+    def encode(self, texts, batch_size=None):
+        texts = list(texts)
+        shape = (len(texts), self.dimension)
+        if not texts:
+            return np.zeros(shape, dtype=np.float32)
+        batch_size = batch_size or self.batch_size
+        by_length = np.argsort([len(text) for text in texts], kind='stable')
+        # Enough chunks for every worker to take several, but never smaller than one model batch
+        chunk_size = min(self.chunk_size, max(batch_size, -(-len(texts) // (self.processes * 4))))
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(texts) * shape[1] * 4))
+        try:
+            futures = []
+            for start in range(0, len(texts), chunk_size):
+                rows = by_length[start:start + chunk_size]
+                futures.append(self._executor.submit(_encode_chunk, shm.name, shape, rows,
+                                                     [texts[row] for row in rows], batch_size))
+            for future in futures:
+                future.result()
+            return np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
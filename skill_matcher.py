@@ -0,0 +1,272 @@
+# skill_matcher.py
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json")
+
+# Tokens keep the punctuation that is part of skill names (c++, c#, ci/cd, node.js, .net, scikit-learn)
+TOKEN_PATTERN = re.compile(r"\.?[a-z0-9+#][a-z0-9+#./\-]*")
+SPLIT_PATTERN = re.compile(r"[/\-]")
+
+
+class SkillMatcher:
+    """
+    Compiled form of a skill taxonomy.
+
+    Every alias is normalized into a phrase of tokens and stored in one dict, so finding
+    the skills in a document is a single greedy longest-match scan over its tokens.
+    The cost depends on document length and the longest alias, not on taxonomy size.
+    """
+
+    def __init__(self, taxonomy):
+        self.version = taxonomy.get("version", 1)
+
+        # --- Category tree ---
+        self.category_labels = {}
+        self.category_parent = {}
+        for category in taxonomy.get("categories", []):
+            self.category_labels[category["id"]] = category.get("label", category["id"])
+            self.category_parent[category["id"]] = category.get("parent")
+
+        # --- Skills and aliases ---
+        self.skills = []            # canonical skill names, in taxonomy order
+        self.skill_category = []    # leaf category id per skill
+        self.skill_root = []        # top-level category id per skill ('technical' / 'soft')
+        self.skill_ids = {}         # canonical name -> skill id
+        self.skill_aliases = []     # aliases per skill, as written in the taxonomy
+        self._phrases = {}          # normalized alias phrase -> skill id
+        self._known_tokens = set()  # every token used by any alias
+        self._prefixes = set()      # every proper prefix of an alias phrase
+        self.max_phrase_tokens = 1
+
+        for category_id, entries in taxonomy.get("skills", {}).items():
+            if category_id not in self.category_labels:
+                self.category_labels[category_id] = category_id
+                self.category_parent[category_id] = None
+            root = self._root_of(category_id)
+            for entry in entries:
+                if isinstance(entry, str):
+                    entry = {"name": entry}
+                name = entry["name"].strip().lower()
+                if name in self.skill_ids:
+                    continue
+                skill_id = len(self.skills)
+                self.skills.append(name)
+                self.skill_category.append(category_id)
+                self.skill_root.append(root)
+                self.skill_ids[name] = skill_id
+                self.skill_aliases.append([alias.strip().lower() for alias in entry.get("aliases", [])])
+                for alias in [name] + list(entry.get("aliases", [])):
+                    self._add_phrase(alias, skill_id)
+
+        # Precompute each skill's category chain (leaf first) for category-level breakdowns
+        self.skill_lineage = [self._lineage(category_id) for category_id in self.skill_category]
+
+    def _root_of(self, category_id):
+        while self.category_parent.get(category_id):
+            category_id = self.category_parent[category_id]
+        return category_id
+
+    def _lineage(self, category_id):
+        lineage = []
+        while category_id:
+            lineage.append(category_id)
+            category_id = self.category_parent.get(category_id)
+        return lineage
+
+    def _add_phrase(self, alias, skill_id):
+        tokens = [token.rstrip(".-/") for token in TOKEN_PATTERN.findall(alias.lower())]
+        tokens = [token for token in tokens if token]
+        if not tokens:
+            return
+        phrase = " ".join(tokens)
+        # First definition wins when two skills share an alias
+        self._phrases.setdefault(phrase, skill_id)
+        self._known_tokens.update(tokens)
+        for i in range(1, len(tokens)):
+            self._prefixes.add(" ".join(tokens[:i]))
+        self.max_phrase_tokens = max(self.max_phrase_tokens, len(tokens))
+
+    def tokenize(self, text):
+        """Splits text into matcher tokens. Expects lowercase text."""
+        tokens = []
+        for raw in TOKEN_PATTERN.findall(text):
+            token = raw.rstrip(".-/")
+            if not token:
+                continue
+            if token in self._known_tokens or not SPLIT_PATTERN.search(token):
+                tokens.append(token)
+            else:
+                # "python/sql" or "problem-solving" that is not itself an alias
+                tokens.extend(part for part in SPLIT_PATTERN.split(token) if part)
+        return tokens
+
+    def find_skill_ids(self, text, lowered=False):
+        """Returns the set of skill ids mentioned in the text."""
+        tokens = self.tokenize(text if lowered else text.lower())
+        phrases = self._phrases
+        prefixes = self._prefixes
+        found = set()
+        i = 0
+        n_tokens = len(tokens)
+        while i < n_tokens:
+            phrase = tokens[i]
+            match, match_len = phrases.get(phrase), 1
+            j = i + 1
+            # Extend only while the phrase is still the prefix of some alias
+            while phrase in prefixes and j < n_tokens:
+                phrase = phrase + " " + tokens[j]
+                j += 1
+                skill_id = phrases.get(phrase)
+                if skill_id is not None:
+                    match, match_len = skill_id, j - i
+            if match is not None:
+                found.add(match)
+                i += match_len
+            else:
+                i += 1
+        return found
+
+    def find_skills(self, text, lowered=False):
+        """Returns the canonical names of the skills mentioned in the text, in taxonomy order."""
+        return [self.skills[skill_id] for skill_id in sorted(self.find_skill_ids(text, lowered))]
+
+    def category_breakdown(self, required_ids, matched_ids):
+        """
+        Category-level match percentages for the required skills.
+        Each skill counts towards its own category and all of its parents.
+        """
+        required_counts = {}
+        matched_counts = {}
+        for skill_id in required_ids:
+            for category_id in self.skill_lineage[skill_id]:
+                required_counts[category_id] = required_counts.get(category_id, 0) + 1
+                if skill_id in matched_ids:
+                    matched_counts[category_id] = matched_counts.get(category_id, 0) + 1
+
+        breakdown = {}
+        for category_id in self.category_labels:
+            required = required_counts.get(category_id, 0)
+            if not required:
+                continue
+            matched = matched_counts.get(category_id, 0)
+            breakdown[category_id] = {
+                'label': self.category_labels[category_id],
+                'parent': self.category_parent.get(category_id),
+                'matched': matched,
+                'required': required,
+                'match_pct': round(matched / required * 100, 1)
+            }
+        return breakdown
+
+
+def load_taxonomy(path=None):
+    """Reads a taxonomy JSON file (defaults to TALENTSIFT_SKILL_TAXONOMY or the bundled file)."""
+    path = path or os.environ.get("TALENTSIFT_SKILL_TAXONOMY", DEFAULT_TAXONOMY_PATH)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=4)
+def load_skill_matcher(path=None):
+    """Loads and compiles a taxonomy once; later calls with the same path reuse the matcher."""
+    return SkillMatcher(load_taxonomy(path))
+
+
+# --- Semantic skill matching ---
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "talentsift")
+PHRASE_SPLIT_PATTERN = re.compile(r"[\n\r•●▪|;]+|(?<=[a-z0-9)])[.!?](?:\s+|$)", re.IGNORECASE)
+MAX_PHRASES = 256
+MAX_PHRASE_CHARS = 300
+
+
+def split_phrases(text, max_phrases=MAX_PHRASES):
+    """Splits a resume into short, de-duplicated phrases (lines, bullets and sentences) for embedding."""
+    phrases = []
+    seen = set()
+    for phrase in PHRASE_SPLIT_PATTERN.split(text):
+        phrase = " ".join(phrase.split())[:MAX_PHRASE_CHARS]
+        key = phrase.lower()
+        if len(phrase) < 4 or key in seen:
+            continue
+        seen.add(key)
+        phrases.append(phrase)
+        if len(phrases) >= max_phrases:
+            break
+    return phrases
+
+
+class SemanticSkillMatcher:
+    """
+    Embedding-based fallback for skills the exact matcher misses
+    ("built neural nets in Torch" covering "pytorch" and "deep learning").
+
+    Skill vectors are computed once per taxonomy/model pair and cached on disk;
+    each resume then costs a single batched encode of its phrases.
+    """
+
+    def __init__(self, matcher, model, model_name, cache_dir=None, threshold=0.5):
+        self.matcher = matcher
+        self.model = model
+        self.model_name = model_name
+        self.threshold = threshold
+        self.cache_dir = cache_dir or os.environ.get("TALENTSIFT_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.skill_texts = [self._skill_text(skill_id) for skill_id in range(len(matcher.skills))]
+        self.skill_vectors = self._load_or_compute_skill_vectors()
+
+    def _skill_text(self, skill_id):
+        # The canonical name plus a few aliases gives the embedding more context than the bare name
+        return ", ".join([self.matcher.skills[skill_id]] + self.matcher.skill_aliases[skill_id][:3])
+
+    def _cache_path(self):
+        digest = hashlib.sha1("\n".join([self.model_name] + self.skill_texts).encode("utf-8")).hexdigest()[:16]
+        safe_model = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.model_name)
+        return os.path.join(self.cache_dir, f"skill_vectors_{safe_model}_{digest}.npy")
+
+    def _load_or_compute_skill_vectors(self):
+        path = self._cache_path()
+        if os.path.exists(path):
+            vectors = np.load(path)
+            if vectors.shape[0] == len(self.skill_texts):
+                return vectors
+
+        vectors = self.model.encode(self.skill_texts, batch_size=64, convert_to_numpy=True,
+                                    normalize_embeddings=True).astype(np.float32)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + ".tmp.npy"
+            np.save(tmp_path, vectors)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not cache skill vectors: {e}")
+        return vectors
+
+    def match(self, skill_ids, resume_text, threshold=None):
+        """
+        Checks which of the given skills are semantically covered by the resume.
+        Returns {skill_id: (similarity, best matching phrase)} for covered skills.
+        """
+        skill_ids = sorted(skill_ids)
+        if not skill_ids:
+            return {}
+        phrases = split_phrases(resume_text)
+        if not phrases:
+            return {}
+        threshold = self.threshold if threshold is None else threshold
+
+        phrase_vectors = self.model.encode(phrases, batch_size=64, convert_to_numpy=True,
+                                           normalize_embeddings=True)
+        similarities = self.skill_vectors[skill_ids] @ phrase_vectors.T
+        best = similarities.argmax(axis=1)
+        best_scores = similarities[np.arange(len(skill_ids)), best]
+
+        return {
+            skill_id: (float(score), phrases[phrase_idx])
+            for skill_id, score, phrase_idx in zip(skill_ids, best_scores, best)
+            if score >= threshold
+        }
@@ -0,0 +1,60 @@
+# tests/conftest.py
+"""
+Shared fixtures. The models are replaced by small deterministic stubs, so the tests need
+neither torch nor a model download: the semantic model embeds a text as a unit-length
+bag of hashed words, and the classifier always reports the same emotions.
+"""
+import hashlib
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import advanced_utils  # noqa: E402
+
+STUB_DIMENSION = 32
+
+
+class StubSemanticModel:
+    def __init__(self):
+        self.encoded = 0          # texts encoded so far
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        self.encoded += len(texts)
+        embeddings = np.zeros((len(texts), STUB_DIMENSION), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                embeddings[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % STUB_DIMENSION] += 1
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+
+def stub_classifier(texts, **kwargs):
+    texts = [texts] if isinstance(texts, str) else texts
+    return [[{'label': 'neutral', 'score': 0.75}, {'label': 'joy', 'score': 0.25}] for _ in texts]
+
+
+@pytest.fixture(autouse=True)
+def stub_models(monkeypatch):
+    semantic_model = StubSemanticModel()
+    monkeypatch.setattr(advanced_utils, "semantic_model", semantic_model)
+    monkeypatch.setattr(advanced_utils, "classifier", stub_classifier)
+    monkeypatch.setattr(advanced_utils, "load_models", lambda: None)
+    return semantic_model
+
+
+def docx_bytes(*paragraphs):
+    """A .docx file with the given paragraphs, as bytes (no paragraphs: a file without text)."""
+    from docx import Document
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,189 @@
+# tests/test_job_queue.py
+import time
+
+import pytest
+
+import advanced_utils
+import job_queue
+from conftest import docx_bytes
+from pipeline import ScreeningSession
+
+JOB_DESCRIPTION = "Data scientist with 3+ years of Python, PyTorch and SQL. Bachelor's degree required."
+
+
+def resume_paragraphs(name, skills, years):
+    return [name, "Summary", f"Data professional with {years}+ years of experience in {skills}.",
+            "Experience", f"Acme Corp 2015 - 2020 {skills} engineer shipping analytics products",
+            "Education", "BSc Computer Science", "Skills", skills]
+
+
+def resume_files(count):
+    skills = ["Python, SQL", "Java, Spring", "Excel, communication", "PyTorch, Python", "Go, Kubernetes",
+              "React, TypeScript", "Scala, Spark"]
+    return [(f"resume_{i}.docx", docx_bytes(*resume_paragraphs(f"Candidate {i}", skills[i % len(skills)], i + 1)))
+            for i in range(count)]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def job_file_rows(db_path, job_id):
+    conn = job_queue.connect(db_path)
+    try:
+        return conn.execute("SELECT name, status, candidate_id, duplicate_of FROM job_files WHERE job_id = ? "
+                            "ORDER BY idx", (job_id,)).fetchall()
+    finally:
+        conn.close()
+
+
+def make_stale(db_path, job_id):
+    conn = job_queue.connect(db_path)
+    try:
+        with conn:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?",
+                         (time.time() - job_queue.STALE_SECONDS - 1, job_id))
+    finally:
+        conn.close()
+
+
+def test_job_runs_to_done(db_path):
+    job_id = job_queue.submit_job(JOB_DESCRIPTION, resume_files(5), db_path=db_path)
+    job_queue.run_worker(db_path, once=True)
+
+    status = job_queue.job_status(job_id, db_path)
+    assert (status['status'], status['processed_files'], status['accepted']) == ('done', 5, 5)
+    result = job_queue.load_job_result(job_id, db_path)
+    assert len(result['results_df']) == 5
+    assert result['embeddings'].shape == (5, len(result['jd_embedding']))
+
+
+def test_resumes_from_last_checkpoint_after_a_crash(db_path, monkeypatch, stub_models):
+    monkeypatch.setattr(job_queue, "CHECKPOINT_FILES", 2)
+    job_id = job_queue.submit_job(JOB_DESCRIPTION, resume_files(5), db_path=db_path)
+
+    encode_resumes = advanced_utils.encode_resumes
+    calls = []
+
+    def crash_on_second_chunk(resumes, *args, **kwargs):
+        calls.append(len(resumes))
+        if len(calls) == 2:
+            raise RuntimeError("worker killed")
+        return encode_resumes(resumes, *args, **kwargs)
+
+    monkeypatch.setattr(advanced_utils, "encode_resumes", crash_on_second_chunk)
+    conn = job_queue.connect(db_path)
+    try:
+        assert job_queue._claim_job(conn, "crashed") == job_id
+        with pytest.raises(RuntimeError):
+            job_queue._process_job(conn, job_id, "crashed")
+    finally:
+        conn.close()
+    # Only the first chunk was checkpointed; the job still looks running
+    status = job_queue.job_status(job_id, db_path)
+    assert (status['status'], status['processed_files']) == ('running', 2)
+
+    monkeypatch.setattr(advanced_utils, "encode_resumes", encode_resumes)
+    encoded_before = stub_models.encoded
+    job_queue.run_worker(db_path, once=True)
+    assert job_queue.job_status(job_id, db_path)['status'] == 'running'   # heartbeat still fresh: not re-claimed
+
+    make_stale(db_path, job_id)
+    job_queue.run_worker(db_path, once=True)
+    status = job_queue.job_status(job_id, db_path)
+    assert (status['status'], status['processed_files'], status['accepted']) == ('done', 5, 5)
+    # The checkpointed files were not encoded again: 3 resumes plus the JD
+    assert stub_models.encoded - encoded_before == 3 + 1
+
+
+def test_worker_that_lost_its_job_writes_nothing(db_path):
+    job_id = job_queue.submit_job(JOB_DESCRIPTION, resume_files(3), db_path=db_path)
+    old_conn, new_conn = job_queue.connect(db_path), job_queue.connect(db_path)
+    try:
+        assert job_queue._claim_job(old_conn, "old") == job_id
+        make_stale(db_path, job_id)
+        assert job_queue._claim_job(new_conn, "new") == job_id
+
+        with pytest.raises(job_queue.JobLost):
+            job_queue._process_job(old_conn, job_id, "old")
+        assert job_queue.job_status(job_id, db_path)['processed_files'] == 0
+        assert {status for _, status, _, _ in job_file_rows(db_path, job_id)} == {'pending'}
+
+        job_queue._process_job(new_conn, job_id, "new")
+    finally:
+        old_conn.close()
+        new_conn.close()
+    assert job_queue.job_status(job_id, db_path)['status'] == 'done'
+
+
+def test_failure_of_a_lost_job_does_not_mark_it_failed(db_path, monkeypatch):
+    job_id = job_queue.submit_job(JOB_DESCRIPTION, resume_files(2), db_path=db_path)
+    conn = job_queue.connect(db_path)
+    try:
+        job_queue._claim_job(conn, "new")
+    finally:
+        conn.close()
+    make_stale(db_path, job_id)
+
+    def fail(conn, job_id, worker_id):
+        # Another worker takes the job over while this one is failing
+        other = job_queue.connect(db_path)
+        try:
+            with other:
+                other.execute("UPDATE jobs SET worker_id = 'other', heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+        finally:
+            other.close()
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(job_queue, "_process_job", fail)
+    job_queue.run_worker(db_path, once=True)
+    assert job_queue.job_status(job_id, db_path)['status'] == 'running'
+
+
+@pytest.mark.parametrize("collapse", [False, True])
+def test_exact_copy_is_recorded_as_duplicate(db_path, collapse):
+    files = resume_files(3)
+    files.append(("copy_of_resume_1.docx", files[1][1]))
+    job_id = job_queue.submit_job(JOB_DESCRIPTION, files, options={'collapse_duplicates': collapse}, db_path=db_path)
+    job_queue.run_worker(db_path, once=True)
+
+    rows = job_file_rows(db_path, job_id)
+    original_id = rows[1][2]
+    assert rows[3] == ("copy_of_resume_1.docx", 'duplicate', original_id, original_id)
+    result = job_queue.load_job_result(job_id, db_path)
+    assert result['results_df']['Candidate ID'].is_unique
+    assert len(result['results_df']) == 3
+
+
+def test_near_duplicate_is_collapsed(db_path):
+    paragraphs = resume_paragraphs("Alice", "Python, PyTorch, SQL", 6)
+    files = resume_files(2) + [("alice.docx", docx_bytes(*paragraphs)),
+                               ("alice_agency.docx", docx_bytes(*paragraphs, "Referred by agency"))]
+    job_id = job_queue.submit_job(JOB_DESCRIPTION, files, options={'collapse_duplicates': True}, db_path=db_path)
+    job_queue.run_worker(db_path, once=True)
+
+    rows = job_file_rows(db_path, job_id)
+    assert rows[3][1] == 'duplicate'
+    assert rows[3][3] == rows[2][2]
+    assert job_queue.job_status(job_id, db_path)['accepted'] == 3
+
+
+def test_loaded_job_keeps_unreadable_and_filtered_files(db_path):
+    files = [("junior_a.docx", docx_bytes("Summary", "Analyst with 1+ years of experience in SQL.", "Skills", "SQL")),
+             ("junior_b.docx", docx_bytes("Summary", "Analyst with 2+ years of experience in Excel.", "Skills", "Excel")),
+             ("senior.docx", docx_bytes("Summary", "Data scientist with 8+ years of experience in Python.")),
+             ("empty.docx", docx_bytes())]
+    job_id = job_queue.submit_job(JOB_DESCRIPTION, files, options={'min_years': 5}, db_path=db_path)
+    job_queue.run_worker(db_path, once=True)
+    status = job_queue.job_status(job_id, db_path)
+    assert (status['failed'], status['rejected'], status['accepted']) == (1, 2, 1)
+
+    result = job_queue.load_job_result(job_id, db_path)
+    session = ScreeningSession(None)
+    session.set_job_description("jd", result['jd_embedding'], result['bias'])
+    session.add(JOB_DESCRIPTION, result, result['file_keys'])
+    assert list(session.problem_files.values()) == ["empty.docx"]
+    assert sorted(session.rejected.values()) == ["junior_a.docx", "junior_b.docx"]
+    assert len(session) == 1
+    assert all(session.has_file(key) for key in result['file_keys'])
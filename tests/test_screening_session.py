@@ -0,0 +1,159 @@
+# tests/test_screening_session.py
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+import pytest
+
+from advanced_utils import encode_job_description, ranking_order
+from pipeline import ScreeningSession, run_screening_pipeline
+from resume_parser import parse_resume
+
+Upload = namedtuple("Upload", "name text")
+
+JOB_DESCRIPTION = "Data scientist with Python, PyTorch and SQL experience."
+OTHER_JOB_DESCRIPTION = "Java backend engineer with Spring and Kubernetes."
+RESUME_TEXTS = [
+    "Python PyTorch SQL data scientist",
+    "Java Spring Kubernetes backend engineer",
+    "Python SQL analyst",
+    "Excel communication teamwork",
+    "PyTorch deep learning research Python",
+    "Kubernetes Go platform engineer",
+]
+
+
+def upload_key(upload):
+    return hashlib.sha1(f"{upload.name}\n{upload.text}".encode()).hexdigest()[:16]
+
+
+def extract_upload(upload):
+    """extract_fn for run_screening_pipeline: uploads without text are unreadable."""
+    if not upload.text:
+        return None
+    return {'id': upload_key(upload), 'name': upload.name, 'text': upload.text, 'parsed': parse_resume(upload.text)}
+
+
+def screen(session, uploads, job_description=JOB_DESCRIPTION, accept_fn=None):
+    """One analysis run, as app.py does it: only files the session has not seen are screened."""
+    file_keys = {}
+    for upload in uploads:
+        file_keys.setdefault(upload_key(upload), upload)
+    session.retain(file_keys)
+    new_uploads = {key: upload for key, upload in file_keys.items() if not session.has_file(key)}
+    result = run_screening_pipeline(job_description, list(new_uploads.values()), extract_upload,
+                                    bias_fn=lambda text: None, accept_fn=accept_fn,
+                                    duplicate_fn=session.find_duplicate if session.duplicate_index is not None else None,
+                                    extract_workers=2, batch_size=2)
+    session.set_job_description(job_description, result['jd_embedding'], result['bias'])
+    session.add(job_description, result, {key: upload.name for key, upload in new_uploads.items()})
+    return result
+
+
+def expected_ranking(uploads, job_description=JOB_DESCRIPTION):
+    """Candidate IDs in ranking_order of freshly computed scores."""
+    session = ScreeningSession(None)
+    screen(session, uploads, job_description)
+    scores = session.candidates.scores(encode_job_description(job_description))
+    return [session.candidates.ids[row] for row in ranking_order(scores, session.candidates.ids)]
+
+
+def ranked_ids(session):
+    return session.results_df()['Candidate ID'].tolist()
+
+
+@pytest.fixture
+def uploads():
+    return [Upload(f"resume_{i}.docx", text) for i, text in enumerate(RESUME_TEXTS)]
+
+
+def test_incremental_runs_rank_like_one_run(uploads):
+    session = ScreeningSession(None)
+    screen(session, uploads[:2])
+    screen(session, uploads[:4])
+    screen(session, uploads)
+    assert len(session) == len(uploads)
+    assert ranked_ids(session) == expected_ranking(uploads)
+
+
+def test_incremental_run_screens_only_new_files(uploads, stub_models):
+    session = ScreeningSession(None)
+    screen(session, uploads[:4])
+    encoded_before = stub_models.encoded
+    result = screen(session, uploads)
+    assert [resume['name'] for resume in result['resumes']] == ["resume_4.docx", "resume_5.docx"]
+    # Two new resumes plus the JD
+    assert stub_models.encoded - encoded_before == 2 + 1
+
+
+def test_ties_are_ranked_by_candidate_id_whatever_the_upload_order(uploads):
+    twins = [Upload("twin_a.docx", RESUME_TEXTS[0]), Upload("twin_b.docx", RESUME_TEXTS[0]),
+             Upload("twin_c.docx", RESUME_TEXTS[0])]
+    forward, backward = ScreeningSession(None), ScreeningSession(None)
+    screen(forward, uploads[:3] + twins[:1])
+    screen(forward, uploads[:3] + twins)
+    screen(backward, list(reversed(twins)) + uploads[:3])
+
+    twin_ids = sorted(upload_key(twin) for twin in twins)
+    for session in (forward, backward):
+        ranking = ranked_ids(session)
+        assert [candidate_id for candidate_id in ranking if candidate_id in twin_ids] == twin_ids
+    assert ranked_ids(forward) == ranked_ids(backward)
+
+
+def test_job_description_edit_rescores_without_encoding_resumes(uploads, stub_models):
+    session = ScreeningSession(None)
+    screen(session, uploads)
+    encoded_before = stub_models.encoded
+    jd_embedding = encode_job_description(OTHER_JOB_DESCRIPTION)
+    assert session.set_job_description(OTHER_JOB_DESCRIPTION, jd_embedding, None)
+    assert not session.set_job_description(OTHER_JOB_DESCRIPTION, jd_embedding, None)
+    assert stub_models.encoded - encoded_before == 1
+    assert ranked_ids(session) == expected_ranking(uploads, OTHER_JOB_DESCRIPTION)
+    np.testing.assert_allclose(session.scores, session.candidates.scores(jd_embedding), rtol=1e-6)
+
+
+def test_retain_drops_removed_files_and_keeps_the_order(uploads):
+    unreadable = Upload("scan.pdf", "")
+    session = ScreeningSession(None)
+    screen(session, uploads + [unreadable])
+    assert list(session.problem_files.values()) == ["scan.pdf"]
+
+    kept = [uploads[0], uploads[2], uploads[5]]
+    before = [candidate_id for candidate_id in ranked_ids(session) if candidate_id in {upload_key(u) for u in kept}]
+    screen(session, kept)
+    assert ranked_ids(session) == before
+    assert session.problem_files == {}
+    assert len(session.scores) == len(session.candidates) == 3
+
+    # Files dropped and uploaded again are screened again and merged back in
+    screen(session, uploads)
+    assert ranked_ids(session) == expected_ranking(uploads)
+
+
+def test_problem_and_rejected_files_are_matched_by_upload_not_name():
+    readable, unreadable = Upload("cv.docx", "Python SQL analyst"), Upload("cv.docx", "")
+    filtered = Upload("cv.docx", "Excel communication teamwork")
+    session = ScreeningSession(None)
+    screen(session, [readable, unreadable, filtered], accept_fn=lambda resume: "Excel" not in resume['text'])
+    assert session.problem_files == {upload_key(unreadable): "cv.docx"}
+    assert session.rejected == {upload_key(filtered): "cv.docx"}
+    assert ranked_ids(session) == [upload_key(readable)]
+
+
+def test_near_duplicates_are_collapsed_into_the_first_copy(uploads):
+    original = Upload("alice.docx", "Alice data scientist Python PyTorch SQL Kubernetes Spark statistics "
+                                    "machine learning deep learning leadership mentoring Acme 2019 MSc")
+    copy = Upload("alice_agency.docx", original.text + " referred")
+    session = ScreeningSession(None, collapse_duplicates=True)
+    screen(session, uploads[:2] + [original])
+    screen(session, uploads[:2] + [original, copy])
+    assert session.duplicates == {upload_key(copy): ("alice_agency.docx", upload_key(original))}
+    results_df = session.results_df()
+    assert upload_key(copy) not in set(results_df['Candidate ID'])
+    assert results_df.set_index('Candidate ID').loc[upload_key(original), 'Duplicates'] == "alice_agency.docx"
+
+    # Removing the representative forgets its copies, so they are screened again
+    screen(session, uploads[:2] + [copy])
+    assert session.duplicates == {}
+    assert upload_key(copy) in set(ranked_ids(session))
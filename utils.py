@@ -1,4 +1,7 @@
 import re
+import io
+import os
+import hashlib
 from PyPDF2 import PdfReader
 from docx import Document
 
@@ -29,6 +32,19 @@ def extract_text_from_docx(docx_file):
         print(f"Error extracting text from DOCX: {e}")
         return None
 
+# Upload MIME types by file extension, for files that arrive as raw bytes (API, job queue)
+CONTENT_TYPES = {
+    '.pdf': "application/pdf",
+    '.docx': "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+def file_from_bytes(content, file_name):
+    """Wraps raw file bytes in a file object with the .name and .type that extract_text expects."""
+    file = io.BytesIO(content)
+    file.name = file_name
+    file.type = CONTENT_TYPES.get(os.path.splitext(file_name)[1].lower())
+    return file
+
 def extract_text(file):
     """Extracts text from a file based on its type."""
     if file.type == "application/pdf":
@@ -36,4 +52,12 @@ def extract_text(file):
     elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
         return extract_text_from_docx(file)
     else:
-        return None
\ No newline at end of file
+        return None
+
+def file_content_hash(file):
+    """Returns a short content hash of an uploaded file, used as a stable candidate ID."""
+    return hashlib.sha1(file.getvalue()).hexdigest()[:16]
+
+def text_hash(text):
+    """Returns a short content hash of a text (e.g. a job description), used as a cache key."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]